@@ -0,0 +1,118 @@
+import argparse
+import os
+import runpy
+import sys
+
+# import global variables
+import variables.global_variables as global_vars
+
+# Step 4's extra condition and its parameters, as in utilities/pipeline_functions.py
+_dm_job_condition = ("company_name = ?", (global_vars.dm_company_name,)) if global_vars.dm_company_name else (None, ())
+
+# Each command runs a step script once its queue has work:
+# command: (script, help, status, extra condition, condition parameters)
+# The status and condition mirror the script's own selection, so an empty queue exits before the script is imported.
+commands = {
+    "init": ("init.py", "Create the database and store the API keys.", None, None, ()),
+    "parse": ("parseFullResume.py", "Parse the full resume, locally or with Affinda.", None, None, ()),
+    "import": ("importJobs.py", "Import job postings from CSV, JSONL or saved HTML files.", None, None, ()),
+    "review": ("step1_reviewJobDescriptions.py", "Step 1: review job descriptions.",
+               "Step 1 - JD Review", None, ()),
+    "resume": ("step2_createResume.py", "Step 2: create tailored resumes.", "Step 2 - Resume", None, ()),
+    "apply": ("step3_apply.py", "Step 3: move applied resumes.", "Step 3 - Apply", "date_applied IS NOT NULL", ()),
+    "dm": ("step4_DM.py", "Step 4: generate direct messages.", "Step 4 - DM") + _dm_job_condition,
+    "email": ("step5_Email.py", "Step 5: generate cover letter emails.", "Step 5 - Email", None, ()),
+    "score": ("scoreJobFit.py", "Score jobs with the local fit score engine.", None, None, ()),
+    "run": ("runPipeline.py", "Run steps 1 to 5 together in one resident process.", None,
+            "status IN (?, ?, ?, ?, ?)",
+            ("Step 1 - JD Review", "Step 2 - Resume", "Step 3 - Apply", "Step 4 - DM", "Step 5 - Email")),
+    "render": ("renderResumes.py", "Render resumes again from the stored selections.",
+               None, "resume_summary IS NOT NULL", ()),
+    "report": ("reportLlmCalls.py", "Report model call latency and tokens per step and prompt type.", None, None, ()),
+}
+
+# Commands that always run, because their work does not depend on a job queue or is selected by their own options
+_unqueued_commands = ("init", "parse", "import", "score", "report")
+
+# Step options that run the script even when its queue is empty
+_always_run_options = ("-h", "--help", "--watch")
+
+
+def count_pending(command):
+    """
+    Counts the jobs waiting for a command with a single indexed count query.
+
+    Args:
+        command (str): The command name.
+
+    Returns:
+        int: The number of jobs the command would process.
+    """
+    # Only the lightweight database module is imported before a step has work
+    from utilities.db_functions import connect, count_jobs
+
+    script, help_text, status, where, parameters = commands[command]
+    conn = connect()
+    try:
+        return count_jobs(conn, status=status, where=where, parameters=parameters)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    """
+    Runs a step script after checking that its queue is not empty.
+
+    Options after the command are passed through to the step script, for example
+    `python apply4jobs.py resume --pipeline`. Options before the command turn on profiling, for example
+    `python apply4jobs.py --profile --cprofile resume`.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Streamline the application process with AI.",
+                                     epilog="Options after the command are passed to the step script.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each stage (prompt build, model call, parse, DOCX edit, DB read and write), print a "
+                             "summary per stage and write collapsed stacks for flame graphs.")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile, also run cProfile over each job and save its statistics.")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="With --profile, also report each job's peak memory and largest allocation sites.")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for command, (script, help_text, status, where, parameters) in commands.items():
+        subparsers.add_parser(command, help=help_text, add_help=False)
+    args, step_args = parser.parse_known_args(argv)
+
+    if args.command not in _unqueued_commands and not set(_always_run_options) & set(step_args):
+        if not os.path.exists(global_vars.sqlite_db_file):
+            print(f"{global_vars.sqlite_db_file} does not exist. Run `python apply4jobs.py init` first.")
+            return 1
+        pending = count_pending(args.command)
+        if not pending:
+            print(f"Nothing to do for {args.command}.")
+            return 0
+        print(f"{pending} job(s) pending for {args.command}.")
+
+    # Run the step script as if it was started directly, importing its dependencies only now
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), commands[args.command][0])
+    sys.argv = [script] + step_args
+    if not (args.profile or args.cprofile or args.tracemalloc):
+        runpy.run_path(script, run_name="__main__")
+        return 0
+
+    # Imported only when profiling, like the step dependencies
+    from utilities.profile_functions import enable_profiling, finish_profiling
+    enable_profiling(cprofile=args.cprofile, trace_memory=args.tracemalloc)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        finish_profiling()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Compares the step2 achievement filter prompts with and without the local achievement index using a fake model.
+
+Builds a synthetic resume with several roles of mixed achievements and a set of jobs, each about one topic. Every
+role holds a few achievements about each job's topic. The fake model's latency grows with the prompt size, and it
+answers the filter prompt with the first achievements listed. For every role the benchmark reports the filter
+prompt size and latency before (every achievement sent) and after (local shortlist, or no call when the ranking is
+confident), and how many of the role's on-topic achievements were selected.
+
+Usage: python benchmarks/achievement_retrieval.py [--latency 0.3] [--seconds-per-1k-tokens 0.2]
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.global_variables as global_vars  # noqa: E402
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.achievement_functions import AchievementIndex  # noqa: E402
+from utilities.bullet_functions import BulletPromptStats, generate_bullet_options  # noqa: E402
+from utilities.resume_functions import compile_resume_profile  # noqa: E402
+
+NUM_BULLETS_PER_ROLE = global_vars.num_bullets_per_role
+
+TOPICS = {
+    "payments": "payments checkout billing invoicing fraud merchants pci subscriptions refunds ledger",
+    "mobile": "mobile ios android app store push notifications offline sync swift kotlin",
+    "data": "data warehouse pipelines analytics dashboards etl sql experimentation metrics bi",
+    "platform": "platform api developers sdk integrations webhooks partners extensibility oauth",
+    "ai": "machine learning models recommendations personalization llm ranking training inference",
+}
+FILLER = ("led cross-functional team stakeholders roadmap launched delivered improved reduced increased grew "
+          "customers revenue quarter process quality collaboration strategy planning").split()
+
+
+class FakeFilterModel(FakeGenerativeModel):
+    # Answers the filter prompt with the first achievements listed, taking longer for longer prompts
+    def __init__(self, latency, seconds_per_1k_tokens):
+        super().__init__(latency=0)
+        self.base_latency = latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+
+    def generate_content(self, prompt_parts):
+        prompt = prompt_parts[0]
+        if prompt.startswith("Input: Achievements"):
+            self.latency = self.base_latency + len(prompt) / 4 / 1000 * self.seconds_per_1k_tokens
+            count = int(prompt.split("select the top ")[1].split(" ")[0])
+            achievements = prompt.split("Achievements: ")[1].split("\nJob Description: ")[0]
+            self.text = "\n".join(achievements.splitlines()[:count])
+        else:
+            self.latency = 0
+            self.text = "\n".join(f"Enhanced version {i}" for i in range(5))
+        return super().generate_content(prompt_parts)
+
+
+def build_resume(rng, achievements_per_role):
+    # Each role holds two on-topic achievements per topic plus generic filler achievements
+    roles = []
+    for role_index in range(len(NUM_BULLETS_PER_ROLE)):
+        achievements = []
+        for topic, words in TOPICS.items():
+            for _ in range(2):
+                achievements.append(f"Owned {topic} work: " + " ".join(rng.sample(words.split(), 4) +
+                                                                       rng.sample(FILLER, 6)))
+        while len(achievements) < achievements_per_role:
+            achievements.append(" ".join(rng.sample(FILLER, 10)))
+        rng.shuffle(achievements)
+        roles.append({"organization": f"Company {role_index + 1}", "job_title": "Product Manager",
+                      "job_description": "\n".join(f"- {achievement}" for achievement in achievements)})
+    return compile_resume_profile({"data": {"raw_text": "", "work_experience": roles}}).work_experience
+
+
+def build_job(rng, topic):
+    words = TOPICS[topic].split()
+    description = " ".join(rng.choice(words) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(400))
+    return description, f"Emphasise {topic} experience.", ", ".join(words[:5])
+
+
+def run(work_experience, jobs, model, index):
+    # Returns each role's (full tokens, sent tokens, seconds) for every job and the on-topic achievements selected
+    per_role = [[] for _ in work_experience]
+    on_topic_selected = 0
+    for topic, (description, guidance, keywords) in jobs:
+        stats = BulletPromptStats()
+        for bullet_options in generate_bullet_options(model, work_experience, NUM_BULLETS_PER_ROLE, description,
+                                                      guidance, keywords, stats=stats, achievement_index=index):
+            on_topic_selected += bullet_options.original_bullet.lstrip("- ").startswith(f"Owned {topic} work")
+        for role_index, (full_characters, characters, seconds) in stats.role_filters.items():
+            per_role[role_index].append((full_characters // 4, characters // 4, seconds))
+    return per_role, on_topic_selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per filter call before input tokens.")
+    parser.add_argument("--seconds-per-1k-tokens", type=float, default=0.2, help="Seconds per 1,000 input tokens.")
+    parser.add_argument("--achievements", type=int, default=20, help="Achievements per role.")
+    args = parser.parse_args()
+
+    # Measure the prompts, not the response cache or the API quota
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = False
+
+    rng = random.Random(42)
+    work_experience = build_resume(rng, args.achievements)
+    jobs = [(topic, build_job(rng, topic)) for topic in TOPICS]
+    index = AchievementIndex(work_experience)
+
+    model = FakeFilterModel(args.latency, args.seconds_per_1k_tokens)
+    before, before_on_topic = run(work_experience, jobs, model, None)
+    before_calls = model.calls
+    model = FakeFilterModel(args.latency, args.seconds_per_1k_tokens)
+    after, after_on_topic = run(work_experience, jobs, model, index)
+
+    # On-topic achievements available to select: two per topic per role, capped by the role's bullets
+    available = len(jobs) * sum(min(2, bullets) for bullets in NUM_BULLETS_PER_ROLE)
+    print(f"{len(work_experience)} roles of {args.achievements} achievements, {len(jobs)} jobs")
+    for role_index, role in enumerate(work_experience):
+        full_tokens = sum(entry[0] for entry in before[role_index]) / len(jobs)
+        before_seconds = sum(entry[2] for entry in before[role_index]) / len(jobs)
+        after_tokens = sum(entry[1] for entry in after[role_index]) / len(jobs)
+        after_seconds = sum(entry[2] for entry in after[role_index]) / len(jobs)
+        skipped = sum(1 for entry in after[role_index] if not entry[1])
+        print(f"{role['organization']:>10} ({NUM_BULLETS_PER_ROLE[role_index]} bullets): "
+              f"before ~{full_tokens:5.0f} tokens {before_seconds:5.2f}s, "
+              f"after ~{after_tokens:5.0f} tokens {after_seconds:5.2f}s, {skipped}/{len(jobs)} selected locally")
+    print(f"Filter calls: {before_calls - sum(NUM_BULLETS_PER_ROLE) * len(jobs)} before, "
+          f"{model.calls - sum(NUM_BULLETS_PER_ROLE) * len(jobs)} after")
+    print(f"On-topic achievements selected: {before_on_topic}/{available} before (the fake model picks the first "
+          f"listed), {after_on_topic}/{available} after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Times each step's job selection on a seeded job_applications table before and after the index migrations.
+
+Seeds a temporary database at the latest schema version with synthetic jobs (most of them in finished statuses, with
+job-description-sized BLOBs), drops the job_applications_status index, and runs every selection the steps make
+through iter_jobs and every apply4jobs.py queue count through count_jobs. It then runs the index migrations again and
+repeats them, printing the query plan of the statement SQLite actually ran.
+
+Usage: python benchmarks/db_indexes.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.global_variables as global_vars  # noqa: E402
+from apply4jobs import commands  # noqa: E402
+from utilities.db_functions import count_jobs, iter_jobs  # noqa: E402
+from utilities.migration_functions import migrate, _add_status_and_date_indexes, \
+    _drop_partial_date_indexes  # noqa: E402
+from utilities.pipeline_functions import pipeline_stages  # noqa: E402
+from utilities.prefetch_functions import job_review_columns  # noqa: E402
+
+# The job selection of each step, as the scripts and runPipeline.py pass it to iter_jobs:
+# name: (status, columns, extra condition, condition parameters)
+STEP_SELECTIONS = {"Step 1 prefetch": ("Step 1 - JD Review", ("job_description",) + job_review_columns, None, ())}
+STEP_SELECTIONS.update((status, (status, columns, where, parameters))
+                       for status, (queue, columns, where, parameters) in pipeline_stages.items())
+
+# The queue counts apply4jobs.py makes before importing a step
+QUEUE_COUNTS = {f"count {command}": (status, where, parameters)
+                for command, (script, help_text, status, where, parameters) in commands.items()
+                if status is not None or where is not None}
+
+# Share of jobs per status; finished jobs dominate a long-running database
+STATUS_WEIGHTS = {
+    "Bad Fit": 55,
+    "Step 6 - Follow-Up": 30,
+    "Applied": 12,
+    "Step 1 - JD Review": 1,
+    "Step 2 - Resume": 0.5,
+    "Step 3 - Apply": 0.5,
+    "Step 4 - DM": 0.5,
+    "Step 5 - Email": 0.5,
+}
+
+WORDS = ("product platform api roadmap stakeholder customer data growth strategy experiment launch team metrics "
+         "cloud integration partner enterprise mobile analytics pricing").split()
+
+
+def seed(conn, rows):
+    rng = random.Random(42)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=rows)
+    description = " ".join(rng.choice(WORDS) for _ in range(400))
+    conn.executemany("INSERT INTO job_applications (company_name, job_title, job_description, company_mission, "
+                     "status, date_applied, date_email_followup, resume) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     ((f"Company {i}", f"Product Manager {i}", description, description[:500], status,
+                       f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}" if rng.random() < 0.5 else None,
+                       f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", description if rng.random() < 0.4 else None)
+                      for i, status in enumerate(statuses)))
+    conn.commit()
+
+
+def time_queries(conn, repeat):
+    # Returns the best time, the row count and the query plan of every selection and count
+    queries = {name: (lambda status=status, columns=columns, where=where, parameters=parameters:
+                      sum(1 for _ in iter_jobs(conn, columns, status=status, where=where, parameters=parameters)))
+               for name, (status, columns, where, parameters) in STEP_SELECTIONS.items()}
+    queries.update((name, lambda status=status, where=where, parameters=parameters:
+                    count_jobs(conn, status=status, where=where, parameters=parameters))
+                   for name, (status, where, parameters) in QUEUE_COUNTS.items())
+    timings = {}
+    for name, query in queries.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            row_count = query()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        # The trace callback receives every statement with its parameters bound, including the column lookups
+        statements = []
+        conn.set_trace_callback(statements.append)
+        query()
+        conn.set_trace_callback(None)
+        statement = next(statement for statement in statements if "FROM job_applications" in statement)
+        plan = " / ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement))
+        timings[name] = (best, row_count, plan)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = sqlite3.connect(str(Path(temp_dir) / "benchmark.db"))
+        for name, value in global_vars.sqlite_pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        migrate(conn)
+
+        start = time.perf_counter()
+        seed(conn, args.rows)
+        print(f"Seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        # Every selection scans job_applications without the status index
+        conn.execute("DROP INDEX job_applications_status")
+        before = time_queries(conn, args.repeat)
+        start = time.perf_counter()
+        with conn:
+            _add_status_and_date_indexes(conn)
+            _drop_partial_date_indexes(conn)
+        print(f"Applied the index migrations in {time.perf_counter() - start:.2f}s")
+        after = time_queries(conn, args.repeat)
+        conn.close()
+
+    print(f"{'query':>18} {'rows':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8}  plan after")
+    for name, (after_time, row_count, plan) in after.items():
+        before_time = before[name][0]
+        print(f"{name:>18} {row_count:>6} {before_time * 1000:>10.2f} {after_time * 1000:>9.2f} "
+              f"{before_time / after_time:>7.1f}x  {plan}")
+
+
+if __name__ == "__main__":
+    main()
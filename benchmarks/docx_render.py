@@ -0,0 +1,105 @@
+"""Compares the per-placeholder replace-and-save approach with the single-pass and compiled renderers.
+
+The legacy run mirrors the original step2: copy the template, call replace_text_in_docx once per placeholder and
+save after the job title, the work experience, the summary, the summary bullets and the skills. The single-pass run
+loads the template, renders every substitution at once and saves once. The compiled run renders from the cached
+compiled template without parsing the docx, and the batch run renders every iteration in a process pool, caching the
+compiled template in a temporary directory rather than global_vars.template_cache_dir.
+All outputs are checked for the same text.
+
+Usage: python benchmarks/docx_render.py [--template data/src/resume_template/Template-ResumeTemplate.docx]
+       [--iterations 20]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.global_variables as global_vars  # noqa: E402
+from docx import Document  # noqa: E402
+from utilities.docx_functions import compile_docx_template, render_docx, render_docx_batch  # noqa: E402
+from utilities.gobal_functions import replace_text_in_docx  # noqa: E402
+
+NUM_BULLETS_PER_ROLE = global_vars.num_bullets_per_role
+
+
+def build_substitutions():
+    # Placeholders grouped in the order step2 fills and saves them
+    groups = [{"jobTitle": "Senior Product Manager"}]
+    groups.append({f"job{role + 1}Achievement{bullet + 1}": f"Delivered outcome {bullet + 1} at company {role + 1} "
+                                                                 f"by leading a cross-functional team."
+                   for role, count in enumerate(NUM_BULLETS_PER_ROLE) for bullet in range(count)})
+    groups.append({"summaryParagraph": "Product leader with a record of shipping platform APIs at scale."})
+    groups.append({f"summaryBullet{i + 1}": f"Summary achievement {i + 1}." for i in range(3)})
+    groups.append({"skillsPlaceHolder": "Product: Roadmaps, Discovery\nPlatform: APIs, AWS\nData: SQL, Python"})
+    return groups
+
+
+def render_legacy(template, output, groups):
+    shutil.copy(template, output)
+    doc = Document(output)
+    for group in groups:
+        for placeholder, replacement in group.items():
+            replace_text_in_docx(doc, placeholder, replacement)
+        doc.save(output)
+
+
+def render_single_pass(template, output, groups):
+    doc = Document(template)
+    render_docx(doc, {placeholder: replacement for group in groups for placeholder, replacement in group.items()})
+    doc.save(output)
+
+
+def render_compiled(compiled_template, output, groups):
+    compiled_template.render({placeholder: replacement for group in groups for placeholder, replacement
+                              in group.items()}, output)
+
+
+def document_text(path):
+    return "\n".join(paragraph.text for paragraph in Document(path).paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--template", default="data/src/resume_template/Template-ResumeTemplate.docx")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    groups = build_substitutions()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outputs = {}
+        results = {}
+        compiled_template = compile_docx_template(args.template)
+        for name, renderer in (("legacy", render_legacy), ("single-pass", render_single_pass),
+                               ("compiled", lambda template, output, groups: render_compiled(compiled_template,
+                                                                                             output, groups))):
+            outputs[name] = str(Path(temp_dir) / f"{name}.docx")
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                renderer(args.template, outputs[name], groups)
+            elapsed = time.perf_counter() - start
+            results[name] = elapsed
+            print(f"{name:>11}: {elapsed / args.iterations * 1000:7.1f} ms per resume")
+
+        substitutions = {placeholder: replacement for group in groups for placeholder, replacement in group.items()}
+        batch_jobs = [(str(Path(temp_dir) / f"batch-{i}.docx"), substitutions) for i in range(args.iterations)]
+        start = time.perf_counter()
+        render_docx_batch(args.template, batch_jobs, cache_dir=str(Path(temp_dir) / "template_cache"))
+        elapsed = time.perf_counter() - start
+        outputs["batch"] = batch_jobs[-1][0]
+        results["batch"] = elapsed
+        print(f"{'batch':>11}: {elapsed / args.iterations * 1000:7.1f} ms per resume (process pool, incl. startup)")
+
+        legacy_text = document_text(outputs["legacy"])
+        same_text = all(document_text(output) == legacy_text for output in outputs.values())
+        print("speedup over legacy: " + ", ".join(f"{name} {results['legacy'] / elapsed:.1f}x"
+                                                   for name, elapsed in results.items() if name != "legacy")
+              + f"; identical text: {same_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Runs Steps 1 to 5 end to end for synthetic jobs against a fake model and fails when performance regresses.
+
+Seeds a temporary workspace with a database of N jobs, a parsed resume and the resume template, answers every
+input() prompt from a script and replaces the Gemini model with ScriptedGenerativeModel, then runs each step script
+the way it runs from the command line. Reports jobs per hour, model calls per job, and the time spent in the
+db_functions helpers and in rendering DOCX resumes.
+
+Each run is appended to the results file. The first run of a configuration becomes its baseline, and later runs
+exit with status 1 when a metric is more than --threshold worse than the baseline.
+
+Usage: python benchmarks/end_to_end.py [--jobs 10] [--latency 0.05] [--distribution lognormal]
+       [--step2-args "--pipeline --batch-bullets role"] [--threshold 0.2] [--update-baseline]
+"""
+import argparse
+import builtins
+import contextlib
+import datetime
+import functools
+import json
+import os
+import random
+import runpy
+import shlex
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+repo_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(repo_dir))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+import variables.global_variables as global_vars  # noqa: E402
+import utilities.db_functions as db_functions  # noqa: E402
+import utilities.docx_functions as docx_functions  # noqa: E402
+import utilities.gemini_functions as gemini_functions  # noqa: E402
+from benchmarks.fake_gemini import ScriptedGenerativeModel, latency_distributions  # noqa: E402
+import utilities.telemetry_functions as telemetry_functions  # noqa: E402
+
+steps = (
+    ("Step 1 - JD Review", "step1_reviewJobDescriptions.py"),
+    ("Step 2 - Resume", "step2_createResume.py"),
+    ("Step 3 - Apply", "step3_apply.py"),
+    ("Step 4 - DM", "step4_DM.py"),
+    ("Step 5 - Email", "step5_Email.py"),
+)
+final_status = "Step 6 - Follow-Up"
+
+# Metric: (higher is better, absolute change ignored as noise)
+checked_metrics = {
+    "jobs_per_hour": (True, 0.0),
+    "model_calls_per_job": (False, 0.0),
+    "db_seconds_per_job": (False, 0.002),
+    "docx_seconds_per_job": (False, 0.005),
+}
+
+topics = {
+    "payments": "payments checkout fraud ledger settlement merchants compliance reconciliation chargebacks",
+    "marketplace": "marketplace drivers riders matching pricing supply demand dispatch incentives",
+    "platform": "platform developer integrations reliability latency observability partners tooling",
+    "growth": "experimentation funnels onboarding retention activation analytics lifecycle referrals",
+    "data": "pipelines warehouse governance privacy machine learning models metrics forecasting",
+}
+
+timings = {"db": 0.0, "docx": 0.0}
+_timings_lock = threading.Lock()
+
+
+def _add_time(kind, seconds):
+    with _timings_lock:
+        timings[kind] += seconds
+
+
+def timed(kind, function):
+    # Adds the time spent in each call of the function to timings[kind]
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _add_time(kind, time.perf_counter() - start)
+    return wrapper
+
+
+def timed_iterator(kind, function):
+    # Adds the time spent producing each item, but not the time the caller spends on it, to timings[kind]
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        iterator = iter(function(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, wrapper)
+            _add_time(kind, time.perf_counter() - start)
+            if item is wrapper:
+                return
+            yield item
+    return wrapper
+
+
+def install_timers():
+    # Patched before the step scripts import the helpers by name
+    for name in ("connect", "count_jobs", "update_job", "update_jobs"):
+        setattr(db_functions, name, timed("db", getattr(db_functions, name)))
+    db_functions.iter_jobs = timed_iterator("db", db_functions.iter_jobs)
+    docx_functions.load_compiled_template = timed("docx", docx_functions.load_compiled_template)
+    docx_functions.CompiledDocxTemplate.render = timed("docx", docx_functions.CompiledDocxTemplate.render)
+
+
+class ScriptedInput:
+    """Answers the input() prompts of Steps 1 to 5 like a user who accepts every job and picks enhanced options.
+
+    Args:
+        think_time (float, optional): Seconds the user takes to answer each prompt. Defaults to 0.
+    """
+
+    def __init__(self, think_time=0.0):
+        self.think_time = think_time
+        self.prompts = 0
+        self._choice = 0
+
+    def __call__(self, prompt=""):
+        self.prompts += 1
+        time.sleep(self.think_time)
+        if prompt.startswith("Choose an option"):
+            # Option 0 is the original bullet, so cycle through the first generated options
+            self._choice = self._choice % 3 + 1
+            return str(self._choice)
+        if prompt.startswith("Enter LinkedIn post url"):
+            return "https://www.linkedin.com/posts/benchmark"
+        if prompt.startswith("Do you want to process this item?") or prompt.endswith("(y/n)?"):
+            return "y"
+        raise RuntimeError(f"No scripted answer for the prompt: {prompt!r}")
+
+
+def seed_workspace(jobs, seed):
+    # Creates the database, config, parsed resume and resume template in the current directory
+    rng = random.Random(seed)
+    topic_words = {topic: words.split() for topic, words in topics.items()}
+
+    Path(global_vars.resume_template_file).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(repo_dir / "data/src/resume_template/Template-ResumeTemplate.docx", global_vars.resume_template_file)
+    Path(global_vars.sqlite_db_file).parent.mkdir(parents=True, exist_ok=True)
+
+    work_experience = []
+    for role_index, num_of_bullets in enumerate(global_vars.num_bullets_per_role):
+        achievements = []
+        for bullet_index in range(num_of_bullets * 3):
+            topic = rng.choice(list(topic_words))
+            terms = rng.sample(topic_words[topic], 3)
+            achievements.append(f"Led {terms[0]} work across {terms[1]} and {terms[2]}, improving results by "
+                                f"{rng.randint(5, 60)}% for role {role_index} bullet {bullet_index}")
+        work_experience.append({"organization": f"Company {role_index}", "job_title": f"Product Manager {role_index}",
+                                "dates": {"start_date": f"{2010 + role_index}-01-01",
+                                          "end_date": f"{2011 + role_index}-01-01", "months_in_position": 12},
+                                "job_description": "\n".join(achievements)})
+    raw_text = "\n".join(role["job_description"] for role in work_experience)
+    with open(Path(global_vars.sqlite_db_file).parent / "Benchmark Resume.json", "w") as file:
+        json.dump({"data": {"raw_text": raw_text, "work_experience": work_experience}}, file)
+
+    conn = db_functions.connect()
+    with conn:
+        conn.executemany("INSERT INTO config (key, value) VALUES (?, ?)",
+                         (("full_resume_file_name", "Benchmark Resume"), ("google_token", "benchmark")))
+        rows = []
+        for job_index in range(jobs):
+            topic = rng.choice(list(topic_words))
+            sentences = [f"You will own {' and '.join(rng.sample(topic_words[topic], 2))} for {topic} customers."
+                         for _ in range(12)]
+            rows.append(("Uber", f"Senior Product Manager {job_index} - {topic.title()}", " ".join(sentences),
+                         "Reimagine the way the world moves for the better.", "Build with heart. Trust.",
+                         f"Uber launched a new {topic} product this quarter."))
+        conn.executemany("INSERT INTO job_applications (company_name, job_title, job_description, company_mission, "
+                         "company_values, recent_news) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.close()
+
+
+def run_step(script, arguments, verbose):
+    # Runs a step script as __main__ and returns its wall time
+    sys.argv = [script] + arguments
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, \
+            (contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull)):
+        runpy.run_path(str(repo_dir / script), run_name="__main__")
+    return time.perf_counter() - start
+
+
+def run_pipeline(args, model=None):
+    # Returns the metrics of one run in the current directory, by default against a ScriptedGenerativeModel
+    seed_workspace(args.jobs, args.seed)
+    timings.update(db=0.0, docx=0.0)
+    if model is None:
+        model = ScriptedGenerativeModel(latency=args.latency, distribution=args.distribution, seed=args.seed)
+    gemini_functions.setup_model = lambda *setup_args, **setup_kwargs: model
+    builtins.input = ScriptedInput(args.think)
+
+    step_seconds = {}
+    for status, script in steps:
+        if status == "Step 3 - Apply":
+            # The user applies to every job with a resume before Step 3 moves the resume files
+            with sqlite3.connect(global_vars.sqlite_db_file) as conn:
+                conn.execute("UPDATE job_applications SET date_applied = ? WHERE status = ?",
+                             (datetime.date.today().isoformat(), status))
+            conn.close()
+        arguments = shlex.split(args.step2_args) if status == "Step 2 - Resume" else []
+        step_seconds[status] = run_step(script, arguments, args.verbose)
+    db_seconds, docx_seconds = timings["db"], timings["docx"]
+
+    # Write the buffered telemetry before reading the model calls and latency of each step and prompt type
+    telemetry_functions.get_call_recorder().flush()
+    conn = sqlite3.connect(global_vars.sqlite_db_file)
+    completed = conn.execute("SELECT count(*) FROM job_applications WHERE status = ?", (final_status,)).fetchone()[0]
+    model_calls = {}
+    for column in ("step", "prompt_type"):
+        model_calls[column] = {key: (calls, seconds) for key, calls, seconds in conn.execute(
+            f"SELECT {column}, count(*), sum(latency_seconds) FROM llm_calls GROUP BY {column} ORDER BY {column}")}
+    conn.close()
+
+    total_seconds = sum(step_seconds.values())
+    return {
+        "jobs": args.jobs,
+        "completed_jobs": completed,
+        "seconds": round(total_seconds, 3),
+        "jobs_per_hour": round(completed / total_seconds * 3600, 1),
+        "model_calls_per_job": round(sum(calls for calls, seconds in model_calls["step"].values()) / args.jobs, 2),
+        "db_seconds_per_job": round(db_seconds / args.jobs, 4),
+        "docx_seconds_per_job": round(docx_seconds / args.jobs, 4),
+        "step_seconds": {status: round(seconds, 3) for status, seconds in step_seconds.items()},
+        "model_calls_by_step": {step: calls for step, (calls, seconds) in model_calls["step"].items()},
+        "model_seconds_by_step": {step: round(seconds, 3) for step, (calls, seconds) in model_calls["step"].items()},
+        "model_calls_by_prompt_type": {prompt_type: calls
+                                       for prompt_type, (calls, seconds) in model_calls["prompt_type"].items()},
+    }
+
+
+def run_in_workspace(args, model=None):
+    # Runs the pipeline in a temporary directory and returns its metrics
+    original_dir = os.getcwd()
+    original_input = builtins.input
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            return run_pipeline(args, model)
+        finally:
+            # Write the buffered telemetry while the workspace database is still reachable, and let the next run
+            # record to its own workspace
+            telemetry_functions.get_call_recorder().flush()
+            telemetry_functions._default_recorder = None
+            builtins.input = original_input
+            os.chdir(original_dir)
+
+
+def find_regressions(metrics, baseline, threshold):
+    # Returns a description of every checked metric more than threshold worse than the baseline
+    regressions = []
+    for name, (higher_is_better, noise) in checked_metrics.items():
+        if name not in baseline:
+            continue
+        worse_by = baseline[name] - metrics[name] if higher_is_better else metrics[name] - baseline[name]
+        if worse_by > noise and worse_by > threshold * abs(baseline[name]):
+            regressions.append(f"{name}: {baseline[name]} -> {metrics[name]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10, help="Number of synthetic jobs.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean seconds per model call.")
+    parser.add_argument("--distribution", choices=latency_distributions, default="lognormal")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic jobs and latencies.")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds the user takes to answer each prompt.")
+    parser.add_argument("--step2-args", default="", help='Arguments for Step 2, such as "--pipeline".')
+    parser.add_argument("--results", default=str(repo_dir / "benchmarks/results/end_to_end.json"),
+                        help="JSON file holding the baseline of each configuration and the run history.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Fail when a metric is worse than the baseline by more than this fraction.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the step scripts.")
+    args = parser.parse_args()
+
+    # Measure the pipeline, not the response cache or the API quota; telemetry counts the model calls
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = True
+    install_timers()
+    metrics = run_in_workspace(args)
+
+    print(f"{metrics['completed_jobs']} of {args.jobs} jobs completed in {metrics['seconds']:.2f}s: "
+          f"{metrics['jobs_per_hour']:.0f} jobs/hour, {metrics['model_calls_per_job']:.1f} model calls per job, "
+          f"DB {metrics['db_seconds_per_job'] * 1e3:.1f} ms per job, "
+          f"DOCX {metrics['docx_seconds_per_job'] * 1e3:.1f} ms per job")
+    for status, seconds in metrics["step_seconds"].items():
+        print(f"  {status:<20} {seconds:7.2f}s  {metrics['model_calls_by_step'].get(status, 0):>5} model calls")
+
+    # Compare with the baseline of the same configuration and append the run to the history
+    configuration = (f"jobs={args.jobs} latency={args.latency} distribution={args.distribution} seed={args.seed} "
+                     f"think={args.think} step2_args={args.step2_args!r}")
+    results_file = Path(args.results)
+    results = {"baselines": {}, "runs": []}
+    if results_file.exists():
+        results = json.loads(results_file.read_text())
+    baseline = results["baselines"].get(configuration)
+    regressions = [] if baseline is None else find_regressions(metrics, baseline, args.threshold)
+    if baseline is None or args.update_baseline:
+        results["baselines"][configuration] = metrics
+        print(f"Stored the baseline for {configuration}")
+    results["runs"] = (results["runs"] + [{"date": datetime.datetime.now().isoformat(timespec="seconds"),
+                                           "configuration": configuration, "metrics": metrics,
+                                           "regressions": regressions}])[-100:]
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    results_file.write_text(json.dumps(results, indent=2))
+
+    if metrics["completed_jobs"] != args.jobs:
+        print(f"FAILED: only {metrics['completed_jobs']} of {args.jobs} jobs reached {final_status}")
+        sys.exit(1)
+    if regressions and not args.update_baseline:
+        print(f"FAILED: worse than the baseline by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+
+class FakeResponse:
+    """Minimal stand-in for a GenerateContentResponse."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel that sleeps instead of calling the API.
+
+    With stream=True the text is returned in chunks of a few words, with the latency spread evenly over them.
+
+    Args:
+        latency (float, optional): Seconds each generate_content call takes. Defaults to 0.5.
+        text (str, optional): The text returned for every prompt. Defaults to "42.00".
+        chunk_words (int, optional): Words per streamed chunk. Defaults to 5.
+    """
+
+    def __init__(self, latency=0.5, text="42.00", chunk_words=5):
+        self.model_name = "models/fake"
+        self.latency = latency
+        self.text = text
+        self.chunk_words = chunk_words
+        self.calls = 0
+
+    def generate_content(self, prompt_parts, stream=False):
+        self.calls += 1
+        if stream:
+            return self._stream()
+        time.sleep(self.latency)
+        return FakeResponse(self.text)
+
+    def _stream(self, text=None, latency=None):
+        text = self.text if text is None else text
+        latency = self.latency if latency is None else latency
+        words = text.split(" ")
+        chunks = [" ".join(words[i:i + self.chunk_words]) + " " for i in range(0, len(words), self.chunk_words)]
+        chunks[-1] = chunks[-1][:-1]
+        for chunk in chunks:
+            time.sleep(latency / len(chunks))
+            yield FakeResponse(chunk)
+
+    async def generate_content_async(self, prompt_parts):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return FakeResponse(self.text)
+
+
+latency_distributions = ("fixed", "uniform", "lognormal")
+
+
+class ScriptedGenerativeModel(FakeGenerativeModel):
+    """Fake model for whole-pipeline runs, answering each prompt with a canned response of the shape its caller parses.
+
+    The prompt type is recognised from the prompt text: the achievement filter returns the first achievements it
+    was given, the batched bullet enhancement returns JSON, the fit score returns a number, the keywords are the
+    most frequent words of the job description, and every other prompt returns a list of lines. Latencies are drawn
+    from a seeded distribution around the mean, so runs with the same seed take the same time.
+
+    Args:
+        latency (float, optional): Mean seconds per call. Defaults to 0.5.
+        distribution (str, optional): "fixed", "uniform" (0.5 to 1.5 times the mean) or "lognormal" (sigma 0.5).
+            Defaults to "fixed".
+        latency_by_prompt_type (dict, optional): Mean seconds for specific prompt types, such as
+            {"cover_letter": 4.0}. Defaults to None.
+        seed (int, optional): Seed of the latency and fit score draws. Defaults to 0.
+        chunk_words (int, optional): Words per streamed chunk. Defaults to 5.
+    """
+
+    def __init__(self, latency=0.5, distribution="fixed", latency_by_prompt_type=None, seed=0, chunk_words=5):
+        if distribution not in latency_distributions:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        super().__init__(latency, chunk_words=chunk_words)
+        self.distribution = distribution
+        self.latency_by_prompt_type = latency_by_prompt_type or {}
+        self.calls_by_prompt_type = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt_parts, stream=False):
+        latency, text = self._respond(prompt_parts)
+        if stream:
+            return self._stream(text, latency)
+        time.sleep(latency)
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt_parts):
+        latency, text = self._respond(prompt_parts)
+        await asyncio.sleep(latency)
+        return FakeResponse(text)
+
+    def _respond(self, prompt_parts):
+        # Returns the latency and text of one call; calls arrive from the background loop and worker threads
+        prompt = "".join(str(part) for part in prompt_parts)
+        prompt_type = _prompt_type(prompt)
+        with self._lock:
+            self.calls += 1
+            self.calls_by_prompt_type[prompt_type] = self.calls_by_prompt_type.get(prompt_type, 0) + 1
+            mean = self.latency_by_prompt_type.get(prompt_type, self.latency)
+            if self.distribution == "uniform":
+                latency = self._random.uniform(0.5 * mean, 1.5 * mean)
+            elif self.distribution == "lognormal":
+                # Centred so the mean latency matches the configured one
+                latency = self._random.lognormvariate(0, 0.5) * mean / 1.1331
+            else:
+                latency = mean
+            fit_score = self._random.uniform(55, 95)
+        return latency, _canned_response(prompt_type, prompt, fit_score)
+
+
+def _prompt_type(prompt):
+    if prompt.startswith("Input: Achievements: "):
+        return "achievement_filter"
+    if "Use each achievement's number as the key" in prompt:
+        return "bullet_enhancement_batch"
+    if prompt.startswith("Requirement: "):
+        return "fit_score"
+    if "Hard keywords: A list of specific skills" in prompt:
+        return "keywords"
+    if "LinkedIn comment" in prompt:
+        return "linkedin_comment"
+    if "Cover Letter" in prompt:
+        return "cover_letter"
+    return "other"
+
+
+def _canned_response(prompt_type, prompt, fit_score):
+    if prompt_type == "achievement_filter":
+        count = int(prompt.split("select the top ")[1].split(" ")[0])
+        achievements = prompt[len("Input: Achievements: "):prompt.index("\nJob Description: ")].splitlines()
+        return "\n".join(f"- {achievement.strip()}" for achievement in achievements[:count])
+    if prompt_type == "bullet_enhancement_batch":
+        numbered = prompt.split("Original Achievements:\n")[1].split("\nTask:")[0].splitlines()
+        return json.dumps({line.split(":")[0]: [f"{line.split(': ', 1)[1]} (version {i})" for i in range(1, 6)]
+                           for line in numbered})
+    if prompt_type == "fit_score":
+        return f"{fit_score:.2f}"
+    if prompt_type == "keywords":
+        job_description = prompt.split("Job Description: ")[1].split("\n\n")[0]
+        words = re.findall(r"[a-z]{5,}", job_description.lower())
+        ranked = sorted(set(words), key=lambda word: (-words.count(word), word))
+        return "Hard keywords: " + ", ".join(ranked[:8])
+    if prompt_type == "cover_letter":
+        return " ".join(f"Sentence {i} of the cover letter, about the role and the company." for i in range(1, 16))
+    return "\n".join(f"- Generated line {i} for this prompt, with a measurable result of {i * 10}%."
+                      for i in range(1, 7))
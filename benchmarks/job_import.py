@@ -0,0 +1,81 @@
+"""Measures importing job postings into an empty database and importing them again.
+
+Writes synthetic CSV and JSONL files, then imports each into a fresh database in a separate process, reporting the
+time, the postings per second and the peak resident set size. The second import of the same file updates nothing,
+so it measures the cost of the business key lookups alone.
+
+Usage: python benchmarks/job_import.py [--postings 100000] [--words 150]
+"""
+import argparse
+import csv
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+WORDS = ("product platform api roadmap stakeholder customer data growth strategy experiment launch team metrics "
+         "cloud integration partner enterprise mobile analytics pricing").split()
+
+# Run in a fresh interpreter so each measurement has its own peak RSS
+MEASURE = """
+import resource, sys, time
+sys.path.insert(0, {repo!r})
+from utilities.db_functions import connect
+from utilities.import_functions import import_job_postings, read_job_postings
+conn = connect({db_file!r})
+start = time.perf_counter()
+counts = import_job_postings(conn, read_job_postings({file_name!r}))
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, counts.inserted, counts.updated, counts.skipped)
+"""
+
+
+def postings(count, words):
+    rng = random.Random(42)
+    for i in range(count):
+        yield {"company": f"Company {i % (count // 4 or 1)}", "title": f"Product Manager {i}",
+               "url": f"https://jobs.example.com/{i}",
+               "description": " ".join(rng.choice(WORDS) for _ in range(words))}
+
+
+def measure(db_file, file_name):
+    output = subprocess.run([sys.executable, "-c", MEASURE.format(repo=str(REPO_DIR), db_file=db_file,
+                                                                  file_name=file_name)],
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), int(output[1]) / 1024, output[2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--postings", type=int, default=100000, help="Postings per file.")
+    parser.add_argument("--words", type=int, default=150, help="Words per job description.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_file = Path(work_dir, "postings.csv")
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["company", "title", "url", "description"])
+            writer.writeheader()
+            writer.writerows(postings(args.postings, args.words))
+        jsonl_file = Path(work_dir, "postings.jsonl")
+        with open(jsonl_file, "w") as f:
+            f.writelines(json.dumps(posting) + "\n" for posting in postings(args.postings, args.words))
+        print(f"{args.postings} postings: {csv_file.stat().st_size / 1e6:.0f} MB CSV, "
+              f"{jsonl_file.stat().st_size / 1e6:.0f} MB JSONL")
+
+        for file_name in (csv_file, jsonl_file):
+            db_file = str(Path(work_dir, f"{file_name.suffix[1:]}.db"))
+            for run in ("first import", "import again"):
+                elapsed, peak_mb, (inserted, updated, skipped) = measure(db_file, str(file_name))
+                print(f"{file_name.suffix[1:]:>5} {run:>12}: {elapsed:6.1f}s, {args.postings / elapsed:8.0f} "
+                      f"postings/s, peak RSS {peak_mb:5.0f} MB ({inserted} inserted, {updated} updated, "
+                      f"{skipped} skipped)")
+
+
+if __name__ == "__main__":
+    main()
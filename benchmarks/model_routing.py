@@ -0,0 +1,81 @@
+"""Compares the latency of each step with every prompt on the default model and with the model routing table.
+
+Runs the end-to-end benchmark twice through setup_model with a stub backend whose clients are
+ScriptedGenerativeModel instances: first without routes, then with gemini_cfg.model_routes. The default model
+answers in --latency seconds on average and every routed model in --routed-latency seconds, standing in for the
+measured latencies of the two models. Reports the wall time and the summed model call latency of each step, and the
+saving of the routing table; steps without routed prompts differ only by timing noise.
+
+Usage: python benchmarks/model_routing.py [--jobs 5] [--latency 0.1] [--routed-latency 0.03]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+from benchmarks import end_to_end  # noqa: E402
+from benchmarks.fake_gemini import ScriptedGenerativeModel, latency_distributions  # noqa: E402
+from utilities.gemini_functions import setup_model  # noqa: E402
+from utilities.model_functions import StubBackend  # noqa: E402
+
+
+def scripted_backend(args):
+    # Creates one scripted client per model and generation config, slower for the default model
+    def create_model(model_name, generation_config, safety_settings):
+        latency = args.latency if model_name == gemini_cfg.default_model_name else args.routed_latency
+        model = ScriptedGenerativeModel(latency=latency, distribution=args.distribution, seed=args.seed)
+        model.model_name = f"models/{model_name}"
+        return model
+    return StubBackend(model_factory=create_model)
+
+
+def saving(before, after):
+    # Steps that take next to no time have no meaningful saving
+    return f"{(before - after) / before:6.0%}" if before >= 0.01 else f"{'-':>6}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=5, help="Number of synthetic jobs.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Mean seconds per call of the default model.")
+    parser.add_argument("--routed-latency", type=float, default=0.03,
+                        help="Mean seconds per call of the models in the routing table.")
+    parser.add_argument("--distribution", choices=latency_distributions, default="fixed",
+                        help="Latency distribution; with a random one the draws of the two runs differ.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic jobs and latencies.")
+    parser.add_argument("--step2-args", default="", help='Arguments for Step 2, such as "--pipeline".')
+    args = parser.parse_args()
+    args.think = 0.0
+    args.verbose = False
+
+    # Measure the models, not the response cache or the API quota; telemetry records the latency per step
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = True
+    end_to_end.install_timers()
+
+    default_only = end_to_end.run_in_workspace(args, setup_model("benchmark", routes={},
+                                                                 backend=scripted_backend(args)))
+    routed = end_to_end.run_in_workspace(args, setup_model("benchmark", routes=gemini_cfg.model_routes,
+                                                           backend=scripted_backend(args)))
+
+    routed_calls = sum(calls for prompt_type, calls in routed["model_calls_by_prompt_type"].items()
+                       if prompt_type in gemini_cfg.model_routes)
+    print(f"{routed_calls} of {sum(routed['model_calls_by_step'].values())} model calls routed "
+          f"({', '.join(sorted(gemini_cfg.model_routes))})")
+    print(f"{'Step':<20} {'Wall s':>8} {'Routed':>8} {'Saving':>6}   {'Model s':>8} {'Routed':>8} {'Saving':>6}")
+    for step, seconds in default_only["step_seconds"].items():
+        model_seconds = default_only["model_seconds_by_step"].get(step, 0.0)
+        routed_model_seconds = routed["model_seconds_by_step"].get(step, 0.0)
+        print(f"{step:<20} {seconds:>8.2f} {routed['step_seconds'][step]:>8.2f} "
+              f"{saving(seconds, routed['step_seconds'][step])}   {model_seconds:>8.2f} {routed_model_seconds:>8.2f} "
+              f"{saving(model_seconds, routed_model_seconds)}")
+    print(f"{'Total':<20} {default_only['seconds']:>8.2f} {routed['seconds']:>8.2f} "
+          f"{saving(default_only['seconds'], routed['seconds'])}")
+
+
+if __name__ == "__main__":
+    main()
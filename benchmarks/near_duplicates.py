@@ -0,0 +1,88 @@
+"""Measures near-duplicate detection as the number of stored jobs grows.
+
+Seeds databases with reviewed jobs, then adds new Step 1 jobs: half are reposts of a reviewed job with a share of
+their words changed, half are unrelated. Reports the time to index the job descriptions, the time per lookup and
+how many reposts were found, for each database size. Lookup time should stay flat as the database grows.
+
+Usage: python benchmarks/near_duplicates.py [--sizes 1000 10000 50000] [--new-jobs 200] [--edit-rate 0.05]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.db_functions import connect  # noqa: E402
+from utilities.duplicate_functions import index_job_descriptions, reuse_near_duplicate_reviews  # noqa: E402
+
+# A vocabulary large enough that unrelated descriptions share few word sequences, as real ones do
+VOCABULARY = [f"term{index}" for index in range(3000)] + ("product platform api roadmap stakeholder customer data "
+                                                         "growth strategy launch team metrics").split()
+
+
+def description(rng, words=300):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def repost(rng, text, edit_rate):
+    words = text.split()
+    for index in rng.sample(range(len(words)), int(len(words) * edit_rate)):
+        words[index] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def run(size, new_jobs, edit_rate, work_dir):
+    rng = random.Random(size)
+    conn = connect(str(Path(work_dir, f"jobs_{size}.db")))
+    reviewed = [description(rng) for _ in range(size)]
+    conn.executemany("INSERT INTO job_applications (company_name, job_title, job_description, status, "
+                     "ai_requirements, original_fit_score, keywords, guidance) "
+                     "VALUES (?, ?, ?, 'Step 2 - Resume', 'requirements', 80, 'keywords', 'guidance')",
+                     ((f"Company {i}", f"Product Manager {i}", text) for i, text in enumerate(reviewed)))
+    conn.commit()
+
+    start = time.perf_counter()
+    index_job_descriptions(conn)
+    index_time = time.perf_counter() - start
+
+    reposts = {}
+    for i in range(new_jobs):
+        if i % 2 == 0:
+            source = rng.randrange(size)
+            text = repost(rng, reviewed[source], edit_rate)
+        else:
+            source, text = None, description(rng)
+        job_application_id = conn.execute("INSERT INTO job_applications (company_name, job_title, job_description) "
+                                          "VALUES (?, ?, ?)", (f"New {i}", f"Product Manager {i}", text)).lastrowid
+        reposts[job_application_id] = None if source is None else source + 1
+    conn.commit()
+
+    start = time.perf_counter()
+    flagged = reuse_near_duplicate_reviews(conn)
+    lookup_time = time.perf_counter() - start
+    found = sum(1 for job_application_id, duplicate_of, similarity in flagged
+                if reposts[job_application_id] == duplicate_of)
+    expected = sum(1 for source in reposts.values() if source is not None)
+    print(f"{size:>7} stored: indexed in {index_time:6.2f}s ({index_time / size * 1000:.2f} ms/job), "
+          f"{lookup_time / new_jobs * 1000:5.2f} ms per new job, {found}/{expected} reposts found, "
+          f"{len(flagged) - found} false matches")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Reviewed jobs stored.")
+    parser.add_argument("--new-jobs", type=int, default=200, help="New Step 1 jobs looked up.")
+    parser.add_argument("--edit-rate", type=float, default=0.05, help="Share of words changed in a repost.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            run(size, args.new_jobs, args.edit_rate, work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measures the time the profiling spans add to each call, with profiling off and on.
+
+Times a function decorated with profiled() against the undecorated function, and a span() block against an empty
+block, first with profiling off, as every step runs without --profile, and then with profiling on.
+
+Usage: python benchmarks/profile_overhead.py [--calls 1000000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utilities.profile_functions as profile_functions  # noqa: E402
+
+
+def parse(text):
+    return text.strip()
+
+
+profiled_parse = profile_functions.profiled("parse")(parse)
+
+
+def time_calls(function, calls):
+    # Returns the mean seconds per call
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(" 42.00 ")
+    return (time.perf_counter() - start) / calls
+
+
+def time_spans(calls, with_span):
+    # Returns the mean seconds per block
+    span = profile_functions.span
+    start = time.perf_counter()
+    for _ in range(calls):
+        if with_span:
+            with span("db_read"):
+                pass
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    time_calls(profiled_parse, args.calls // 10)  # warm up
+    plain = time_calls(parse, args.calls)
+    disabled = time_calls(profiled_parse, args.calls)
+    empty_block = time_spans(args.calls, with_span=False)
+    disabled_span = time_spans(args.calls, with_span=True)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        profile_functions.enable_profiling(output_dir=temp_dir)
+        enabled = time_calls(profiled_parse, args.calls // 10)
+        enabled_span = time_spans(args.calls // 10, with_span=True)
+        profile_functions._profiler = None
+
+    print(f"Undecorated call:       {plain * 1e9:8.0f} ns")
+    print(f"Profiling off:          {disabled * 1e9:8.0f} ns per call (+{(disabled - plain) * 1e9:.0f} ns), "
+          f"span +{(disabled_span - empty_block) * 1e9:.0f} ns")
+    print(f"Profiling on:           {enabled * 1e9:8.0f} ns per call (+{(enabled - plain) * 1e9:.0f} ns), "
+          f"span +{(enabled_span - empty_block) * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
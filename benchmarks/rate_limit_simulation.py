@@ -0,0 +1,97 @@
+"""Simulates a burst of concurrent model calls against a fake API that enforces a per-minute quota with 429s.
+
+Runs the same workload twice: once relying on backoff alone and once with the shared rate limiter set to the
+quota. The limiter should sustain throughput close to the quota while keeping the number of 429s near zero.
+
+Usage: python benchmarks/rate_limit_simulation.py [--requests 200] [--quota 1200] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+import utilities.rate_limit_functions as rate_limit_functions  # noqa: E402
+from google.api_core.exceptions import ResourceExhausted  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.gemini_functions import call_generative_api_async, run_on_background_loop  # noqa: E402
+
+
+class RetryDelay:
+    """Mimics the RetryInfo.retry_delay duration attached to quota errors."""
+
+    def __init__(self, seconds):
+        self.seconds = int(seconds)
+        self.nanos = int((seconds - self.seconds) * 1e9)
+
+
+class RetryInfo:
+    def __init__(self, seconds):
+        self.retry_delay = RetryDelay(seconds)
+
+
+class QuotaLimitedModel(FakeGenerativeModel):
+    """Fake model that raises ResourceExhausted once more than quota_per_minute calls start in a rolling minute.
+
+    The quota is enforced in one-second windows of quota_per_minute / 60 calls, and every rejection carries a
+    retry-after hint pointing at the start of the next window.
+    """
+
+    def __init__(self, quota_per_minute, latency=0.05):
+        super().__init__(latency=latency)
+        self.per_second = quota_per_minute / 60
+        self.rejections = 0
+        self._window = None
+        self._window_calls = 0
+
+    async def generate_content_async(self, prompt_parts):
+        now = time.monotonic()
+        window = int(now)
+        if window != self._window:
+            self._window, self._window_calls = window, 0
+        if self._window_calls >= self.per_second:
+            self.rejections += 1
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).",
+                                    details=[RetryInfo(window + 1 - now)])
+        self._window_calls += 1
+        return await super().generate_content_async(prompt_parts)
+
+
+async def run_workload(model, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(call_generative_api_async(model, f"Prompt {i}", semaphore, max_retries=20,
+                                                            retry_delay=0.25)
+                                  for i in range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--quota", type=int, default=1200, help="requests per minute accepted by the fake API")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    # Measure the retry engine, not the response cache
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.telemetry_enabled = False
+
+    for name, requests_per_minute in (("backoff only", None), ("rate limiter", args.quota)):
+        # Each scenario starts with its own limiter and a closed circuit breaker; the breaker stays at its defaults
+        # apart from a cooldown scaled to the simulated one-second quota windows
+        rate_limit_functions._shared_limiter = rate_limit_functions.RateLimiter(requests_per_minute)
+        rate_limit_functions._shared_circuit_breaker = rate_limit_functions.CircuitBreaker(cooldown_seconds=1)
+
+        model = QuotaLimitedModel(args.quota)
+        start = time.perf_counter()
+        run_on_background_loop(run_workload(model, args.requests, args.concurrency)).result()
+        elapsed = time.perf_counter() - start
+        throughput = args.requests / elapsed * 60
+        print(f"{name:>12}: {args.requests} requests in {elapsed:6.2f}s, {model.rejections:4d} 429s, "
+              f"{throughput:6.0f} req/min ({throughput / args.quota * 100:3.0f}% of quota)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compares loading the full resume from the parser's JSON output with loading the compiled resume profile.
+
+Writes a synthetic parsed resume shaped like the Affinda output, with per-word and per-field metadata, then reads the
+raw text and work experience in a fresh process per mode and reports the load time and the peak memory allocated.
+
+Usage: python benchmarks/resume_profile.py [--roles 6] [--achievements 12] [--runs 5]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = ("product platform api roadmap stakeholder customer data growth strategy experiment launch team metrics "
+         "cloud integration partner enterprise mobile analytics pricing").split()
+
+# Run in a fresh interpreter so neither mode benefits from the other's caches
+MEASURE = """
+import json, sys, time, tracemalloc
+sys.path.insert(0, {repo!r})
+from utilities.resume_functions import load_resume_profile
+tracemalloc.start()
+start = time.perf_counter()
+if {mode!r} == 'json':
+    with open({data_dir!r} + '/Full.json') as f:
+        loaded_resume = json.load(f)
+    raw_text = str(loaded_resume['data']['raw_text'])
+    work_experience = loaded_resume['data']['work_experience']
+else:
+    profile = load_resume_profile('Full', {data_dir!r})
+    raw_text, work_experience = profile.raw_text, profile.work_experience
+elapsed = time.perf_counter() - start
+print(elapsed, tracemalloc.get_traced_memory()[1], len(raw_text), len(work_experience))
+"""
+
+
+def fake_resume(roles, achievements):
+    rng = random.Random(42)
+
+    def field(raw):
+        # Parsed fields carry their position and confidence alongside the value
+        return {"raw": raw, "parsed": raw, "confidence": rng.random(), "page_index": 0,
+                "rectangle": {"x0": rng.random(), "y0": rng.random(), "x1": rng.random(), "y1": rng.random()}}
+
+    work_experience = []
+    for role in range(roles):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(25)) for _ in range(achievements)]
+        work_experience.append({"organization": f"Company {role}", "job_title": f"Product Manager {role}",
+                                "location": field("Boston, MA"),
+                                "dates": {"start_date": "2020-01-01", "end_date": "2022-01-01",
+                                          "months_in_position": 24, "is_current": False},
+                                "job_description": "\n".join(f"• {line}" for line in lines),
+                                "achievements": [field(line) for line in lines]})
+    raw_text = "\n".join(f"{role['organization']}\n{role['job_description']}" for role in work_experience)
+    words = [{"text": word, "page_index": 0, "confidence": rng.random(),
+              "rectangle": {"x0": rng.random(), "y0": rng.random(), "x1": rng.random(), "y1": rng.random()},
+              "line_index": index // 12, "block_index": index // 120} for index, word in enumerate(raw_text.split())]
+    return {"meta": {"identifier": "abc", "file_name": "Full.docx", "pages": [{"id": 1, "width": 612, "height": 792}]},
+            "data": {"raw_text": raw_text, "work_experience": work_experience,
+                     "sections": [field(line) for line in raw_text.splitlines()], "words": words}}
+
+
+def measure(mode, data_dir, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", MEASURE.format(repo=str(Path(__file__).resolve().parent.parent),
+                                                                      mode=mode, data_dir=data_dir)],
+                                capture_output=True, text=True, check=True).stdout.split()
+        results.append((float(output[0]), int(output[1])))
+    return min(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", type=int, default=6, help="Roles in the synthetic resume.")
+    parser.add_argument("--achievements", type=int, default=12, help="Achievements per role.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode; the fastest is reported.")
+    args = parser.parse_args()
+
+    from utilities.resume_functions import load_resume_profile
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        source_file = Path(data_dir, "Full.json")
+        source_file.write_text(json.dumps(fake_resume(args.roles, args.achievements), indent=4))
+        # Compile the profile once, as the first step run after parsing the resume does
+        load_resume_profile("Full", data_dir)
+        profile_size = Path(data_dir, "Full.profile.pickle").stat().st_size
+
+        print(f"Parsed resume: {source_file.stat().st_size / 1024:.0f} KB JSON, "
+              f"{profile_size / 1024:.0f} KB compiled profile")
+        for mode, label in (("json", "json.load"), ("profile", "load_resume_profile")):
+            elapsed, peak = measure(mode, data_dir, args.runs)
+            print(f"{label:>20}: {elapsed * 1000:7.2f} ms, peak {peak / 1024:8.0f} KB allocated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compares peak memory of loading pending jobs with pandas SELECT * against streaming projected records.
+
+Seeds a temporary database with pending Step 2 jobs carrying realistic BLOB columns, then loops over them in a fresh
+process per mode, reading the columns step2 uses, and reports the peak resident set size of each process.
+
+Pages of the memory-mapped database file count toward RSS up to the mmap_size pragma, although they are file-backed
+page cache the OS can drop, so iter_jobs is also measured with memory mapping turned off.
+
+Usage: python benchmarks/row_loading.py [--rows 50000]
+"""
+import argparse
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Mirrors resume_job_columns in utilities/pipeline_functions.py, the columns Step 2 reads for each job
+STEP2_COLUMNS = ('company_name', 'job_title', 'job_description', 'guidance', 'keywords', 'company_mission',
+                 'company_values')
+
+WORDS = ("product platform api roadmap stakeholder customer data growth strategy experiment launch team metrics "
+         "cloud integration partner enterprise mobile analytics pricing").split()
+
+
+def seed(db_file, rows):
+    from utilities.db_functions import connect
+
+    rng = random.Random(42)
+
+    def text(words):
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    conn = connect(db_file)
+    blob_columns = ('job_description', 'company_mission', 'company_values', 'recent_news', 'ai_requirements',
+                    'keywords', 'guidance', 'resume')
+    conn.executemany(f"INSERT INTO job_applications (company_name, job_title, status, {', '.join(blob_columns)}) "
+                     f"VALUES (?, ?, 'Step 2 - Resume', {', '.join('?' for _ in blob_columns)})",
+                     ((f"Company {i}", f"Product Manager {i}", text(600), text(60), text(60), text(150),
+                       text(200), text(60), text(200), text(700)) for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def load_with_pandas(db_file):
+    import sqlite3
+    import pandas as pd
+
+    conn = sqlite3.connect(db_file)
+    df = pd.read_sql_query("SELECT * FROM job_applications WHERE status = 'Step 2 - Resume'", conn)
+    total = 0
+    for index, row in df.iterrows():
+        total += sum(len(str(row[column])) for column in STEP2_COLUMNS)
+    conn.close()
+    return total
+
+
+def load_with_iter_jobs(db_file):
+    from utilities.db_functions import connect, iter_jobs
+
+    conn = connect(db_file)
+    total = 0
+    for row in iter_jobs(conn, STEP2_COLUMNS, status='Step 2 - Resume'):
+        total += sum(len(str(row[column])) for column in STEP2_COLUMNS)
+    conn.close()
+    return total
+
+
+def run_mode(mode, db_file):
+    # Runs in a fresh process so each mode's peak RSS is measured on its own
+    if mode == "iter_jobs-no-mmap":
+        import variables.global_variables as global_vars
+        global_vars.sqlite_pragmas["mmap_size"] = 0
+    loader = {"pandas": load_with_pandas, "iter_jobs": load_with_iter_jobs,
+              "iter_jobs-no-mmap": load_with_iter_jobs}[mode]
+    start = time.perf_counter()
+    total = loader(db_file)
+    elapsed = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kilobytes on Linux
+    print(f"{mode:>17}: peak RSS {peak_rss_mb:7.1f} MB, {elapsed:5.2f}s, {total} characters read")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--mode", choices=("pandas", "iter_jobs", "iter_jobs-no-mmap"), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.db)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = str(Path(temp_dir) / "benchmark.db")
+        seed(db_file, args.rows)
+        print(f"Seeded {args.rows} pending jobs ({Path(db_file).stat().st_size / 1024 / 1024:.0f} MB database)")
+        for mode in ("pandas", "iter_jobs", "iter_jobs-no-mmap"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, "--db", db_file], check=True)
+
+
+if __name__ == "__main__":
+    main()
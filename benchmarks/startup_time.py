@@ -0,0 +1,90 @@
+"""Measures the startup time of an empty apply4jobs run and fails when it exceeds a budget.
+
+Every step command is run against an empty database with `python -X importtime`. The script reports the wall time,
+the slowest imports and checks that none of the heavy step dependencies were imported. The imports the step scripts
+pull in once they have work are measured for comparison.
+
+Usage: python benchmarks/startup_time.py [--budget 0.5] [--runs 5]
+Exits with status 1 when an empty run is over budget or imports a heavy module.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+STEP_COMMANDS = ("review", "resume", "apply", "dm", "email", "render", "run")
+
+# Modules the step scripts need only once they have work
+HEAVY_MODULES = ("google.generativeai", "google.api_core", "docx", "numpy", "pandas", "affinda")
+
+# What the step scripts import up front, for comparison
+EAGER_IMPORTS = ("import utilities.gemini_functions, utilities.bullet_functions, utilities.docx_functions, "
+                 "utilities.fit_score_functions")
+
+
+def run_with_importtime(arguments, cwd):
+    # Returns the wall time and the {module: cumulative microseconds} import times of one run
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + arguments, cwd=cwd, capture_output=True,
+                            text=True, env=dict(os.environ, PYTHONPATH=str(REPO_DIR)))
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(arguments)} failed:\n{result.stdout}\n{result.stderr}")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, module = line[len("import time:"):].split("|")
+        imports[module.strip()] = int(cumulative)
+    return elapsed, imports, result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=0.5, help="Maximum seconds for an empty run.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command; the fastest is reported.")
+    args = parser.parse_args()
+
+    from utilities.db_functions import connect
+
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        # An initialised database with nothing pending
+        Path(work_dir, "data/target").mkdir(parents=True)
+        connect(str(Path(work_dir, "data/target/Apply4Job.db"))).close()
+
+        for command in STEP_COMMANDS:
+            runs = [run_with_importtime([str(REPO_DIR / "apply4jobs.py"), command], work_dir)
+                    for _ in range(args.runs)]
+            elapsed, imports, output = min(runs, key=lambda run: run[0])
+            heavy = sorted(module for module in imports if module.split(".")[0] in HEAVY_MODULES
+                           or module.startswith(HEAVY_MODULES))
+            slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:3]
+            print(f"{command:>7}: {elapsed * 1000:6.0f} ms, {len(imports):3d} modules, slowest imports: "
+                  + ", ".join(f"{module} {cumulative / 1000:.0f} ms" for module, cumulative in slowest))
+            if output != f"Nothing to do for {command}.":
+                failures.append(f"{command} did not short-circuit: {output!r}")
+            if elapsed > args.budget:
+                failures.append(f"{command} took {elapsed:.2f}s, over the {args.budget:.2f}s budget")
+            if heavy:
+                failures.append(f"{command} imported {', '.join(heavy[:5])}")
+
+        elapsed, imports, output = run_with_importtime(["-c", EAGER_IMPORTS], work_dir)
+        print(f"  eager: {elapsed * 1000:6.0f} ms, {len(imports):3d} modules (step dependencies imported up front)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"All empty runs are under the {args.budget:.2f}s budget.")
+
+
+if __name__ == "__main__":
+    main()
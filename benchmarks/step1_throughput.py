@@ -0,0 +1,93 @@
+"""Compares the sequential step1 loop against the concurrent Gemini engine using a fake model.
+
+Usage: python benchmarks/step1_throughput.py [--jobs 20] [--latency 0.5] [--concurrency 4] [--lookahead 2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.gemini_functions import call_generative_api_with_retries, generate_fit_score, \
+    generate_fit_score_async, run_on_background_loop, submit_generative_api_call  # noqa: E402
+from utilities.prompt_functions import build_job_requirements_prompt, build_keywords_prompt, \
+    build_guidance_prompt  # noqa: E402
+
+RESUME_TEXT = "Senior product manager with ten years of platform API experience."
+
+
+def run_sequential(model, job_descriptions):
+    # Mirrors the original step1 loop: four blocking calls per job, one job after another. Returns the seconds to the
+    # first job.
+    start = time.perf_counter()
+    first_job_seconds = None
+    for job_description in job_descriptions:
+        requirements = call_generative_api_with_retries(model, build_job_requirements_prompt(job_description),
+                                                        prompt_type="job_requirements")
+        generate_fit_score(model, requirements.text, RESUME_TEXT)
+        call_generative_api_with_retries(model, build_keywords_prompt(job_description), prompt_type="keywords")
+        call_generative_api_with_retries(model, build_guidance_prompt(job_description), prompt_type="guidance")
+        if first_job_seconds is None:
+            first_job_seconds = time.perf_counter() - start
+    return first_job_seconds
+
+
+def run_concurrent(model, job_descriptions, concurrency, lookahead):
+    # Mirrors the new step1 loop: a job's prompts are queued once it is within lookahead jobs of the one under review,
+    # so its fit score is not stuck behind the prompts of the whole backlog. Returns the seconds to the first job.
+    semaphore = asyncio.Semaphore(concurrency)
+    job_futures = []
+    start = time.perf_counter()
+    first_job_seconds = None
+    for index in range(len(job_descriptions)):
+        for job_description in job_descriptions[len(job_futures):index + lookahead]:
+            job_futures.append([submit_generative_api_call(model, build(job_description), semaphore, prompt_type)
+                                for build, prompt_type in ((build_job_requirements_prompt, "job_requirements"),
+                                                           (build_keywords_prompt, "keywords"),
+                                                           (build_guidance_prompt, "guidance"))])
+        requirements, keywords, guidance = job_futures[index]
+        run_on_background_loop(
+            generate_fit_score_async(model, requirements.result().text, RESUME_TEXT, semaphore)).result()
+        keywords.result()
+        guidance.result()
+        if first_job_seconds is None:
+            first_job_seconds = time.perf_counter() - start
+    return first_job_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--lookahead", type=int, default=gemini_cfg.prefetch_lookahead)
+    args = parser.parse_args()
+
+    # Measure the engines, not the response cache or the API quota
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = False
+
+    job_descriptions = [f"Job description {i}" for i in range(args.jobs)]
+    results = {}
+    for name, runner in (("sequential", lambda m: run_sequential(m, job_descriptions)),
+                         ("concurrent", lambda m: run_concurrent(m, job_descriptions, args.concurrency,
+                                                                 args.lookahead))):
+        model = FakeGenerativeModel(latency=args.latency)
+        start = time.perf_counter()
+        first_job_seconds = runner(model)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"{name:>10}: {model.calls} calls in {elapsed:6.2f}s ({args.jobs / elapsed * 3600:8.0f} jobs/hour), "
+              f"first job after {first_job_seconds:.2f}s")
+
+    print(f"speedup: {results['sequential'] / results['concurrent']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
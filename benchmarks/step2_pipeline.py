@@ -0,0 +1,78 @@
+"""Measures step2 time-to-next-prompt for the per-bullet loop and the bullet pipeline using a fake model.
+
+Usage: python benchmarks/step2_pipeline.py [--latency 1.0] [--think 2.0]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.global_variables as global_vars  # noqa: E402
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.bullet_functions import BulletPipeline, generate_bullet_options  # noqa: E402
+
+NUM_BULLETS_PER_ROLE = global_vars.num_bullets_per_role
+FILTER_TEXT = "\n".join(f"- Achievement {i}" for i in range(max(NUM_BULLETS_PER_ROLE)))
+
+
+class FakeBulletModel(FakeGenerativeModel):
+    # Returns as many filtered achievements as the prompt asks for
+    def _text_for(self, prompt_parts):
+        prompt = prompt_parts[0]
+        if prompt.startswith("Input: Achievements"):
+            count = int(prompt.split("select the top ")[1].split(" ")[0])
+            return "\n".join(FILTER_TEXT.splitlines()[:count])
+        return "\n".join(f"Enhanced version {i}" for i in range(5))
+
+    def generate_content(self, prompt_parts):
+        self.text = self._text_for(prompt_parts)
+        return super().generate_content(prompt_parts)
+
+    async def generate_content_async(self, prompt_parts):
+        response = await super().generate_content_async(prompt_parts)
+        response.text = self._text_for(prompt_parts)
+        return response
+
+
+def measure(bullet_options_source, think_time):
+    # Returns the time spent waiting for each set of options while the "user" thinks between prompts
+    wait_times = []
+    iterator = iter(bullet_options_source)
+    while True:
+        start = time.perf_counter()
+        if next(iterator, None) is None:
+            return wait_times
+        wait_times.append(time.perf_counter() - start)
+        time.sleep(think_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per model call.")
+    parser.add_argument("--think", type=float, default=2.0, help="Seconds the user spends choosing a bullet.")
+    args = parser.parse_args()
+
+    # Measure the pipeline, not the response cache or the API quota
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = False
+
+    work_experience = [{"job_description": "Achievements"} for _ in NUM_BULLETS_PER_ROLE]
+    sources = {
+        "sequential": lambda m: generate_bullet_options(m, work_experience, NUM_BULLETS_PER_ROLE, "JD", "G", "K"),
+        "pipeline": lambda m: BulletPipeline(m, work_experience, NUM_BULLETS_PER_ROLE, "JD", "G", "K"),
+    }
+    for name, source in sources.items():
+        model = FakeBulletModel(latency=args.latency)
+        wait_times = measure(source(model), args.think)
+        print(f"{name:>10}: {len(wait_times)} prompts, {model.calls} calls, time-to-next-prompt "
+              f"mean {sum(wait_times) / len(wait_times):.2f}s, max {max(wait_times):.2f}s, "
+              f"total {sum(wait_times):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
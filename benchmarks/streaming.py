@@ -0,0 +1,70 @@
+"""Measures time-to-first-chunk of the blocking and streaming model calls used for the step5 cover letter.
+
+Uses a fake streaming model that spreads its latency over chunks of a few words, then repeats the streaming call
+with a model that fails half way through its first stream to show the restart and the retried text.
+
+Usage: python benchmarks/streaming.py [--latency 6.0] [--words 350]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+from google.api_core.exceptions import ServiceUnavailable  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.gemini_functions import call_generative_api_with_retries, stream_generative_api_with_retries, \
+    write_streamed_response  # noqa: E402
+
+
+class FlakyStreamingModel(FakeGenerativeModel):
+    # Fails half way through the first stream, like a dropped connection
+    def _stream(self):
+        for index, chunk in enumerate(super()._stream()):
+            if self.calls == 1 and index == 10:
+                raise ServiceUnavailable("stream interrupted")
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=6.0, help="Seconds to generate the whole response.")
+    parser.add_argument("--words", type=int, default=350, help="Words in the response.")
+    args = parser.parse_args()
+
+    # Measure the calls, not the response cache or the API quota
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+    gemini_cfg.telemetry_enabled = False
+
+    text = " ".join(f"word{i}" for i in range(args.words))
+    prompt_parts = ["Write a cover letter."]
+
+    start = time.perf_counter()
+    response = call_generative_api_with_retries(FakeGenerativeModel(latency=args.latency, text=text), prompt_parts)
+    blocking_seconds = time.perf_counter() - start
+    print(f"  blocking: first text after {blocking_seconds:.2f}s, complete after {blocking_seconds:.2f}s")
+
+    streamed = write_streamed_response(stream_generative_api_with_retries(
+        FakeGenerativeModel(latency=args.latency, text=text), prompt_parts), echo=False)
+    print(f" streaming: first text after {streamed.time_to_first_chunk:.2f}s, complete after {streamed.seconds:.2f}s")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "email.txt")
+        flaky = write_streamed_response(stream_generative_api_with_retries(
+            FlakyStreamingModel(latency=args.latency, text=text), prompt_parts, retry_delay=0.1), file_name,
+            echo=False)
+        with open(file_name) as file:
+            file_matches = file.read() == text
+    print(f"   retried: first text after {flaky.time_to_first_chunk:.2f}s, complete after {flaky.seconds:.2f}s, "
+          f"text {'matches' if flaky.text == text == response.text else 'differs'}, "
+          f"file {'matches' if file_matches else 'differs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measures the per-call overhead of recording model call telemetry in the llm_calls table.
+
+Runs model calls against a fake model that answers instantly, with the response cache off, so the call itself costs
+next to nothing and telemetry weighs as much as it ever will. Telemetry is turned off and then on, writing to a
+temporary database, and the time per call is compared. The time to write the last buffered rows is also reported.
+
+Usage: python benchmarks/telemetry_overhead.py [--calls 20000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import variables.gemini_variables as gemini_cfg  # noqa: E402
+import utilities.telemetry_functions as telemetry_functions  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+from utilities.db_functions import connect  # noqa: E402
+from utilities.gemini_functions import call_generative_api_with_retries  # noqa: E402
+
+
+def time_calls(model, calls):
+    # Returns the mean seconds per call
+    prompt_parts = ["Summarise the job description."]
+    start = time.perf_counter()
+    for _ in range(calls):
+        call_generative_api_with_retries(model, prompt_parts, prompt_type="benchmark")
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    gemini_cfg.response_cache_enabled = False
+    gemini_cfg.requests_per_minute = None
+    gemini_cfg.tokens_per_minute = None
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = str(Path(temp_dir) / "benchmark.db")
+        connect(db_file).close()
+        model = FakeGenerativeModel(latency=0)
+
+        gemini_cfg.telemetry_enabled = False
+        time_calls(model, args.calls // 10)  # warm up
+        without_telemetry = time_calls(model, args.calls)
+
+        gemini_cfg.telemetry_enabled = True
+        recorder = telemetry_functions.CallRecorder(db_file)
+        telemetry_functions._default_recorder = recorder
+        with_telemetry = time_calls(model, args.calls)
+        start = time.perf_counter()
+        recorder.flush()
+        final_flush = time.perf_counter() - start
+
+        conn = connect(db_file)
+        recorded = conn.execute("SELECT count(*) FROM llm_calls").fetchone()[0]
+        conn.close()
+
+    overhead = with_telemetry - without_telemetry
+    print(f"Call without telemetry: {without_telemetry * 1e6:7.1f} us")
+    print(f"Call with telemetry:    {with_telemetry * 1e6:7.1f} us "
+          f"(+{overhead * 1e6:.1f} us per call, batches of {recorder.batch_size} rows)")
+    print(f"Recorded {recorded} calls; final flush {final_flush * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import time
+
+# import functions
+from utilities.db_functions import connect
+from utilities.import_functions import ImportCounts, import_job_postings, read_job_postings
+
+
+def main():
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Import job postings from CSV, JSONL or saved HTML files into "
+                                                 "job_applications, updating postings already imported.")
+    parser.add_argument("files", nargs="+", help="CSV, JSONL or HTML files, or directories of them.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Postings written per transaction.")
+    args = parser.parse_args()
+
+    # Connect to the database
+    conn = connect()
+
+    # Stream every file through the importer, keeping one running count
+    start = time.perf_counter()
+    counts = ImportCounts()
+    for file_name in args.files:
+        import_job_postings(conn, read_job_postings(file_name), batch_size=args.batch_size, counts=counts)
+        print(f"{file_name}: {counts}")
+    elapsed = time.perf_counter() - start
+
+    print(f"Imported {counts.total} posting(s) in {elapsed:.1f}s: {counts}.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
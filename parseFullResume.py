@@ -0,0 +1,58 @@
+import argparse
+import time
+
+# import functions
+from utilities.db_functions import connect
+from utilities.gobal_functions import get_config_value_from_key
+from utilities.resume_functions import load_resume_profile, resume_json_file
+from utilities.resume_parser_functions import file_sha256, full_resume_docx_file, parse_resume_docx, \
+    parse_resume_with_affinda, parsed_resume_source, resume_parsers, write_parsed_resume
+
+
+def main(argv=None):
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Parse the full resume into data/target/<name>.json, locally or "
+                                                 "with Affinda, skipping an unchanged resume.")
+    parser.add_argument("--parser", choices=resume_parsers, default="local",
+                        help="Parse the docx locally (default) or upload it to Affinda.")
+    parser.add_argument("--force", action="store_true", help="Parse the resume even when it has not changed.")
+    args = parser.parse_args(argv)
+
+    # Connect to the database
+    conn = connect()
+    # Create a cursor
+    cursor = conn.cursor()
+
+    # Get Values from config table
+    resume_name = get_config_value_from_key(cursor, "full_resume_file_name")
+    docx_file = full_resume_docx_file(resume_name)
+    json_file = resume_json_file(resume_name)
+
+    # Skip a resume already parsed by the same parser from identical content
+    source_hash = file_sha256(docx_file)
+    if not args.force and parsed_resume_source(json_file) == {'sha256': source_hash, 'parser': args.parser}:
+        print(f"{docx_file} has not changed since it was parsed. Use --force to parse it again.")
+        cursor.close()
+        conn.close()
+        return
+
+    start = time.perf_counter()
+    if args.parser == "affinda":
+        token = get_config_value_from_key(cursor, "affinda_token")
+        affinda_collection_id = get_config_value_from_key(cursor, "affinda_collection_id")
+        resume_data = parse_resume_with_affinda(token, affinda_collection_id, docx_file)
+    else:
+        resume_data = parse_resume_docx(docx_file)
+    write_parsed_resume(json_file, resume_data, source_hash, args.parser)
+
+    # Compile the resume profile the steps read now, rather than in the next step
+    work_experience = load_resume_profile(resume_name).work_experience
+    print(f"Parsed {len(work_experience)} role(s) from {docx_file} with the {args.parser} parser "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import time
+
+# import global variables
+import variables.global_variables as global_vars
+
+# import functions
+from utilities.db_functions import connect, iter_jobs
+from utilities.docx_functions import render_docx_batch
+from utilities.resume_functions import resume_docx_file_name, resume_substitutions_from_row
+
+
+def main():
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Render tailored resumes again from the selections stored in the "
+                                                 "database, for example after changing the resume template.")
+    parser.add_argument("--status", help="Only render jobs with this status. Defaults to every job with a resume.")
+    parser.add_argument("--template", default=global_vars.resume_template_file, help="The resume template docx.")
+    parser.add_argument("--output-dir", default="temp/resumes/docx", help="Directory for the rendered resumes.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes. Defaults to the number of CPUs.")
+    args = parser.parse_args()
+
+    # Connect to the database
+    conn = connect()
+
+    # Select every job with a generated resume; resumes created before the bullet selections were stored
+    # cannot be rendered again
+    jobs = []
+    skipped = 0
+    for row in iter_jobs(conn, ('company_name', 'job_title', 'resume_summary', 'resume_summary_bullets',
+                                'resume_bullets', 'resume_skills'), status=args.status,
+                         where="resume_summary IS NOT NULL"):
+        substitutions = resume_substitutions_from_row(row)
+        if substitutions is None:
+            skipped += 1
+            continue
+        jobs.append((resume_docx_file_name(row['company_name'], row['job_title'], args.output_dir), substitutions))
+    conn.close()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    start = time.perf_counter()
+    rendered = render_docx_batch(args.template, jobs, args.workers) if jobs else []
+    elapsed = time.perf_counter() - start
+
+    for output_file in rendered:
+        print(output_file)
+    print(f"Rendered {len(rendered)} resume(s) in {elapsed:.2f}s, skipped {skipped} without stored bullet selections")
+
+
+# The process pool imports this module in its workers, so only run when executed directly
+if __name__ == "__main__":
+    main()
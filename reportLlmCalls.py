@@ -0,0 +1,39 @@
+import argparse
+import time
+
+# import functions
+from utilities.db_functions import connect
+from utilities.telemetry_functions import llm_call_report
+
+# Parse command line options
+parser = argparse.ArgumentParser(description="Report model call latency and tokens per step and prompt type.")
+parser.add_argument("--days", type=float, help="Only include calls from the last number of days.")
+parser.add_argument("--by", choices=("step", "prompt_type", "both", "model"), default="both",
+                    help="Group the calls by step, by prompt type, by both (the default), or by step and the model "
+                         "the prompts were routed to.")
+args = parser.parse_args()
+
+# Connect to the database
+conn = connect()
+
+since = time.time() - args.days * 24 * 60 * 60 if args.days is not None else None
+group_by = {"both": ("step", "prompt_type"), "model": ("step", "model_name")}.get(args.by, (args.by,))
+
+# Print one line per group, slowest p95 first, followed by the totals per step
+report = llm_call_report(conn, group_by=group_by, since=since)
+if not report:
+    print("No model calls recorded.")
+for entry in report:
+    group = " / ".join(str(entry[column] or "-") for column in group_by)
+    print(f"{group:<45} {entry['calls']:>6} calls  p50 {entry['p50']:6.2f}s  p95 {entry['p95']:6.2f}s  "
+          f"p99 {entry['p99']:6.2f}s  {entry['input_tokens']:>9} in  {entry['output_tokens']:>8} out  "
+          f"{entry['cache_hits']:>5} cached  {entry['retries']:>4} retries  {entry['errors']:>4} errors")
+
+if report and args.by == "both":
+    print()
+    for entry in llm_call_report(conn, group_by=("step",), since=since):
+        print(f"{str(entry['step'] or '-'):<45} {entry['calls']:>6} calls  p50 {entry['p50']:6.2f}s  "
+              f"p95 {entry['p95']:6.2f}s  p99 {entry['p99']:6.2f}s  {entry['input_tokens']:>9} in  "
+              f"{entry['output_tokens']:>8} out")
+
+conn.close()
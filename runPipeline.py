@@ -0,0 +1,67 @@
+import argparse
+import time
+from pathlib import Path
+
+# import functions
+from utilities.bullet_functions import batch_modes
+from utilities.db_functions import connect
+from utilities.gemini_functions import setup_model
+from utilities.gobal_functions import get_config_value_from_key
+from utilities.pipeline_functions import Pipeline
+from utilities.resume_functions import load_resume_profile
+
+
+def main():
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Drive every job through steps 1 to 5 in one process, running the "
+                                                 "automatic stages in the background while you work through the "
+                                                 "reviews, resumes and messages.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and pick up new jobs instead of exiting once every queue is empty.")
+    parser.add_argument("--poll-interval", type=float, default=30,
+                        help="Seconds between database checks while waiting for work.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Generate every role's bullet options ahead of the Step 2 selection prompts.")
+    parser.add_argument("--batch-bullets", choices=batch_modes,
+                        help="Enhance the bullets of each role, or of the whole resume, in a single request.")
+    args = parser.parse_args()
+
+    # Connect to the database once for the whole run
+    conn = connect()
+    cursor = conn.cursor()
+
+    # Get Values from config table
+    resume_name = get_config_value_from_key(cursor, "full_resume_file_name")
+    google_ai_key = get_config_value_from_key(cursor, "google_token")
+
+    # Load the compiled resume profile once for every stage
+    resume_profile = load_resume_profile(resume_name)
+
+    # Setup the Gemini model once; every stage shares the same client
+    model = setup_model(google_ai_key)  # Use default settings
+
+    # Setup temp directories if they do not exist
+    for directory in ('temp/email', 'temp/resumes/docx', 'temp/resumes/pdf'):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    pipeline = Pipeline(conn, model, resume_profile, bullet_pipeline=args.pipeline, batch_bullets=args.batch_bullets)
+    start = time.perf_counter()
+    try:
+        pipeline.run(watch=args.watch, poll_interval=args.poll_interval)
+    except KeyboardInterrupt:
+        print("\nStopping. Waiting for the automatic stages already running...")
+    finally:
+        pipeline.close()
+    elapsed = time.perf_counter() - start
+
+    # Report the jobs moved out of each status
+    for status, count in sorted(pipeline.completed.items()):
+        print(f"{status}: {count} job(s) done")
+    print(f"Finished {sum(pipeline.completed.values())} stage(s) in {elapsed:.1f}s.")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
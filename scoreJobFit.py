@@ -0,0 +1,43 @@
+import argparse
+import time
+
+# import functions
+from utilities.db_functions import connect
+from utilities.fit_score_functions import score_jobs_locally
+from utilities.gobal_functions import get_config_value_from_key
+from utilities.resume_functions import load_resume_profile
+
+# Parse command line options
+parser = argparse.ArgumentParser(description="Score jobs against the resume with the local fit score engine.")
+parser.add_argument("--status", default="Step 1 - JD Review", help="Status of the jobs to score.")
+parser.add_argument("--final", action="store_true",
+                    help="Write final_fit_score using each job's generated resume instead of the full resume.")
+parser.add_argument("--rescore", action="store_true", help="Also score jobs that already have a score.")
+args = parser.parse_args()
+
+# Connect to the database
+conn = connect()
+
+# Create a cursor
+cursor = conn.cursor()
+
+# Final scores use each job's generated resume, original scores use the full resume text
+resume_text = None
+if not args.final:
+    resume_name = get_config_value_from_key(cursor, "full_resume_file_name")
+    resume_text = load_resume_profile(resume_name).raw_text
+
+# Score the jobs in one batch and write them to the database
+start = time.perf_counter()
+job_scores = score_jobs_locally(conn, resume_text, status=args.status,
+                                column='final_fit_score' if args.final else 'original_fit_score',
+                                only_missing=not args.rescore)
+elapsed = time.perf_counter() - start
+
+for job_application_id, fit_score in job_scores.items():
+    print(f"{job_application_id}: {fit_score}")
+print(f"Scored {len(job_scores)} job(s) in {elapsed:.2f}s")
+
+# Close the cursor and connection
+cursor.close()
+conn.close()
@@ -0,0 +1,118 @@
+import math
+from collections import Counter, namedtuple
+
+import numpy as np
+
+# Import Global Variables
+import variables.global_variables as global_vars
+from utilities.fit_score_functions import tokenize
+
+# The achievements of a role worth sending to the model, best first, and whether the top ones can be used as is
+AchievementShortlist = namedtuple("AchievementShortlist", ["achievements", "confident"])
+
+_achievement_indexes = {}
+
+
+class AchievementIndex:
+    """Local TF-IDF retrieval index over every achievement of the resume profile.
+
+    Each achievement is a row of sublinear TF-IDF term weights (1 + log of the term count, multiplied by the term's
+    inverse document frequency across all achievements), normalised to unit length. A job is scored against every
+    achievement at once as the cosine similarity between its own TF-IDF vector and each row.
+
+    Args:
+        work_experience (sequence): The roles of the resume profile, supporting role['achievements'] access.
+    """
+
+    def __init__(self, work_experience):
+        self.achievements_by_role = [tuple(role['achievements']) for role in work_experience]
+        self.role_offsets = np.cumsum([0] + [len(achievements) for achievements in self.achievements_by_role])
+
+        term_counts_per_achievement = [Counter(tokenize(achievement))
+                                       for achievements in self.achievements_by_role for achievement in achievements]
+        self.vocabulary = {}
+        for term_counts in term_counts_per_achievement:
+            for term in term_counts:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        # Achievements are short and few, so a dense matrix is small and a single matrix-vector product scores them
+        weights = np.zeros((len(term_counts_per_achievement), len(self.vocabulary)))
+        for row, term_counts in enumerate(term_counts_per_achievement):
+            for term, count in term_counts.items():
+                weights[row, self.vocabulary[term]] = 1 + math.log(count)
+        document_frequency = np.count_nonzero(weights, axis=0)
+        self.idf = np.log((1 + len(weights)) / (1 + document_frequency)) + 1
+        self.matrix = _normalize_rows(weights * self.idf)
+
+    def score(self, text):
+        """
+        Scores every achievement against a job.
+
+        Args:
+            text (str): The job text, such as the job description followed by the guidance and keywords.
+
+        Returns:
+            numpy.ndarray: The cosine similarity of each achievement, in role order, between 0 and 1.
+        """
+        query = np.zeros(len(self.vocabulary))
+        for term, count in Counter(term for term in tokenize(text) if term in self.vocabulary).items():
+            query[self.vocabulary[term]] = 1 + math.log(count)
+        query = _normalize_rows((query * self.idf)[np.newaxis])[0]
+        return self.matrix @ query
+
+    def shortlist(self, scores, role_index, num_of_bullets, shortlist_factor=global_vars.achievement_shortlist_factor,
+                  confidence_margin=global_vars.achievement_confidence_margin):
+        """
+        Ranks a role's achievements and keeps the candidates for the achievement filter prompt.
+
+        The ranking is confident when the role has no more achievements than bullets, or when the last selected
+        achievement outscores the first one left out by at least confidence_margin of its own score.
+
+        Args:
+            scores (numpy.ndarray): The scores returned by score.
+            role_index (int): The role's position in the work experience.
+            num_of_bullets (int): The number of achievements to select.
+            shortlist_factor (float, optional): The shortlist holds this many times num_of_bullets achievements.
+                Defaults to global_vars.achievement_shortlist_factor.
+            confidence_margin (float, optional): The relative score gap that makes the ranking confident, or None
+                to always ask the model. Defaults to global_vars.achievement_confidence_margin.
+
+        Returns:
+            AchievementShortlist: The shortlisted achievements, best first, and whether the ranking is confident.
+        """
+        achievements = self.achievements_by_role[role_index]
+        role_scores = scores[self.role_offsets[role_index]:self.role_offsets[role_index + 1]]
+        # A stable sort keeps the resume order between achievements with the same score
+        ranking = np.argsort(-role_scores, kind="stable")
+        if len(achievements) <= num_of_bullets:
+            return AchievementShortlist(tuple(achievements[index] for index in ranking), True)
+
+        last_selected, first_left_out = role_scores[ranking[num_of_bullets - 1]], role_scores[ranking[num_of_bullets]]
+        confident = (confidence_margin is not None and last_selected > 0
+                     and (last_selected - first_left_out) / last_selected >= confidence_margin)
+        shortlist_size = max(num_of_bullets + 1, math.ceil(num_of_bullets * shortlist_factor))
+        return AchievementShortlist(tuple(achievements[index] for index in ranking[:shortlist_size]), confident)
+
+
+def achievement_index(work_experience):
+    """
+    Returns the AchievementIndex of a resume profile's work experience, building it once per process.
+
+    Args:
+        work_experience (sequence): The roles of the resume profile, supporting role['achievements'] access.
+
+    Returns:
+        AchievementIndex: The index, or None when achievement_shortlist_factor is None.
+    """
+    if global_vars.achievement_shortlist_factor is None:
+        return None
+    key = tuple(tuple(role['achievements']) for role in work_experience)
+    if key not in _achievement_indexes:
+        _achievement_indexes[key] = AchievementIndex(work_experience)
+    return _achievement_indexes[key]
+
+
+def _normalize_rows(matrix):
+    # Scales each row to unit length, leaving all-zero rows alone
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
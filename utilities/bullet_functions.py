@@ -0,0 +1,469 @@
+import asyncio
+import json
+import queue
+import time
+from collections import namedtuple
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+from utilities.gemini_functions import call_generative_api_with_retries, call_generative_api_async, \
+    run_on_background_loop
+from utilities.gobal_functions import create_list_from_lines
+from utilities.profile_functions import profiled
+from utilities.prompt_functions import build_bullets_filter_prompt, build_bullet_enhancement_prompt, \
+    build_batched_bullet_enhancement_prompt
+
+# One bullet ready for the user: the original achievement followed by the enhanced versions, and whether the versions
+# were reused from an earlier job instead of generated
+BulletOptions = namedtuple("BulletOptions", ["role_index", "bullet_index", "original_bullet", "options", "reused"],
+                           defaults=(False,))
+
+# Batching modes for the enhancement prompts: one request per role or one for the whole resume
+batch_modes = ("role", "resume")
+
+_end_of_pipeline = object()
+
+
+class BulletPromptStats:
+    """Counts the bullet prompts sent for a resume next to what the one-prompt-per-bullet mode would send.
+
+    Input tokens are estimated at four characters per token. The achievement filter of each role is also recorded
+    with the size of the prompt listing every achievement, the size actually sent after the local shortlist and the
+    time the filter took.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.characters = 0
+        self.per_bullet_calls = 0
+        self.per_bullet_characters = 0
+        self.role_filters = {}
+        self.reused_bullets = 0
+
+    def record(self, prompt_parts, per_bullet_prompt_parts_list=None):
+        """
+        Records a prompt that was sent and the per-bullet prompts it replaces.
+
+        Args:
+            prompt_parts: The prompt parts sent to the model.
+            per_bullet_prompt_parts_list (list, optional): The per-bullet prompts the request replaces. Defaults to
+                the request itself.
+        """
+        if per_bullet_prompt_parts_list is None:
+            per_bullet_prompt_parts_list = [prompt_parts]
+        self.calls += 1
+        self.characters += _prompt_length(prompt_parts)
+        for per_bullet_prompt_parts in per_bullet_prompt_parts_list:
+            self.per_bullet_calls += 1
+            self.per_bullet_characters += _prompt_length(per_bullet_prompt_parts)
+
+    def record_filter(self, role_index, full_prompt_parts, prompt_parts, seconds):
+        """
+        Records the achievement filter of a role.
+
+        Args:
+            role_index (int): The role's position in the work experience.
+            full_prompt_parts: The filter prompt listing every achievement of the role.
+            prompt_parts: The filter prompt sent, or None when the shortlist was used without the model.
+            seconds (float): The time taken to select the role's achievements.
+        """
+        self.role_filters[role_index] = (_prompt_length(full_prompt_parts),
+                                         _prompt_length(prompt_parts) if prompt_parts is not None else 0, seconds)
+
+    def filter_summary(self, work_experience):
+        """
+        Returns one line per role comparing the achievement filter prompt before and after the local shortlist.
+
+        Args:
+            work_experience (sequence): The roles of the resume profile, supporting role['column'] access.
+
+        Returns:
+            list: The report lines in role order.
+        """
+        lines = []
+        for role_index, (full_characters, characters, seconds) in sorted(self.role_filters.items()):
+            sent = f"~{characters // 4} input tokens" if characters else "selected locally"
+            lines.append(f"Achievement filter for {work_experience[role_index]['organization']}: "
+                         f"~{full_characters // 4} input tokens with every achievement, {sent}, {seconds:.2f}s")
+        return lines
+
+    def summary(self):
+        """Returns a one-line comparison of the calls and estimated input tokens."""
+        tokens = self.characters // 4
+        per_bullet_tokens = self.per_bullet_characters // 4
+        reduction = (1 - tokens / per_bullet_tokens) * 100 if per_bullet_tokens else 0
+        return (f"Bullet prompts: {self.calls} calls, ~{tokens} input tokens "
+                f"(per-bullet mode: {self.per_bullet_calls} calls, ~{per_bullet_tokens} input tokens, "
+                f"{reduction:.0f}% fewer tokens), {self.reused_bullets} bullets reused from earlier jobs")
+
+
+@profiled("parse")
+def parse_bullet_variants(response_text, bullet_count):
+    """
+    Parses and validates the JSON object returned for a batched bullet enhancement prompt.
+
+    Args:
+        response_text (str): The model response text.
+        bullet_count (int): The number of bullets in the request.
+
+    Returns:
+        tuple: A dict mapping each valid bullet index to its enhanced versions, and a list of the bullet indexes
+        that were missing or malformed.
+    """
+    # Tolerate code fences or commentary around the JSON object
+    start, end = response_text.find("{"), response_text.rfind("}")
+    try:
+        parsed = json.loads(response_text[start:end + 1]) if start != -1 else None
+    except json.JSONDecodeError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        return {}, list(range(bullet_count))
+
+    variants = {}
+    malformed = []
+    for index in range(bullet_count):
+        value = parsed.get(str(index))
+        if isinstance(value, list):
+            value = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+        if value:
+            variants[index] = value[:5]
+        else:
+            malformed.append(index)
+    return variants, malformed
+
+
+async def enhance_bullets_batched_async(model, original_bullets, guidance, keywords, semaphore=None, stats=None,
+                                        max_reasks=1):
+    """
+    Crafts enhanced versions of several bullets with one request, re-asking only for malformed bullets.
+
+    Bullets that are still malformed after max_reasks re-asks fall back to the one-bullet prompt.
+
+    Args:
+        model: The Google generative AI model object.
+        original_bullets (list): The original achievement bullets.
+        guidance (str): The resume guidance generated in Step 1.
+        keywords (str): The keywords generated in Step 1.
+        semaphore (asyncio.Semaphore, optional): Caps the number of requests in flight. Defaults to None.
+        stats (BulletPromptStats, optional): Collects call counts and prompt sizes. Defaults to None.
+        max_reasks (int, optional): Number of batched re-asks for malformed bullets. Defaults to 1.
+
+    Returns:
+        list: The enhanced versions for each bullet, in the same order as original_bullets.
+    """
+    variants = {}
+    pending = list(range(len(original_bullets)))
+    for attempt in range(max_reasks + 1):
+        if not pending:
+            break
+        batch = [original_bullets[index] for index in pending]
+        prompt_parts = build_batched_bullet_enhancement_prompt(batch, guidance, keywords)
+        if stats is not None:
+            # Re-asks are extra calls, so only the first request replaces per-bullet prompts
+            stats.record(prompt_parts, [build_bullet_enhancement_prompt(bullet, guidance, keywords)
+                                        for bullet in batch] if attempt == 0 else [])
+        # A re-ask for the same bullets must not be answered from the response cache
+        response = await call_generative_api_async(model, prompt_parts, semaphore, use_cache=attempt == 0,
+                                                   prompt_type="bullet_enhancement_batch")
+        batch_variants, malformed = parse_bullet_variants(response.text, len(batch))
+        for batch_index, bullet_variants in batch_variants.items():
+            variants[pending[batch_index]] = bullet_variants
+        pending = [pending[batch_index] for batch_index in malformed]
+
+    for index in pending:
+        print(f"Batched response malformed for bullet {index + 1}, asking for it on its own.")
+        prompt_parts = build_bullet_enhancement_prompt(original_bullets[index], guidance, keywords)
+        if stats is not None:
+            stats.record(prompt_parts, [])
+        response = await call_generative_api_async(model, prompt_parts, semaphore, prompt_type="bullet_enhancement")
+        variants[index] = create_list_from_lines(response.text)
+
+    return [variants[index] for index in range(len(original_bullets))]
+
+
+def generate_bullet_options(model, work_experience, num_bullets_per_role, job_description, guidance, keywords,
+                            batch=None, stats=None, achievement_index=None, variant_store=None):
+    """
+    Yields the bullet options for every role, calling the model only when the next bullet is requested.
+
+    Args:
+        model: The Google generative AI model object.
+        work_experience (sequence): The roles of the resume profile, supporting role['column'] access.
+        num_bullets_per_role (list): The number of bullets to select for each role.
+        job_description (str): The target job description.
+        guidance (str): The resume guidance generated in Step 1.
+        keywords (str): The keywords generated in Step 1.
+        batch (str, optional): "role" or "resume" to enhance bullets in batched requests. Defaults to one request
+            per bullet.
+        stats (BulletPromptStats, optional): Collects call counts and prompt sizes. Defaults to None.
+        achievement_index (AchievementIndex, optional): Shortlists each role's achievements before the filter
+            prompt. Defaults to None, sending every achievement.
+        variant_store (BulletVariantStore, optional): Offers the versions stored for a bullet on an earlier job
+            with similar keywords instead of calling the model. Defaults to None.
+
+    Yields:
+        BulletOptions: The options for each bullet in role order.
+    """
+
+    achievement_scores = _score_achievements(achievement_index, job_description, guidance, keywords)
+
+    def filter_role(role_index):
+        start = time.perf_counter()
+        full_prompt_parts, filter_prompt_parts, filtered_bullets = _plan_role_filter(
+            work_experience, role_index, num_bullets_per_role[role_index], job_description, guidance,
+            achievement_index, achievement_scores)
+        if filter_prompt_parts is not None:
+            if stats is not None:
+                stats.record(filter_prompt_parts)
+            filtered_bullets = create_list_from_lines(
+                call_generative_api_with_retries(model, filter_prompt_parts, prompt_type="achievement_filter").text)
+        if stats is not None:
+            stats.record_filter(role_index, full_prompt_parts, filter_prompt_parts, time.perf_counter() - start)
+        return filtered_bullets
+
+    if batch == "resume":
+        # Filter every role first so all bullets go out in a single enhancement request
+        filtered_bullets_by_role = [filter_role(role_index) for role_index in range(len(work_experience))]
+        all_bullets = [bullet for filtered_bullets in filtered_bullets_by_role for bullet in filtered_bullets]
+        all_variants = iter(run_on_background_loop(_enhance_bullets_with_store(
+            model, all_bullets, guidance, keywords, None, stats, variant_store)).result())
+        for role_index, filtered_bullets in enumerate(filtered_bullets_by_role):
+            for bullet_index, original_bullet in enumerate(filtered_bullets):
+                variants, reused = next(all_variants)
+                yield BulletOptions(role_index, bullet_index, original_bullet, [original_bullet] + variants, reused)
+        return
+
+    for role_index in range(len(work_experience)):
+        filtered_bullets = filter_role(role_index)
+
+        if batch == "role":
+            role_variants = run_on_background_loop(_enhance_bullets_with_store(
+                model, filtered_bullets, guidance, keywords, None, stats, variant_store)).result()
+            for bullet_index, original_bullet in enumerate(filtered_bullets):
+                variants, reused = role_variants[bullet_index]
+                yield BulletOptions(role_index, bullet_index, original_bullet, [original_bullet] + variants, reused)
+            continue
+
+        for bullet_index, original_bullet in enumerate(filtered_bullets):
+            reused_variants = _reused_variants(variant_store, original_bullet, keywords, stats)
+            if reused_variants is not None:
+                yield BulletOptions(role_index, bullet_index, original_bullet, [original_bullet] + reused_variants,
+                                    True)
+                continue
+            enhancement_prompt_parts = build_bullet_enhancement_prompt(original_bullet, guidance, keywords)
+            if stats is not None:
+                stats.record(enhancement_prompt_parts)
+            response = call_generative_api_with_retries(model, enhancement_prompt_parts,
+                                                        prompt_type="bullet_enhancement")
+            yield BulletOptions(role_index, bullet_index, original_bullet,
+                                [original_bullet] + create_list_from_lines(response.text))
+
+
+class BulletPipeline:
+    """Generates the bullet options for every role ahead of the user.
+
+    The achievement filter for every role starts at once and each role's enhancement calls start as soon as its
+    filter returns, capped at max_concurrency requests in flight. Finished bullets are handed over in role order
+    through a bounded queue, so the next set of options is usually ready by the time the user has chosen.
+
+    Args:
+        model: The Google generative AI model object.
+        work_experience (sequence): The roles of the resume profile, supporting role['column'] access.
+        num_bullets_per_role (list): The number of bullets to select for each role.
+        job_description (str): The target job description.
+        guidance (str): The resume guidance generated in Step 1.
+        keywords (str): The keywords generated in Step 1.
+        batch (str, optional): "role" or "resume" to enhance bullets in batched requests. Defaults to one request
+            per bullet.
+        stats (BulletPromptStats, optional): Collects call counts and prompt sizes. Defaults to None.
+        achievement_index (AchievementIndex, optional): Shortlists each role's achievements before the filter
+            prompt. Defaults to None, sending every achievement.
+        variant_store (BulletVariantStore, optional): Offers the versions stored for a bullet on an earlier job
+            with similar keywords instead of calling the model. Defaults to None.
+        max_ready (int, optional): Maximum number of finished bullets waiting for the user.
+        max_concurrency (int, optional): Maximum number of requests in flight.
+    """
+
+    def __init__(self, model, work_experience, num_bullets_per_role, job_description, guidance, keywords,
+                 batch=None, stats=None, achievement_index=None, variant_store=None,
+                 max_ready=gemini_cfg.bullet_pipeline_max_ready, max_concurrency=gemini_cfg.max_concurrent_requests):
+        self.model = model
+        self.work_experience = work_experience
+        self.num_bullets_per_role = num_bullets_per_role
+        self.job_description = job_description
+        self.guidance = guidance
+        self.keywords = keywords
+        self.batch = batch
+        self.stats = stats
+        self.achievement_index = achievement_index
+        self.achievement_scores = _score_achievements(achievement_index, job_description, guidance, keywords)
+        self.variant_store = variant_store
+        self.max_concurrency = max_concurrency
+        self._ready = queue.Queue(maxsize=max_ready)
+        self._closed = False
+        self._tasks = []
+        self._producer = run_on_background_loop(self._produce())
+
+    def __iter__(self):
+        try:
+            while True:
+                item = self._ready.get()
+                if item is _end_of_pipeline:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancels any outstanding requests."""
+        self._closed = True
+        self._producer.cancel()
+
+    async def _produce(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            try:
+                filter_tasks = [self._create_task(self._filter_role(role_index, semaphore))
+                                for role_index in range(len(self.work_experience))]
+                if self.batch == "resume":
+                    await self._produce_resume_batch(filter_tasks, semaphore)
+                else:
+                    role_tasks = [self._create_task(self._generate_role(role_index, filter_task, semaphore))
+                                  for role_index, filter_task in enumerate(filter_tasks)]
+                    for role_task in role_tasks:
+                        for bullet_task in await role_task:
+                            await self._put(await bullet_task)
+                await self._put(_end_of_pipeline)
+            finally:
+                # Stop every request still running once the user quits or a request fails
+                for task in self._tasks:
+                    task.cancel()
+        except Exception as e:
+            # Hand the error to the consumer so it is raised in the main thread
+            await self._put(e)
+
+    def _create_task(self, coroutine):
+        # Tracks every task the pipeline starts so they can all be cancelled; only used from the event loop thread
+        task = asyncio.create_task(coroutine)
+        self._tasks.append(task)
+        return task
+
+    async def _produce_resume_batch(self, filter_tasks, semaphore):
+        filtered_bullets_by_role = await asyncio.gather(*filter_tasks)
+        all_bullets = [bullet for filtered_bullets in filtered_bullets_by_role for bullet in filtered_bullets]
+        all_variants = iter(await _enhance_bullets_with_store(self.model, all_bullets, self.guidance, self.keywords,
+                                                              semaphore, self.stats, self.variant_store))
+        for role_index, filtered_bullets in enumerate(filtered_bullets_by_role):
+            for bullet_index, original_bullet in enumerate(filtered_bullets):
+                variants, reused = next(all_variants)
+                await self._put(BulletOptions(role_index, bullet_index, original_bullet,
+                                              [original_bullet] + variants, reused))
+
+    async def _filter_role(self, role_index, semaphore):
+        start = time.perf_counter()
+        full_prompt_parts, filter_prompt_parts, filtered_bullets = _plan_role_filter(
+            self.work_experience, role_index, self.num_bullets_per_role[role_index], self.job_description,
+            self.guidance, self.achievement_index, self.achievement_scores)
+        if filter_prompt_parts is not None:
+            if self.stats is not None:
+                self.stats.record(filter_prompt_parts)
+            filter_response = await call_generative_api_async(self.model, filter_prompt_parts, semaphore,
+                                                              prompt_type="achievement_filter")
+            filtered_bullets = create_list_from_lines(filter_response.text)
+        if self.stats is not None:
+            self.stats.record_filter(role_index, full_prompt_parts, filter_prompt_parts, time.perf_counter() - start)
+        return filtered_bullets
+
+    async def _generate_role(self, role_index, filter_task, semaphore):
+        filtered_bullets = await filter_task
+        if self.batch == "role":
+            role_variants = await _enhance_bullets_with_store(self.model, filtered_bullets, self.guidance,
+                                                              self.keywords, semaphore, self.stats, self.variant_store)
+            return [_completed(BulletOptions(role_index, bullet_index, original_bullet,
+                                             [original_bullet] + variants, reused))
+                    for bullet_index, (original_bullet, (variants, reused)) in
+                    enumerate(zip(filtered_bullets, role_variants))]
+        return [self._create_task(self._generate_bullet(role_index, bullet_index, original_bullet, semaphore))
+                for bullet_index, original_bullet in enumerate(filtered_bullets)]
+
+    async def _generate_bullet(self, role_index, bullet_index, original_bullet, semaphore):
+        reused_variants = _reused_variants(self.variant_store, original_bullet, self.keywords, self.stats)
+        if reused_variants is not None:
+            return BulletOptions(role_index, bullet_index, original_bullet, [original_bullet] + reused_variants, True)
+        enhancement_prompt_parts = build_bullet_enhancement_prompt(original_bullet, self.guidance, self.keywords)
+        if self.stats is not None:
+            self.stats.record(enhancement_prompt_parts)
+        response = await call_generative_api_async(self.model, enhancement_prompt_parts, semaphore,
+                                                   prompt_type="bullet_enhancement")
+        return BulletOptions(role_index, bullet_index, original_bullet,
+                             [original_bullet] + create_list_from_lines(response.text))
+
+    async def _put(self, item):
+        # queue.Queue blocks when full, so wait for room in a worker thread instead of on the loop
+        await asyncio.to_thread(self._put_blocking, item)
+
+    def _put_blocking(self, item):
+        # Give up once the consumer has closed the pipeline so the worker thread never blocks forever
+        while not self._closed:
+            try:
+                self._ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+async def _completed(value):
+    # Wraps an already computed value so it can be awaited like a pending bullet task
+    return value
+
+
+def _reused_variants(variant_store, original_bullet, keywords, stats):
+    # Returns the versions stored for the bullet on an earlier job with similar keywords, or None
+    if variant_store is None:
+        return None
+    variants = variant_store.lookup(original_bullet, keywords)
+    if variants is not None and stats is not None:
+        stats.reused_bullets += 1
+    return variants
+
+
+async def _enhance_bullets_with_store(model, original_bullets, guidance, keywords, semaphore, stats, variant_store):
+    # Enhances in one batched request only the bullets without stored versions, returning (variants, reused) pairs
+    reused_variants = [_reused_variants(variant_store, bullet, keywords, stats) for bullet in original_bullets]
+    missing_bullets = [bullet for bullet, variants in zip(original_bullets, reused_variants) if variants is None]
+    generated_variants = iter(await enhance_bullets_batched_async(model, missing_bullets, guidance, keywords,
+                                                                  semaphore, stats) if missing_bullets else ())
+    return [(variants, True) if variants is not None else (next(generated_variants), False)
+            for variants in reused_variants]
+
+
+def _score_achievements(achievement_index, job_description, guidance, keywords):
+    # Scores every achievement once per job, so each role's shortlist is a slice of the same scores
+    if achievement_index is None:
+        return None
+    return achievement_index.score("\n".join((job_description, guidance, keywords)))
+
+
+def _plan_role_filter(work_experience, role_index, num_of_bullets, job_description, guidance, achievement_index,
+                      achievement_scores):
+    # Returns the filter prompt listing every achievement, the prompt to send (None when the shortlist is confident)
+    # and the achievements selected locally (None when the model selects them)
+    full_prompt_parts = build_bullets_filter_prompt(work_experience[role_index]['job_description'], job_description,
+                                                    guidance, num_of_bullets)
+    if achievement_index is None:
+        return full_prompt_parts, full_prompt_parts, None
+    shortlist = achievement_index.shortlist(achievement_scores, role_index, num_of_bullets)
+    if shortlist.confident:
+        return full_prompt_parts, None, list(shortlist.achievements[:num_of_bullets])
+    if len(shortlist.achievements) >= len(work_experience[role_index]['achievements']):
+        return full_prompt_parts, full_prompt_parts, None
+    filter_prompt_parts = build_bullets_filter_prompt("\n".join(f"- {achievement}" for achievement in
+                                                                shortlist.achievements),
+                                                      job_description, guidance, num_of_bullets)
+    return full_prompt_parts, filter_prompt_parts, None
+
+
+def _prompt_length(prompt_parts):
+    return sum(len(part) for part in prompt_parts if isinstance(part, str))
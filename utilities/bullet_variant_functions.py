@@ -0,0 +1,146 @@
+import datetime
+import hashlib
+import json
+import re
+import threading
+
+# Import Global Variables
+import variables.global_variables as global_vars
+from utilities.fit_score_functions import tokenize
+from utilities.profile_functions import profiled
+
+_leading_non_letters = re.compile(r"^[^A-Za-z]+")
+
+
+def bullet_hash(original_bullet):
+    """
+    Returns the key of an original bullet, ignoring case, spacing and leading bullet characters.
+
+    Args:
+        original_bullet (str): The original achievement bullet.
+
+    Returns:
+        str: The SHA-256 hash of the normalised bullet.
+    """
+    normalized = " ".join(_leading_non_letters.sub("", str(original_bullet)).lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def keyword_signature(keywords):
+    """
+    Returns the sorted, de-duplicated terms of a job's keywords.
+
+    Args:
+        keywords (str): The keywords generated in Step 1.
+
+    Returns:
+        str: The terms separated by spaces.
+    """
+    return " ".join(sorted(set(tokenize(keywords))))
+
+
+class BulletVariantStore:
+    """Persistent store of the enhanced versions generated for each original bullet and the version the user chose.
+
+    Entries are keyed on the original bullet and the signature of the job's keywords. A bullet enhanced for a job
+    whose keywords are close enough to an earlier job's (Jaccard similarity of the keyword terms of at least
+    threshold) is offered the earlier selections and enhanced versions instead of calling the model again. The
+    entries are read once when the store is created; lookups are in memory and safe from the bullet pipeline's
+    background thread, while record writes through the connection of the calling thread.
+
+    Args:
+        conn: A connection to the SQLite database.
+        threshold (float, optional): The minimum keyword similarity for reuse. Defaults to
+            global_vars.bullet_variant_reuse_threshold.
+    """
+
+    def __init__(self, conn, threshold=global_vars.bullet_variant_reuse_threshold):
+        self.conn = conn
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # bullet hash: {keyword signature: (keyword terms, variants, selected bullet)}
+        self._entries = {}
+        # Variants served by lookup, so record stores the generated versions rather than the options offered
+        self._served = {}
+        for row in conn.execute("SELECT bullet_hash, keyword_signature, variants, selected_bullet "
+                                "FROM bullet_variants"):
+            self._entries.setdefault(row[0], {})[row[1]] = (frozenset(row[1].split()), json.loads(row[2]), row[3])
+
+    def lookup(self, original_bullet, keywords):
+        """
+        Returns the stored options for a bullet when an earlier job had close enough keywords.
+
+        Args:
+            original_bullet (str): The original achievement bullet.
+            keywords (str): The keywords generated in Step 1 for the current job.
+
+        Returns:
+            list: The earlier selections, most similar job first, followed by the enhanced versions of the most
+            similar job, or None when nothing close exists.
+        """
+        key = bullet_hash(original_bullet)
+        signature = keyword_signature(keywords)
+        terms = frozenset(signature.split())
+        with self._lock:
+            entries = self._entries.get(key, {})
+            matches = sorted(((_jaccard(terms, entry_terms), variants, selected)
+                              for entry_terms, variants, selected in entries.values()),
+                             key=lambda match: match[0], reverse=True)
+            matches = [match for match in matches if match[0] >= self.threshold]
+            if not matches:
+                return None
+            self._served[(key, signature)] = matches[0][1]
+
+        options = []
+        for similarity, variants, selected in matches:
+            if selected and bullet_hash(selected) != key and selected not in options:
+                options.append(selected)
+        options.extend(variant for variant in matches[0][1] if variant not in options)
+        return options
+
+    @profiled("db_write")
+    def record(self, original_bullet, keywords, options, selected_bullet):
+        """
+        Stores the enhanced versions of a bullet for a job and the version the user chose.
+
+        Args:
+            original_bullet (str): The original achievement bullet.
+            keywords (str): The keywords generated in Step 1 for the current job.
+            options (list): The enhanced versions offered, without the original bullet.
+            selected_bullet (str): The bullet the user chose or wrote.
+        """
+        key = bullet_hash(original_bullet)
+        signature = keyword_signature(keywords)
+        with self._lock:
+            variants = self._served.pop((key, signature), None) or list(options)
+            self._entries.setdefault(key, {})[signature] = (frozenset(signature.split()), variants, selected_bullet)
+        with self.conn:
+            self.conn.execute("INSERT INTO bullet_variants (bullet_hash, keyword_signature, original_bullet, variants, "
+                              "selected_bullet, date_updated) VALUES (?, ?, ?, ?, ?, ?) "
+                              "ON CONFLICT (bullet_hash, keyword_signature) DO UPDATE SET "
+                              "variants = excluded.variants, selected_bullet = excluded.selected_bullet, "
+                              "date_updated = excluded.date_updated",
+                              (key, signature, original_bullet, json.dumps(variants), selected_bullet,
+                               datetime.datetime.now().isoformat(timespec="seconds")))
+
+
+def load_bullet_variant_store(conn):
+    """
+    Creates the BulletVariantStore for Step 2, unless reuse is turned off.
+
+    Args:
+        conn: A connection to the SQLite database.
+
+    Returns:
+        BulletVariantStore: The store, or None when bullet_variant_reuse_threshold is None.
+    """
+    if global_vars.bullet_variant_reuse_threshold is None:
+        return None
+    return BulletVariantStore(conn)
+
+
+def _jaccard(terms, other_terms):
+    # Two jobs without keywords count as identical
+    if not terms and not other_terms:
+        return 1.0
+    return len(terms & other_terms) / len(terms | other_terms)
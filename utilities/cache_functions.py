@@ -0,0 +1,165 @@
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+import variables.global_variables as global_vars
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+class CachedResponse:
+    """Stand-in for a GenerateContentResponse that was served from the response cache."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class ResponseCache:
+    """Persistent, size-bounded LRU cache of generative model responses stored in SQLite.
+
+    Args:
+        db_file (str, optional): The SQLite file holding the cache. Defaults to global_vars.llm_cache_db_file.
+        max_entries (int, optional): Number of responses kept before the least recently used are evicted.
+        ttl_seconds (int, optional): Age in seconds after which a cached response is ignored. None disables it.
+    """
+
+    def __init__(self, db_file=global_vars.llm_cache_db_file, max_entries=gemini_cfg.response_cache_max_entries,
+                 ttl_seconds=gemini_cfg.response_cache_ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        # The async engine reads and writes the cache from its event loop thread
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS llm_cache ("
+                           "cache_key TEXT not null constraint llm_cache_pk primary key, "
+                           "model_name TEXT, "
+                           "response_text BLOB not null, "
+                           "created_at REAL not null, "
+                           "last_accessed REAL not null)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_accessed ON llm_cache (last_accessed)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, cache_key):
+        """Returns the cached response for a key, or None on a miss or an expired entry.
+
+        Args:
+            cache_key (str): A key created by make_cache_key.
+
+        Returns:
+            CachedResponse: The cached response, or None.
+        """
+        now = time.time()
+        with self._lock:
+            result = self._conn.execute("SELECT response_text, created_at FROM llm_cache WHERE cache_key = ?",
+                                        (cache_key,)).fetchone()
+            if result is None or (self.ttl_seconds is not None and now - result[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE cache_key = ?", (now, cache_key))
+            self._conn.commit()
+            self.hits += 1
+        return CachedResponse(result[0])
+
+    def put(self, cache_key, model_name, response_text):
+        """Stores a response and evicts the least recently used entries once the cache is full.
+
+        Args:
+            cache_key (str): A key created by make_cache_key.
+            model_name (str): Name of the model that produced the response.
+            response_text (str): The response text.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO llm_cache "
+                                        "(cache_key, model_name, response_text, created_at, last_accessed) "
+                                        "VALUES (?, ?, ?, ?, ?)",
+                                        (cache_key, model_name, response_text, now, now))
+            if cursor.rowcount == 0:
+                # An expired entry for the same key is refreshed in place
+                self._conn.execute("UPDATE llm_cache SET response_text = ?, created_at = ?, last_accessed = ? "
+                                   "WHERE cache_key = ?", (response_text, now, now, cache_key))
+            self._entries += cursor.rowcount
+            if self._entries > self.max_entries:
+                # Evict down to 90% of the limit so eviction doesn't run on every insert
+                overflow = self._entries - int(self.max_entries * 0.9)
+                self._conn.execute("DELETE FROM llm_cache WHERE cache_key IN "
+                                   "(SELECT cache_key FROM llm_cache ORDER BY last_accessed LIMIT ?)", (overflow,))
+                self._entries -= overflow
+            self._conn.commit()
+
+    def clear(self):
+        """Removes every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._entries = 0
+
+    def summary(self):
+        """Returns a one-line description of the hit and miss counters."""
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0
+        return f"Response cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate)"
+
+
+def make_cache_key(model, prompt_parts):
+    """Creates a content-addressed cache key for a model call.
+
+    The key is a SHA-256 hash of the model name, generation config, safety settings and prompt parts, so any
+    change to one of them results in a new key.
+
+    Args:
+        model: The Google generative AI model object.
+        prompt_parts: The prompt parts for the API call.
+
+    Returns:
+        str: The hex digest cache key.
+    """
+    key_material = {
+        "model_name": getattr(model, "model_name", type(model).__name__),
+        "generation_config": _normalise(getattr(model, "_generation_config", None)),
+        "safety_settings": _normalise(getattr(model, "_safety_settings", None)),
+        "prompt_parts": _normalise(prompt_parts),
+    }
+    serialised = json.dumps(key_material, sort_keys=True, default=str)
+    return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+
+def get_response_cache():
+    """Returns the shared response cache, creating it on first use.
+
+    Returns:
+        ResponseCache: The shared cache, or None when gemini_cfg.response_cache_enabled is False.
+    """
+    global _default_cache
+    if not gemini_cfg.response_cache_enabled:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+            atexit.register(_print_cache_summary, _default_cache)
+    return _default_cache
+
+
+def _print_cache_summary(cache):
+    if cache.hits or cache.misses:
+        print(cache.summary())
+
+
+def _normalise(value):
+    # Safety settings use enum keys, which json.dumps cannot serialise as dictionary keys
+    if isinstance(value, dict):
+        return {str(key): _normalise(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(item) for item in value]
+    return value
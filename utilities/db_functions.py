@@ -0,0 +1,229 @@
+import sqlite3
+import threading
+from functools import lru_cache
+
+# Import Global Variables
+import variables.global_variables as global_vars
+from utilities.migration_functions import migrate
+from utilities.profile_functions import profiled, span
+
+_config = None
+_config_lock = threading.Lock()
+_table_columns = {}
+
+
+def connect(db_file=global_vars.sqlite_db_file, check_same_thread=True):
+    """
+    Opens the application database in WAL mode with the pragmas from variables/global_variables.py and brings its
+    schema up to date.
+
+    WAL lets readers and one writer work at the same time, and the busy timeout makes a second writer wait for the
+    lock instead of failing with "database is locked", so several steps can run against the database at once.
+
+    Args:
+        db_file (str, optional): The SQLite database file. Defaults to global_vars.sqlite_db_file.
+        check_same_thread (bool, optional): Set to False to use the connection from another thread, such as the
+            background event loop. Defaults to True.
+
+    Returns:
+        sqlite3.Connection: The connection, returning sqlite3.Row records.
+    """
+    conn = sqlite3.connect(db_file, timeout=global_vars.sqlite_pragmas["busy_timeout"] / 1000,
+                           check_same_thread=check_same_thread, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    for name, value in global_vars.sqlite_pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    migrate(conn)
+    return conn
+
+
+def load_config(conn, reload=False):
+    """
+    Loads the config table into memory once per process.
+
+    Args:
+        conn: A connection to the SQLite database.
+        reload (bool, optional): Set to True to read the table again. Defaults to False.
+
+    Returns:
+        dict: The config values keyed by config key.
+    """
+    global _config
+    with _config_lock:
+        if _config is None or reload:
+            _config = {key: value for key, value in conn.execute("SELECT key, value FROM config")}
+        return _config
+
+
+class JobRecord:
+    """Base class for lightweight job_applications records created by job_record_class.
+
+    Records only hold the selected columns in __slots__ and support both record.column and record['column'].
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, column):
+        return getattr(self, column)
+
+    def __repr__(self):
+        values = ", ".join(f"{column}={getattr(self, column)!r:.40}" for column in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+@lru_cache(maxsize=None)
+def job_record_class(columns):
+    """
+    Returns the record class for a tuple of job_applications columns, creating it on first use.
+
+    Args:
+        columns (tuple): The column names held by the record.
+
+    Returns:
+        type: A JobRecord subclass with one slot per column.
+    """
+    def __init__(self, *values):
+        for column, value in zip(columns, values):
+            setattr(self, column, value)
+
+    return type("JobRecord", (JobRecord,), {"__slots__": columns, "__init__": __init__})
+
+
+def iter_jobs(conn, columns, status=None, where=None, parameters=(), batch_size=500):
+    """
+    Streams job_applications records, selecting only the given columns.
+
+    Rows are read in job_application_id order in batches of batch_size, each batch a separate query resuming after
+    the last id seen. No statement stays open between batches, so the caller can update the jobs it is looping
+    over, and memory stays flat however many jobs match.
+
+    Args:
+        conn: A connection to the SQLite database.
+        columns (iterable): The columns to select. job_application_id is always included.
+        status (str, optional): Only return jobs with this status. Defaults to None.
+        where (str, optional): An extra SQL condition with ? placeholders. Defaults to None.
+        parameters (tuple, optional): The values for the placeholders in where. Defaults to ().
+        batch_size (int, optional): Number of rows read per query. Defaults to 500.
+
+    Yields:
+        JobRecord: One record per matching job.
+
+    Raises:
+        ValueError: If a column does not exist in job_applications.
+    """
+    columns = tuple(dict.fromkeys(("job_application_id",) + tuple(columns)))
+    unknown_columns = set(columns) - _columns(conn, "job_applications")
+    if unknown_columns:
+        raise ValueError(f"Unknown job_applications column(s): {', '.join(sorted(unknown_columns))}")
+    record_class = job_record_class(columns)
+
+    conditions, filter_parameters = _job_conditions(status, where, parameters)
+    query = (f"SELECT {', '.join(columns)} FROM job_applications "
+             f"WHERE {' AND '.join(['job_application_id > ?'] + conditions)} ORDER BY job_application_id LIMIT ?")
+
+    last_id = -1
+    while True:
+        # A plain tuple cursor avoids building an sqlite3.Row per row
+        with span("db_read"):
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(query, [last_id, *filter_parameters, batch_size]).fetchall()
+            cursor.close()
+        for row in rows:
+            yield record_class(*row)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][0]
+
+
+def count_jobs(conn, status=None, where=None, parameters=()):
+    """
+    Counts the jobs matching the same filters as iter_jobs, using the indexes only.
+
+    Args:
+        conn: A connection to the SQLite database.
+        status (str, optional): Only count jobs with this status. Defaults to None.
+        where (str, optional): An extra SQL condition with ? placeholders. Defaults to None.
+        parameters (tuple, optional): The values for the placeholders in where. Defaults to ().
+
+    Returns:
+        int: The number of matching jobs.
+    """
+    conditions, filter_parameters = _job_conditions(status, where, parameters)
+    query = "SELECT count(*) FROM job_applications"
+    if conditions:
+        query += f" WHERE {' AND '.join(conditions)}"
+    return conn.execute(query, filter_parameters).fetchone()[0]
+
+
+def update_job(conn, job_application_id, **columns):
+    """
+    Writes several job_applications columns for one job in a single statement and transaction.
+
+    Args:
+        conn: A connection to the SQLite database.
+        job_application_id (int): The job_applications primary key.
+        **columns: The new values keyed by column name.
+
+    Raises:
+        ValueError: If a column does not exist in job_applications.
+    """
+    update_jobs(conn, [(job_application_id, columns)])
+
+
+@profiled("db_write")
+def update_jobs(conn, updates):
+    """
+    Writes column updates for many jobs in a single transaction.
+
+    Updates that set the same columns share one prepared statement executed with executemany.
+
+    Args:
+        conn: A connection to the SQLite database.
+        updates (list): (job_application_id, dict of new values keyed by column name) pairs.
+
+    Raises:
+        ValueError: If a column does not exist in job_applications.
+    """
+    known_columns = _columns(conn, "job_applications")
+    statements = {}
+    for job_application_id, columns in updates:
+        unknown_columns = set(columns) - known_columns
+        if unknown_columns:
+            raise ValueError(f"Unknown job_applications column(s): {', '.join(sorted(unknown_columns))}")
+        column_names = tuple(sorted(columns))
+        statements.setdefault(column_names, []).append(
+            tuple(columns[name] for name in column_names) + (job_application_id,))
+
+    # The connection context manager commits once at the end, or rolls everything back on an error
+    with conn:
+        for column_names, parameters in statements.items():
+            assignments = ", ".join(f"{name} = ?" for name in column_names)
+            conn.executemany(f"UPDATE job_applications SET {assignments} WHERE job_application_id = ?", parameters)
+
+
+def _job_conditions(status, where, parameters):
+    # Builds the shared WHERE conditions and their parameters for iter_jobs and count_jobs
+    conditions = []
+    filter_parameters = []
+    if status is not None:
+        conditions.append("status = ?")
+        filter_parameters.append(status)
+    if where:
+        conditions.append(f"({where})")
+        filter_parameters.extend(parameters)
+    return conditions, filter_parameters
+
+
+def _columns(conn, table_name):
+    # Column names are read once per database file, schema version and table, since the schema version changes with
+    # every migration. In-memory databases have no file to tell them apart, so they are read every time.
+    db_file, schema_version = conn.execute("SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'), "
+                                           "(SELECT schema_version FROM pragma_schema_version)").fetchone()
+    key = (db_file, schema_version, table_name)
+    columns = _table_columns.get(key) if db_file else None
+    if columns is None:
+        columns = frozenset(row[1] for row in conn.execute(f"PRAGMA table_info({table_name})"))
+        if db_file:
+            _table_columns[key] = columns
+    return columns
@@ -0,0 +1,330 @@
+import hashlib
+import os
+import pickle
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+
+# Import Global Variables
+import variables.global_variables as global_vars
+from utilities.profile_functions import profiled
+
+# Placeholders used by the resume templates
+resume_placeholder_pattern = re.compile(
+    r"jobTitle|summaryParagraph|summaryBullet\d+|job\d+Achievement\d+|skillsPlaceHolder")
+
+# Runs directly in a paragraph, or wrapped in a hyperlink, tracked insertion or smart tag
+_paragraph_text_path = ("./w:r/w:t | ./w:hyperlink/w:r/w:t | ./w:ins/w:r/w:t | ./w:smartTag/w:r/w:t | "
+                        "./w:r/w:br | ./w:hyperlink/w:r/w:br | ./w:ins/w:r/w:br | ./w:smartTag/w:r/w:br")
+
+# Private use characters that mark a placeholder in compiled XML; bump the version when the format changes
+_marker_open, _marker_close = "\ue000", "\ue001"
+_marker_pattern = re.compile(f"{_marker_open}([^{_marker_close}]*){_marker_close}")
+_compiled_template_version = 1
+
+_compiled_templates = {}
+_worker_template = None
+
+
+class CompiledDocxTemplate:
+    """A docx template compiled into its raw package parts with the placeholders located in advance.
+
+    Parts without placeholders are kept as the original bytes. Parts with placeholders are kept as serialised XML
+    split into alternating literal and placeholder segments, so rendering is string concatenation followed by one
+    zip write, without parsing the template again.
+
+    Args:
+        template_hash (str): The SHA-256 hash of the template file and compile settings.
+        parts (list): (zip member name, bytes or list of segments) pairs in package order.
+        placeholders (dict): The number of occurrences keyed by placeholder.
+    """
+
+    def __init__(self, template_hash, parts, placeholders):
+        self.template_hash = template_hash
+        self.parts = parts
+        self.placeholders = placeholders
+
+    @profiled("docx_edit")
+    def render(self, substitutions, output_file):
+        """
+        Writes a document with every placeholder replaced by its substitution.
+
+        Placeholders without a substitution are left as they are, and newlines in a substitution become line breaks.
+
+        Args:
+            substitutions (dict): The replacement text keyed by placeholder.
+            output_file (str): The docx file to write.
+        """
+        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as package:
+            for name, content in self.parts:
+                if isinstance(content, list):
+                    content = "".join(segment if index % 2 == 0 else _substitution_xml(substitutions, segment)
+                                      for index, segment in enumerate(content)).encode("utf-8")
+                package.writestr(name, content)
+
+
+def iter_docx_paragraph_elements(doc):
+    """
+    Yields every paragraph element of a document in one pass: the body, tables (including nested tables),
+    text boxes, and every header and footer part.
+
+    Args:
+        doc (docx.Document): The document to walk.
+
+    Yields:
+        The w:p elements of the document.
+    """
+    yield from doc.element.body.iter(qn("w:p"))
+    # Each header and footer part is visited once, even when several sections link to it
+    for rel in doc.part.rels.values():
+        if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external:
+            yield from rel.target_part.element.iter(qn("w:p"))
+
+
+def find_placeholders_in_docx(doc, placeholders):
+    """
+    Finds which placeholders occur in a document, including placeholders split across runs.
+
+    Args:
+        doc (docx.Document): The document to search.
+        placeholders (iterable): The placeholder names to look for.
+
+    Returns:
+        dict: The number of occurrences keyed by placeholder, for the placeholders that occur.
+    """
+    pattern = _placeholder_pattern(placeholders)
+    occurrences = {}
+    if pattern is None:
+        return occurrences
+    for paragraph in iter_docx_paragraph_elements(doc):
+        for match in pattern.finditer(_paragraph_text(paragraph.xpath(_paragraph_text_path))):
+            occurrences[match.group(0)] = occurrences.get(match.group(0), 0) + 1
+    return occurrences
+
+
+@profiled("docx_edit")
+def render_docx(doc, substitutions):
+    """
+    Replaces every placeholder in a document with its substitution in a single pass.
+
+    Unlike replace_text_in_docx, placeholders are matched on the paragraph text rather than per run, so a
+    placeholder that Word split across several runs is still replaced. The replacement takes the formatting of the
+    run where the placeholder starts, and newlines in a replacement become line breaks. Tables, text boxes,
+    headers and footers are included.
+
+    Args:
+        doc (docx.Document): The document to modify.
+        substitutions (dict): The replacement text keyed by placeholder.
+
+    Returns:
+        int: The number of placeholders replaced.
+    """
+    pattern = _placeholder_pattern(substitutions)
+    if pattern is None:
+        return 0
+    return _substitute_placeholders(doc, pattern, lambda match: str(substitutions[match.group(0)]))
+
+
+@profiled("docx_edit")
+def compile_docx_template(template_file, pattern=resume_placeholder_pattern):
+    """
+    Compiles a docx template, locating every placeholder once, including placeholders split across runs.
+
+    Args:
+        template_file (str): The docx template.
+        pattern (re.Pattern, optional): Matches the placeholders. Defaults to resume_placeholder_pattern.
+
+    Returns:
+        CompiledDocxTemplate: The compiled template.
+    """
+    placeholders = {}
+
+    def mark_placeholder(match):
+        placeholders[match.group(0)] = placeholders.get(match.group(0), 0) + 1
+        return _marker_open + match.group(0) + _marker_close
+
+    doc = Document(template_file)
+    _substitute_placeholders(doc, pattern, mark_placeholder)
+    marked_parts = {doc.part.partname.lstrip("/"): doc.part}
+    for rel in doc.part.rels.values():
+        if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external:
+            marked_parts[rel.target_part.partname.lstrip("/")] = rel.target_part
+
+    parts = []
+    with zipfile.ZipFile(template_file) as package:
+        for name in package.namelist():
+            content = package.read(name)
+            if name in marked_parts:
+                xml = serialize_part_xml(marked_parts[name].element).decode("utf-8")
+                if _marker_open in xml:
+                    content = _marker_pattern.split(xml)
+            parts.append((name, content))
+    return CompiledDocxTemplate(_template_hash(template_file, pattern), parts, placeholders)
+
+
+def load_compiled_template(template_file, pattern=resume_placeholder_pattern,
+                           cache_dir=global_vars.template_cache_dir):
+    """
+    Returns a compiled template, compiling it only when the template file has changed.
+
+    Compiled templates are kept in memory and pickled to cache_dir, keyed by the hash of the template file.
+
+    Args:
+        template_file (str): The docx template.
+        pattern (re.Pattern, optional): Matches the placeholders. Defaults to resume_placeholder_pattern.
+        cache_dir (str, optional): Directory for compiled templates. Defaults to global_vars.template_cache_dir.
+
+    Returns:
+        CompiledDocxTemplate: The compiled template.
+    """
+    template_hash = _template_hash(template_file, pattern)
+    compiled_template = _compiled_templates.get(template_hash)
+    if compiled_template is not None:
+        return compiled_template
+
+    cache_file = Path(cache_dir) / f"{template_hash}.pickle"
+    try:
+        with open(cache_file, "rb") as f:
+            compiled_template = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        compiled_template = compile_docx_template(template_file, pattern)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a concurrent reader never sees a partial pickle
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file, "wb") as f:
+            pickle.dump(compiled_template, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+
+    _compiled_templates[template_hash] = compiled_template
+    return compiled_template
+
+
+def render_docx_batch(template_file, jobs, max_workers=None, cache_dir=global_vars.template_cache_dir):
+    """
+    Renders many documents from one template in a process pool.
+
+    Args:
+        template_file (str): The docx template.
+        jobs (list): (output file, substitutions dict) pairs.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache_dir (str, optional): Directory for compiled templates. Defaults to global_vars.template_cache_dir.
+
+    Returns:
+        list: The output files in the order of jobs.
+    """
+    # Compile in the parent so every worker loads the cached template instead of compiling it
+    load_compiled_template(template_file, cache_dir=cache_dir)
+    chunk_size = max(1, len(jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers, initializer=_load_worker_template,
+                             initargs=(template_file, cache_dir)) as executor:
+        return list(executor.map(_render_worker, jobs, chunksize=chunk_size))
+
+
+def _load_worker_template(template_file, cache_dir):
+    global _worker_template
+    _worker_template = load_compiled_template(template_file, cache_dir=cache_dir)
+
+
+def _render_worker(job):
+    output_file, substitutions = job
+    _worker_template.render(substitutions, output_file)
+    return output_file
+
+
+def _template_hash(template_file, pattern):
+    digest = hashlib.sha256(f"{_compiled_template_version}:{pattern.pattern}:".encode("utf-8"))
+    with open(template_file, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _substitution_xml(substitutions, placeholder):
+    # Escapes a substitution for a w:t element, closing and reopening the element around line breaks
+    text = escape(str(substitutions.get(placeholder, placeholder)))
+    return text.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+
+
+def _substitute_placeholders(doc, pattern, replacement_for):
+    # Replaces every match of pattern in the document's paragraph text with replacement_for(match)
+    replaced = 0
+    for paragraph in iter_docx_paragraph_elements(doc):
+        text_elements = paragraph.xpath(_paragraph_text_path)
+        paragraph_text = _paragraph_text(text_elements)
+        matches = list(pattern.finditer(paragraph_text))
+        if not matches:
+            continue
+
+        # Character offset where each text element starts in the paragraph text
+        offsets = []
+        position = 0
+        for element in text_elements:
+            offsets.append(position)
+            position += len(_element_text(element))
+
+        # Work backwards so earlier offsets stay valid while later text changes
+        for match in reversed(matches):
+            _replace_span(text_elements, offsets, match.start(), match.end(), replacement_for(match))
+            replaced += 1
+    return replaced
+
+
+def _placeholder_pattern(placeholders):
+    # Longest names first so "job1Achievement10" is not matched as "job1Achievement1" followed by "0"
+    names = sorted((str(name) for name in placeholders if name), key=len, reverse=True)
+    if not names:
+        return None
+    return re.compile("|".join(map(re.escape, names)))
+
+
+def _element_text(element):
+    # Line breaks count as one newline character, matching python-docx's run.text
+    if element.tag == qn("w:br"):
+        return "\n"
+    return element.text or ""
+
+
+def _paragraph_text(text_elements):
+    return "".join(_element_text(element) for element in text_elements)
+
+
+def _replace_span(text_elements, offsets, start, end, replacement):
+    # Replaces paragraph_text[start:end], writing the replacement into the text element where the span starts
+    first = True
+    for element, offset in zip(text_elements, offsets):
+        element_text = _element_text(element)
+        element_end = offset + len(element_text)
+        if element_end <= start or offset >= end:
+            continue
+        if element.tag == qn("w:br"):
+            # A break inside the placeholder is consumed by the replacement
+            element.getparent().remove(element)
+            continue
+        local_start = max(start - offset, 0)
+        local_end = min(end - offset, len(element_text))
+        if first:
+            _set_text(element, element_text[:local_start] + replacement + element_text[local_end:])
+            first = False
+        else:
+            _set_text(element, element_text[:local_start] + element_text[local_end:])
+
+
+def _set_text(text_element, text):
+    # Writes text into a w:t element, turning newlines into w:br siblings within the same run
+    lines = text.split("\n")
+    text_element.text = lines[0]
+    text_element.set(qn("xml:space"), "preserve")
+    anchor = text_element
+    for line in lines[1:]:
+        line_break = text_element.makeelement(qn("w:br"), {})
+        anchor.addnext(line_break)
+        new_text_element = text_element.makeelement(qn("w:t"), {qn("xml:space"): "preserve"})
+        new_text_element.text = line
+        line_break.addnext(new_text_element)
+        anchor = new_text_element
@@ -0,0 +1,207 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+# Import Global Variables
+import variables.global_variables as global_vars
+from utilities.db_functions import update_jobs
+from utilities.fit_score_functions import tokenize
+
+# Signature settings; changing any of them needs the minhash tables cleared so every job is indexed again.
+# 20 bands of 6 rows make jobs above roughly 60% similarity likely to share a bucket while unrelated jobs rarely do;
+# candidates are then checked against near_duplicate_threshold using the full signature.
+minhash_permutations = 120
+lsh_bands = 20
+shingle_size = 3
+
+# Step 1 columns copied from a reviewed near-duplicate; the fit score only depends on the requirements and the resume
+reused_review_columns = ("ai_requirements", "original_fit_score", "keywords", "guidance")
+
+_mersenne_prime = np.uint64((1 << 61) - 1)
+_max_hash = np.uint64((1 << 32) - 1)
+_permutation_random = np.random.RandomState(20240101)
+_permutation_a = _permutation_random.randint(1, 1 << 61, size=(minhash_permutations, 1), dtype=np.uint64)
+_permutation_b = _permutation_random.randint(0, 1 << 61, size=(minhash_permutations, 1), dtype=np.uint64)
+
+
+def minhash_signature(text):
+    """
+    Computes the MinHash signature of a text's word shingles.
+
+    Texts shorter than one shingle have no signature: they would all share the same one and match each other.
+
+    Args:
+        text (str): The text, usually a job description.
+
+    Returns:
+        numpy.ndarray: minhash_permutations unsigned 32-bit values, or None for a text of fewer than shingle_size
+            words.
+    """
+    terms = tokenize(text)
+    if len(terms) < shingle_size:
+        return None
+    shingles = {" ".join(terms[index:index + shingle_size]) for index in range(len(terms) - shingle_size + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64,
+                         count=len(shingles))
+    # Universal hashing of every shingle under each permutation; the products wrap, which only reshuffles them
+    with np.errstate(over="ignore"):
+        permuted = (_permutation_a * hashes + _permutation_b) % _mersenne_prime & _max_hash
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def lsh_buckets(signature):
+    """
+    Hashes each band of a signature into a bucket.
+
+    Args:
+        signature (numpy.ndarray): A minhash_signature.
+
+    Returns:
+        list: One signed 64-bit bucket per band, so they fit an SQLite integer.
+    """
+    return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "big", signed=True)
+            for band in np.split(signature, lsh_bands)]
+
+
+def estimated_similarity(signature, other_signature):
+    """
+    Estimates the Jaccard similarity of two texts' shingles from their signatures.
+
+    Args:
+        signature (numpy.ndarray): A minhash_signature.
+        other_signature (numpy.ndarray): Another minhash_signature.
+
+    Returns:
+        float: The share of matching signature values, between 0 and 1.
+    """
+    return float(np.count_nonzero(signature == other_signature)) / minhash_permutations
+
+
+def index_job_descriptions(conn, batch_size=1000):
+    """
+    Adds the signature and LSH buckets of every job description that is not indexed yet.
+
+    Jobs are dropped from the index by triggers when their job description changes or the job is deleted, so they
+    are indexed again here. A job description too short for a signature is stored with an empty one and no buckets,
+    so it is not read again and never matches.
+
+    Args:
+        conn: A connection to the SQLite database.
+        batch_size (int, optional): Jobs written per transaction. Defaults to 1000.
+
+    Returns:
+        int: The number of jobs indexed.
+    """
+    query = ("SELECT j.job_application_id, j.job_description FROM job_applications j "
+             "LEFT JOIN job_description_minhash m ON m.job_application_id = j.job_application_id "
+             "WHERE m.job_application_id IS NULL AND j.job_description IS NOT NULL "
+             "ORDER BY j.job_application_id LIMIT ?")
+    indexed = 0
+    while True:
+        rows = conn.execute(query, (batch_size,)).fetchall()
+        if not rows:
+            return indexed
+        signatures = []
+        buckets = []
+        for job_application_id, job_description in rows:
+            signature = minhash_signature(str(job_description))
+            if signature is None:
+                signatures.append((job_application_id, b""))
+                continue
+            signatures.append((job_application_id, signature.tobytes()))
+            buckets.extend((band, bucket, job_application_id) for band, bucket in enumerate(lsh_buckets(signature)))
+        with conn:
+            conn.executemany("INSERT INTO job_description_minhash (job_application_id, signature) VALUES (?, ?)",
+                             signatures)
+            conn.executemany("INSERT OR IGNORE INTO job_description_lsh (band, bucket, job_application_id) "
+                             "VALUES (?, ?, ?)", buckets)
+        indexed += len(rows)
+
+
+def find_near_duplicates(conn, job_application_id, threshold=global_vars.near_duplicate_threshold,
+                         where="1", parameters=()):
+    """
+    Finds the indexed jobs whose job description is a near-duplicate of an indexed job's.
+
+    Only the jobs sharing an LSH bucket are compared, found through the (band, bucket) primary key, so the lookup
+    does not grow with the number of stored jobs.
+
+    Args:
+        conn: A connection to the SQLite database.
+        job_application_id (int): The job to look up; it must be indexed.
+        threshold (float, optional): Minimum estimated similarity. Defaults to global_vars.near_duplicate_threshold.
+        where (str, optional): An extra SQL condition on the candidate job, aliased j, with ? placeholders.
+            Defaults to no condition.
+        parameters (tuple, optional): The values for the placeholders in where. Defaults to ().
+
+    Returns:
+        list: (job_application_id, similarity) pairs, most similar first.
+    """
+    signature = _load_signature(conn, job_application_id)
+    if signature is None:
+        return []
+    buckets = lsh_buckets(signature)
+    # CROSS JOIN keeps the bucket list as the outer loop, so every bucket is a primary key lookup
+    candidates = conn.execute(
+        f"WITH probe (band, bucket) AS (VALUES {', '.join('(?, ?)' for _ in buckets)}) "
+        f"SELECT DISTINCT m.job_application_id, m.signature FROM probe "
+        f"CROSS JOIN job_description_lsh l ON l.band = probe.band AND l.bucket = probe.bucket "
+        f"JOIN job_description_minhash m ON m.job_application_id = l.job_application_id "
+        f"JOIN job_applications j ON j.job_application_id = l.job_application_id "
+        f"WHERE l.job_application_id != ? AND ({where})",
+        [value for band, bucket in enumerate(buckets) for value in (band, bucket)] + [job_application_id,
+                                                                                        *parameters]).fetchall()
+    matches = [(candidate_id, estimated_similarity(signature, np.frombuffer(candidate_signature, dtype=np.uint32)))
+               for candidate_id, candidate_signature in candidates]
+    return sorted((match for match in matches if match[1] >= threshold), key=lambda match: match[1], reverse=True)
+
+
+def reuse_near_duplicate_reviews(conn, threshold=global_vars.near_duplicate_threshold, job_application_ids=None):
+    """
+    Flags new Step 1 jobs that are near-duplicates of reviewed jobs and copies the reviewed jobs' model output.
+
+    Every Step 1 job without model output is looked up among the jobs that already have it. The closest match is
+    stored in duplicate_of and its requirements, fit score, keywords and guidance are copied, so the job can be
+    reviewed without calling the model.
+
+    Args:
+        conn: A connection to the SQLite database.
+        threshold (float, optional): Minimum estimated similarity; None turns the check off.
+            Defaults to global_vars.near_duplicate_threshold.
+        job_application_ids (iterable, optional): Only look up these jobs. Defaults to None, every Step 1 job
+            without model output.
+
+    Returns:
+        list: (job_application_id, duplicate_of, similarity) for every job flagged.
+    """
+    if threshold is None:
+        return []
+    index_job_descriptions(conn)
+    reviewed = " AND ".join(f"j.{column} IS NOT NULL" for column in reused_review_columns)
+    new_jobs = conn.execute("SELECT job_application_id FROM job_applications WHERE status = 'Step 1 - JD Review' "
+                            "AND duplicate_of IS NULL AND ai_requirements IS NULL").fetchall()
+    if job_application_ids is not None:
+        job_application_ids = set(job_application_ids)
+        new_jobs = [row for row in new_jobs if row[0] in job_application_ids]
+    flagged = []
+    updates = []
+    for (job_application_id,) in new_jobs:
+        matches = find_near_duplicates(conn, job_application_id, threshold, where=reviewed)
+        if not matches:
+            continue
+        duplicate_of, similarity = matches[0]
+        source = conn.execute(f"SELECT {', '.join(reused_review_columns)} FROM job_applications "
+                              f"WHERE job_application_id = ?", (duplicate_of,)).fetchone()
+        updates.append((job_application_id, dict(zip(reused_review_columns, source), duplicate_of=duplicate_of)))
+        flagged.append((job_application_id, duplicate_of, similarity))
+    if updates:
+        update_jobs(conn, updates)
+    return flagged
+
+
+def _load_signature(conn, job_application_id):
+    row = conn.execute("SELECT signature FROM job_description_minhash WHERE job_application_id = ?",
+                       (job_application_id,)).fetchone()
+    # Job descriptions too short for a signature are stored with an empty one
+    return None if row is None or not row[0] else np.frombuffer(row[0], dtype=np.uint32)
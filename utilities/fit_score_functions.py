@@ -0,0 +1,178 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+_token_pattern = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+_stop_words = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers him
+his how i if in into is it its itself just me more most my no nor not of off on once only or other our ours out
+over own same she should so some such than that the their theirs them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase terms, keeping tokens such as "c++", "c#" and "node.js" intact.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The terms in the text, excluding common English stop words.
+    """
+    return [token for token in _token_pattern.findall(str(text).lower()) if token not in _stop_words]
+
+
+class LocalFitScorer:
+    """Deterministic, offline job fit scorer based on BM25-weighted keyword coverage.
+
+    Each job description is turned into a row of BM25 term weights (term frequency saturated by k1 and normalised
+    by document length with b, multiplied by the term's inverse document frequency across the corpus). The fit
+    score is the share of a job's total term weight that also appears in the resume, as a percentage. All jobs are
+    scored together with vectorised NumPy operations over the sparse term matrix.
+
+    Args:
+        corpus (list, optional): Job descriptions used for the document frequencies. Defaults to the jobs scored.
+        k1 (float, optional): BM25 term frequency saturation. Defaults to 1.2.
+        b (float, optional): BM25 document length normalisation. Defaults to 0.75.
+    """
+
+    def __init__(self, corpus=(), k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+        self.document_count = 0
+        self.average_length = 0.0
+        self.document_frequency = np.zeros(0)
+        if corpus:
+            self.fit(corpus)
+
+    def fit(self, corpus):
+        """
+        Computes the document frequencies and average length of a corpus of job descriptions.
+
+        Args:
+            corpus (list): The job description texts.
+
+        Returns:
+            LocalFitScorer: The fitted scorer.
+        """
+        doc_ids, term_ids, _, lengths = self._term_matrix(corpus)
+        # Each (document, term) pair appears once in the sparse matrix, so term id counts are document frequencies
+        self.document_frequency = np.bincount(term_ids, minlength=len(self.vocabulary)).astype(float)
+        self.document_count = len(lengths)
+        self.average_length = float(lengths.mean()) if len(lengths) else 0.0
+        return self
+
+    def score(self, job_texts, resume_texts):
+        """
+        Scores job descriptions against a resume.
+
+        Args:
+            job_texts (list): The job description texts.
+            resume_texts (str or list): One resume text for every job, or a list aligned with job_texts.
+
+        Returns:
+            numpy.ndarray: The fit scores between 0 and 100, rounded to two decimals.
+        """
+        if not self.document_count:
+            self.fit(job_texts)
+
+        job_count = len(job_texts)
+        doc_ids, term_ids, counts, lengths = self._term_matrix(job_texts)
+        vocabulary_size = len(self.vocabulary)
+
+        # Terms first seen while scoring have a document frequency of zero
+        document_frequency = np.zeros(vocabulary_size)
+        document_frequency[:len(self.document_frequency)] = self.document_frequency
+        idf = np.log(1 + (self.document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        average_length = self.average_length or (float(lengths.mean()) if job_count else 0.0) or 1.0
+        length_norm = 1 - self.b + self.b * lengths / average_length
+        weights = idf[term_ids] * counts * (self.k1 + 1) / (counts + self.k1 * length_norm[doc_ids])
+
+        if isinstance(resume_texts, str):
+            resume_terms = np.zeros(vocabulary_size + 1, dtype=bool)
+            resume_terms[[self.vocabulary.get(term, vocabulary_size) for term in set(tokenize(resume_texts))]] = True
+            matched = resume_terms[term_ids]
+        else:
+            # Pair each job with its own resume by keying terms on (document, term)
+            resume_keys = [doc_id * vocabulary_size + self.vocabulary[term]
+                           for doc_id, resume_text in enumerate(resume_texts)
+                           for term in set(tokenize(resume_text)) if term in self.vocabulary]
+            matched = np.isin(doc_ids * vocabulary_size + term_ids, np.array(resume_keys, dtype=np.int64))
+
+        totals = np.bincount(doc_ids, weights=weights, minlength=job_count)
+        matched_totals = np.bincount(doc_ids, weights=weights * matched, minlength=job_count)
+        coverage = np.divide(matched_totals, totals, out=np.zeros(job_count), where=totals > 0)
+        return np.round(coverage * 100, 2)
+
+    def _term_matrix(self, texts):
+        # Returns the sparse document-term matrix as parallel (document id, term id, count) arrays plus the lengths
+        term_counts_per_doc = [Counter(tokenize(text)) for text in texts]
+        unique_terms = np.fromiter(map(len, term_counts_per_doc), dtype=np.int64, count=len(term_counts_per_doc))
+        lengths = np.fromiter((sum(term_counts.values()) for term_counts in term_counts_per_doc), dtype=float,
+                              count=len(term_counts_per_doc))
+        vocabulary = self.vocabulary
+        term_ids = np.fromiter((vocabulary.setdefault(term, len(vocabulary))
+                                for term_counts in term_counts_per_doc for term in term_counts),
+                               dtype=np.int64, count=int(unique_terms.sum()))
+        counts = np.fromiter((count for term_counts in term_counts_per_doc for count in term_counts.values()),
+                             dtype=float, count=int(unique_terms.sum()))
+        doc_ids = np.repeat(np.arange(len(term_counts_per_doc), dtype=np.int64), unique_terms)
+        return doc_ids, term_ids, counts, lengths
+
+
+def load_local_fit_scorer(conn):
+    """
+    Creates a LocalFitScorer fitted on every job description in the database.
+
+    Args:
+        conn: A connection to the SQLite database.
+
+    Returns:
+        LocalFitScorer: The fitted scorer.
+    """
+    cursor = conn.execute("SELECT job_description FROM job_applications WHERE job_description IS NOT NULL")
+    return LocalFitScorer([row[0] for row in cursor])
+
+
+def score_jobs_locally(conn, resume_text, status='Step 1 - JD Review', column='original_fit_score',
+                       only_missing=True, write=True):
+    """
+    Scores every job with a given status against the resume in one batch and writes the scores to the database.
+
+    Args:
+        conn: A connection to the SQLite database.
+        resume_text (str): The resume text. Pass None to score each job against its own generated resume column.
+        status (str, optional): The job status to score. Defaults to 'Step 1 - JD Review'.
+        column (str, optional): 'original_fit_score' or 'final_fit_score'. Defaults to 'original_fit_score'.
+        only_missing (bool, optional): Skip jobs that already have a score. Defaults to True.
+        write (bool, optional): Set to False to compute the scores without updating the database. Defaults to True.
+
+    Returns:
+        dict: The scores keyed by job_application_id.
+    """
+    if column not in ("original_fit_score", "final_fit_score"):
+        raise ValueError(f"Unsupported fit score column: {column}")
+
+    missing_filter = f" AND {column} IS NULL" if only_missing else ""
+    rows = conn.execute(f"SELECT job_application_id, job_description, resume FROM job_applications "
+                        f"WHERE status = ?{missing_filter}", (status,)).fetchall()
+    if not rows:
+        return {}
+
+    job_texts = [str(row[1]) for row in rows]
+    resume_texts = resume_text if resume_text is not None else [str(row[2]) for row in rows]
+    scores = load_local_fit_scorer(conn).score(job_texts, resume_texts)
+
+    job_scores = {row[0]: float(score) for row, score in zip(rows, scores)}
+    if write:
+        conn.executemany(f"UPDATE job_applications SET {column} = ? WHERE job_application_id = ?",
+                         [(score, job_application_id) for job_application_id, score in job_scores.items()])
+        conn.commit()
+    return job_scores
@@ -1,33 +1,74 @@
-import google.generativeai as genai
+import asyncio
+import threading
 import time
 
 from google.api_core.exceptions import GoogleAPIError
 
 # Import Global Variables
 import variables.gemini_variables as gemini_cfg
+from utilities.cache_functions import CachedResponse, get_response_cache, make_cache_key
 from utilities.gobal_functions import strip_non_numeric
+from utilities.model_functions import ModelPool, ModelRouter, create_model_backend, route_model
+from utilities.profile_functions import profiled
+from utilities.rate_limit_functions import backoff_delay, estimate_prompt_tokens, get_circuit_breaker, \
+    get_rate_limiter, is_retryable_error, retry_after_seconds
+from utilities.prompt_functions import build_fit_score_prompt
+from utilities.telemetry_functions import LlmCall, current_call_context, in_call_context
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+# Errors the call functions retry, and raise once the retries run out
+model_call_errors = (GoogleAPIError, ConnectionError, TimeoutError)
+
+# Yielded by stream_generative_api_with_retries when a stream failed part way and the response starts over
+stream_restart = object()
+
+
+class StreamedResponse:
+    """The text of a streamed response, assembled from its chunks, with its timings.
+
+    Args:
+        text (str): The full response text.
+        time_to_first_chunk (float): Seconds until the first chunk arrived, or None when nothing arrived.
+        seconds (float): Seconds until the response was complete.
+    """
+
+    def __init__(self, text, time_to_first_chunk, seconds):
+        self.text = text
+        self.time_to_first_chunk = time_to_first_chunk
+        self.seconds = seconds
+
+    def summary(self):
+        """Returns a one-line report of the time to the first chunk and to the complete response."""
+        first_chunk = f"{self.time_to_first_chunk:.2f}s" if self.time_to_first_chunk is not None else "never"
+        return f"First chunk after {first_chunk}, complete after {self.seconds:.2f}s"
+
 
 def setup_model(google_ai_key,
-                model_name="gemini-pro",  # Default model name
+                model_name=gemini_cfg.default_model_name,  # Default model name
                 generation_config=gemini_cfg.generation_config,  # Generation config settings
-                safety_settings=gemini_cfg.safety_settings):  # Safety settings
-    """Configures and creates a GenerativeModel instance.
+                safety_settings=gemini_cfg.safety_settings,  # Safety settings
+                routes=gemini_cfg.model_routes,  # Model per prompt type
+                backend=None):
+    """Configures the model clients and returns the router that picks one per prompt type.
+
+    The call functions send each prompt to the model its prompt_type is routed to in routes; calls without a route
+    use the default model. Clients are created once per model and generation config and reused.
 
     Args:
         google_ai_key (str): The Google AI key.
-        model_name (str, optional): Name of the model to use. Defaults to "gemini-pro".
-        generation_config: Generation configuration settings.
-        safety_settings: Safety settings for the model.
+        model_name (str, optional): Name of the default model. Defaults to gemini_cfg.default_model_name.
+        generation_config: Generation configuration settings of the default model.
+        safety_settings: Safety settings for every model.
+        routes (dict, optional): Route per prompt type. Defaults to gemini_cfg.model_routes.
+        backend (ModelBackend, optional): Creates the clients. Defaults to the gemini_cfg.model_backend backend.
 
     Returns:
-        genai.GenerativeModel: The configured model instance.
+        ModelRouter: The configured model.
     """
-    key = google_ai_key
-    genai.configure(api_key=key)
-    model = genai.GenerativeModel(model_name=model_name,
-                                  generation_config=generation_config,
-                                  safety_settings=safety_settings)
-    return model
+    pool = ModelPool(backend or create_model_backend(google_ai_key))
+    return ModelRouter(pool, model_name, generation_config, safety_settings, routes)
 
 
 def generate_fit_score(model, job_requirements, resume_text):
@@ -43,74 +84,338 @@ def generate_fit_score(model, job_requirements, resume_text):
         str: The AI-generated fit score as a percentage.
     """
     # Create the prompt parts for generating the fit score
-    fit_prompt_parts = [
-        "Requirement: " + job_requirements + "\n\n"
-        "Resume: " + resume_text + "\n\n"
-        "Persona: Experienced recruiter or hiring manager, adept at identifying strong candidates using both "
-        "ATS and manual review. \n"
-        "Task: \n"
-        "1. **Keyword Matching:**\n"
-        "   - Extract keywords and phrases from the job requirements.\n"
-        "   - Calculate a percentage match based on the frequency of these keywords appearing in the resume.\n"
-        "   - Weight keywords based on their importance in the job description (e.g., using bold formatting or "
-        "(repetition).\n"
-        "2. **Skill Alignment:**\n"
-        "   - Identify specific skills mentioned in the job requirements.\n"
-        "   - Assess the degree to which the resume demonstrates those skills through experiences, achievements, "
-        "or certifications.\n"
-        "   - Assign a percentage score for each skill, considering factors like relevance, depth of experience, "
-        "and quantifiable results.\n"
-        "3. **Experience and Education:**\n"
-        "   - Evaluate the alignment of the candidate's professional experience "
-        "(e.g., job titles, companies, industries) with the job requirements.\n"
-        "   - Assess the relevance of their educational background to the role.\n"
-        "   - Assign a percentage score for each category, considering factors like duration of experience, "
-        "industry reputation, and educational credentials.\n"
-        "4. **Additional Factors (Optional):**\n"
-        "   - Consider incorporating other relevant aspects based on the job description, such as:\n"
-        "     - Alignment with company culture or values\n"
-        "     - Specific certifications or licenses\n"
-        "     - Geographic proximity to the job location\n"
-        "     - Industry awards or recognition\n\n"
-        "Output: A single job fit score between 0 and 100 (XX.XX), calculated as an average of "
-        "the 4 scores above. Refer to the Output Example there is only 1 number.\n"
-        "Output Example: 93.50"
-
-    ]
+    fit_prompt_parts = build_fit_score_prompt(job_requirements, resume_text)
     # TODO remove non numeric characters
     # Generate the fit score using the AI model
-    fit_response = call_generative_api_with_retries(model, fit_prompt_parts)
+    fit_response = call_generative_api_with_retries(model, fit_prompt_parts, prompt_type="fit_score")
     ai_fit = strip_non_numeric(fit_response.text)
 
     return ai_fit
 
 
-def call_generative_api_with_retries(model, prompt_parts, max_retries=3, retry_delay=5):
+@profiled("model_call")
+def call_generative_api_with_retries(model, prompt_parts, max_retries=gemini_cfg.max_retries,
+                                     retry_delay=gemini_cfg.retry_base_delay, use_cache=True, prompt_type=None):
     """Calls a Google generative AI model with retry logic for potential issues.
 
+    Responses are served from and stored in the persistent response cache unless use_cache is False. Every call
+    waits for the shared rate limiter and circuit breaker first. Retryable errors (quota, overload, timeouts,
+    server errors) are retried with exponential backoff and jitter, honouring retry-after hints; fatal errors
+    such as invalid arguments or permission problems are raised immediately. Every call is recorded in the llm_calls
+    telemetry table.
+
     Args:
         model: The Google generative AI model object.
         prompt_parts: The prompt parts for the API call.
-        max_retries (int, optional): Maximum number of retries. Defaults to 3.
-        retry_delay (int, optional): Delay in seconds between retries. Defaults to 5.
+        max_retries (int, optional): Maximum number of attempts.
+        retry_delay (float, optional): Backoff ceiling in seconds for the first retry, doubled on each attempt.
+        use_cache (bool, optional): Set to False to bypass the response cache. Defaults to True.
+        prompt_type (str, optional): What the prompt is for, recorded with the call's telemetry. Defaults to None.
 
     Returns:
-        The response from the model's generate_content() method.
+        The response from the model's generate_content() method, or a CachedResponse.
 
     Raises:
-        GoogleAPIError: If the API request fails after maximum retries.
+        GoogleAPIError: If the API request fails with a fatal error or after maximum retries.
     """
 
+    model = route_model(model, prompt_type)
+    call = LlmCall(model, prompt_parts, prompt_type)
+    cache, cache_key, cached_response = _lookup_cached_response(model, prompt_parts, use_cache)
+    if cached_response is not None:
+        call.finish(cached_response.text, cache_hit=True)
+        return cached_response
+
     for attempt in range(max_retries):
-        response = ""
+        time.sleep(_quota_delay(prompt_parts))
         try:
             response = model.generate_content(prompt_parts)
+            get_circuit_breaker().record(True)
+            response_text = _store_cached_response(cache, cache_key, model, response)
+            call.finish(response_text, getattr(response, "usage_metadata", None), retries=attempt)
             return response  # Successful response, return it
-        except GoogleAPIError as e:
-            print(f"Attempt {attempt+1}: API request failed with error: {e}")
-            if attempt < max_retries - 1:
-                print("Retrying in", retry_delay, "seconds...")
-                time.sleep(retry_delay)
+        except model_call_errors as e:
+            time.sleep(_retry_delay(e, attempt, max_retries, retry_delay, call))
+
+
+@profiled("model_call")
+def stream_generative_api_with_retries(model, prompt_parts, max_retries=gemini_cfg.max_retries,
+                                       retry_delay=gemini_cfg.retry_base_delay, use_cache=True, prompt_type=None):
+    """Streaming companion to call_generative_api_with_retries that yields the response text as it arrives.
+
+    Every attempt waits for the shared rate limiter and circuit breaker, and errors are retried or raised exactly as
+    in call_generative_api_with_retries. When a stream fails after some chunks were yielded and is retried, the
+    stream_restart marker is yielded before the chunks of the new attempt, so the caller can discard the partial
+    text. A cached response is yielded as a single chunk, and a complete response is stored in the cache. A stream that
+    ends without any text raises ValueError, as response.text does for a blocked or empty response.
+
+    Args:
+        model: The Google generative AI model object.
+        prompt_parts: The prompt parts for the API call.
+        max_retries (int, optional): Maximum number of attempts.
+        retry_delay (float, optional): Backoff ceiling in seconds for the first retry, doubled on each attempt.
+        use_cache (bool, optional): Set to False to bypass the response cache. Defaults to True.
+        prompt_type (str, optional): What the prompt is for, recorded with the call's telemetry. Defaults to None.
+
+    Yields:
+        str: The text of each chunk, or stream_restart when the response starts over.
+
+    Raises:
+        GoogleAPIError: If the API request fails with a fatal error or after maximum retries.
+        ValueError: If every chunk of the response was blocked or empty.
+    """
+    model = route_model(model, prompt_type)
+    call = LlmCall(model, prompt_parts, prompt_type)
+    cache, cache_key, cached_response = _lookup_cached_response(model, prompt_parts, use_cache)
+    if cached_response is not None:
+        call.finish(cached_response.text, cache_hit=True)
+        yield cached_response.text
+        return
+
+    for attempt in range(max_retries):
+        time.sleep(_quota_delay(prompt_parts))
+        chunks = []
+        usage_metadata = None
+        try:
+            for chunk in model.generate_content(prompt_parts, stream=True):
+                # The last chunk carries the token counts of the whole response
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                chunk_text = _chunk_text(chunk)
+                if chunk_text:
+                    chunks.append(chunk_text)
+                    yield chunk_text
+            get_circuit_breaker().record(True)
+            if not chunks:
+                # Fail like the text of a blocked or empty GenerateContentResponse, instead of yielding nothing
+                error = ValueError("The streamed response was blocked or empty and has no text.")
+                call.fail(error, attempt)
+                raise error
+            response_text = "".join(chunks)
+            _store_cached_response(cache, cache_key, model, CachedResponse(response_text))
+            call.finish(response_text, usage_metadata, retries=attempt)
+            return
+        except model_call_errors as e:
+            delay = _retry_delay(e, attempt, max_retries, retry_delay, call)
+            if chunks:
+                yield stream_restart
+            time.sleep(delay)
+
+
+def write_streamed_response(chunks, file_name=None, echo=True):
+    """
+    Prints streamed chunks and writes them to a file as they arrive, and assembles the full text.
+
+    The printed and written text is discarded when the stream starts over after a failure.
+
+    Args:
+        chunks (iterable): The chunks yielded by stream_generative_api_with_retries.
+        file_name (str, optional): The file the text is written to. Defaults to None.
+        echo (bool, optional): Set to False to skip printing the chunks. Defaults to True.
+
+    Returns:
+        StreamedResponse: The full text and its timings.
+    """
+    start = time.perf_counter()
+    time_to_first_chunk = None
+    parts = []
+    file = open(file_name, "w") if file_name else None
+    try:
+        for chunk in chunks:
+            if chunk is stream_restart:
+                parts.clear()
+                if echo:
+                    print("\n[The response was interrupted and is starting over]")
+                if file is not None:
+                    file.seek(0)
+                    file.truncate()
+                continue
+            if time_to_first_chunk is None:
+                time_to_first_chunk = time.perf_counter() - start
+            parts.append(chunk)
+            if echo:
+                print(chunk, end="", flush=True)
+            if file is not None:
+                file.write(chunk)
+                file.flush()
+    finally:
+        if file is not None:
+            file.close()
+    if echo:
+        print()
+    return StreamedResponse("".join(parts), time_to_first_chunk, time.perf_counter() - start)
+
+
+@profiled("model_call")
+async def call_generative_api_async(model, prompt_parts, semaphore=None, max_retries=gemini_cfg.max_retries,
+                                    retry_delay=gemini_cfg.retry_base_delay, use_cache=True, prompt_type=None):
+    """Asynchronous companion to call_generative_api_with_retries.
+
+    Uses the model's generate_content_async() when available, otherwise runs generate_content() in a worker
+    thread, so independent prompts can be awaited concurrently on one event loop.
+
+    Args:
+        model: The Google generative AI model object.
+        prompt_parts: The prompt parts for the API call.
+        semaphore (asyncio.Semaphore, optional): Caps the number of requests in flight. Defaults to None.
+        max_retries (int, optional): Maximum number of attempts.
+        retry_delay (float, optional): Backoff ceiling in seconds for the first retry, doubled on each attempt.
+        use_cache (bool, optional): Set to False to bypass the response cache. Defaults to True.
+        prompt_type (str, optional): What the prompt is for, recorded with the call's telemetry. Defaults to None.
+
+    Returns:
+        The response from the model's generate_content() method, or a CachedResponse.
+
+    Raises:
+        GoogleAPIError: If the API request fails with a fatal error or after maximum retries.
+    """
+
+    model = route_model(model, prompt_type)
+    call = LlmCall(model, prompt_parts, prompt_type)
+    cache, cache_key, cached_response = _lookup_cached_response(model, prompt_parts, use_cache)
+    if cached_response is not None:
+        call.finish(cached_response.text, cache_hit=True)
+        return cached_response
+
+    for attempt in range(max_retries):
+        await asyncio.sleep(_quota_delay(prompt_parts))
+        try:
+            if semaphore is None:
+                response = await _generate_content_async(model, prompt_parts)
             else:
-                print("Maximum retries exceeded. Raising the error.")
-                raise  # Re-raise the exception for further handling
+                async with semaphore:
+                    response = await _generate_content_async(model, prompt_parts)
+            get_circuit_breaker().record(True)
+            response_text = _store_cached_response(cache, cache_key, model, response)
+            call.finish(response_text, getattr(response, "usage_metadata", None), retries=attempt)
+            return response
+        except model_call_errors as e:
+            await asyncio.sleep(_retry_delay(e, attempt, max_retries, retry_delay, call))
+
+
+async def generate_fit_score_async(model, job_requirements, resume_text, semaphore=None):
+    """
+    Asynchronous companion to generate_fit_score.
+
+    Args:
+        model (AIModel): The AI model to use for content generation.
+        job_requirements (str): A string containing the job requirements.
+        resume_text (str): A string containing the resume_template text.
+        semaphore (asyncio.Semaphore, optional): Caps the number of requests in flight. Defaults to None.
+
+    Returns:
+        str: The AI-generated fit score as a percentage.
+    """
+    fit_prompt_parts = build_fit_score_prompt(job_requirements, resume_text)
+    fit_response = await call_generative_api_async(model, fit_prompt_parts, semaphore, prompt_type="fit_score")
+    return strip_non_numeric(fit_response.text)
+
+
+def _quota_delay(prompt_parts):
+    # Seconds to wait for the shared rate limiter and an open circuit breaker before sending a request
+    return max(get_rate_limiter().reserve(estimate_prompt_tokens(prompt_parts)), get_circuit_breaker().delay())
+
+
+def _retry_delay(error, attempt, max_retries, retry_delay, call):
+    # Returns the backoff before the next attempt, or records and re-raises fatal errors and the last retryable one
+    print(f"Attempt {attempt+1}: API request failed with error: {error}")
+    if not is_retryable_error(error):
+        print("The error is not retryable. Raising the error.")
+        call.fail(error, attempt)
+        raise error
+    get_circuit_breaker().record(False)
+    if attempt >= max_retries - 1:
+        print("Maximum retries exceeded. Raising the error.")
+        call.fail(error, attempt)
+        raise error
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        # Quota hints apply to every caller sharing the key, not just this request
+        get_rate_limiter().pause(retry_after)
+    delay = backoff_delay(attempt, retry_delay, retry_after=retry_after)
+    print(f"Retrying in {delay:.1f} seconds...")
+    return delay
+
+
+def _lookup_cached_response(model, prompt_parts, use_cache):
+    # Returns the cache, the key for this call and the cached response (None on a miss)
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        return None, None, None
+    cache_key = make_cache_key(model, prompt_parts)
+    return cache, cache_key, cache.get(cache_key)
+
+
+def _store_cached_response(cache, cache_key, model, response):
+    # Caches the response text and returns it, or None when the response has no text
+    try:
+        response_text = response.text
+    except ValueError:
+        # Blocked or empty candidates have no text and are never cached
+        return None
+    if cache is not None:
+        cache.put(cache_key, getattr(model, "model_name", None), response_text)
+    return response_text
+
+
+def _chunk_text(chunk):
+    # Blocked or empty chunks have no text
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+async def _generate_content_async(model, prompt_parts):
+    # Prefer the native async client and fall back to a worker thread for models without one
+    generate_content_async = getattr(model, "generate_content_async", None)
+    if generate_content_async is not None:
+        return await generate_content_async(prompt_parts)
+    return await asyncio.to_thread(model.generate_content, prompt_parts)
+
+
+def get_background_loop():
+    """Returns the shared asyncio event loop running in a daemon thread, starting it on first use.
+
+    Coroutines submitted to the loop keep running while the main thread blocks on input(), which lets the
+    model work ahead of the user. Models with a native async client bind it to the loop it was first used on,
+    so every asynchronous call in the process runs on this one loop.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running event loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_background_loop.run_forever, name="gemini-event-loop", daemon=True)
+            thread.start()
+    return _background_loop
+
+
+def run_on_background_loop(coroutine):
+    """Schedules a coroutine on the shared background loop, in the caller's model call context.
+
+    Args:
+        coroutine: The coroutine to run.
+
+    Returns:
+        concurrent.futures.Future: A future resolving to the coroutine's result.
+    """
+    # The coroutine keeps the caller's call context, so its model calls are attributed to the caller's step and job
+    return asyncio.run_coroutine_threadsafe(in_call_context(coroutine, current_call_context()), get_background_loop())
+
+
+def submit_generative_api_call(model, prompt_parts, semaphore=None, prompt_type=None):
+    """Schedules call_generative_api_async on the shared background loop.
+
+    Args:
+        model: The Google generative AI model object.
+        prompt_parts: The prompt parts for the API call.
+        semaphore (asyncio.Semaphore, optional): Caps the number of requests in flight. Defaults to None.
+        prompt_type (str, optional): What the prompt is for, which selects its model route and is recorded with the
+            call's telemetry. Defaults to None.
+
+    Returns:
+        concurrent.futures.Future: A future resolving to the model response.
+    """
+    return run_on_background_loop(call_generative_api_async(model, prompt_parts, semaphore, prompt_type=prompt_type))
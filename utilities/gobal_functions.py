@@ -1,6 +1,9 @@
 import re
 import sqlite3
 
+from utilities.db_functions import load_config
+from utilities.profile_functions import profiled
+
 
 def remove_non_letters_from_start(text_list):
     """
@@ -23,6 +26,7 @@ def remove_non_letters_from_start(text_list):
     return modified_list
 
 
+@profiled("parse")
 def create_list_from_lines(text):
     """
     Creates a list of items from the provided text, removing blank lines.
@@ -37,6 +41,7 @@ def create_list_from_lines(text):
     return [line.strip() for line in text.splitlines() if line.strip()]
 
 
+@profiled("docx_edit")
 def replace_text_in_docx(doc, target_text, replacement_text):
     """
     Replaces target_text with replacement_text in a docx document.
@@ -147,6 +152,7 @@ def user_selects_options(choices_list, number_of_choices=3):
     return selection_list
 
 
+@profiled("parse")
 def strip_non_numeric(text):
     """
     Strips all non-numeric characters from a string.
@@ -164,8 +170,10 @@ def strip_non_numeric(text):
 def get_config_value_from_key(cursor, key):
     """Retrieves the value associated with the given key from the config table in the database.
 
+    The config table is read once per process and served from memory afterwards.
+
     Args:
-        cursor: A cursor object connected to the SQLite database.
+        cursor: A cursor or connection to the SQLite database.
         key: The key to search for in the config table.
 
     Returns:
@@ -173,18 +181,17 @@ def get_config_value_from_key(cursor, key):
     """
 
     try:
-        # Execute the SQL query to retrieve the value for the given key
-        cursor.execute(f"SELECT value FROM config WHERE key = '{key}'")
-        result = cursor.fetchone()
-
-        if result:
-            # Return the value associated with the key directly
-            return result[0]
-        else:
-            # Print a message if the key is not found in the config table
-            print(f"{key} not found in the config table.")
-            return None
+        # Load the config table once and look the key up in memory
+        config = load_config(getattr(cursor, "connection", cursor))
     except sqlite3.Error as e:
         # Print an error message if there is an error retrieving the value from the database
         print(f"Error retrieving {key} from database:", e)
         return None
+
+    if key in config:
+        # Return the value associated with the key directly
+        return config[key]
+    else:
+        # Print a message if the key is not found in the config table
+        print(f"{key} not found in the config table.")
+        return None
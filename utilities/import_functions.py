@@ -0,0 +1,311 @@
+import csv
+import html
+import json
+import re
+import unicodedata
+from html.parser import HTMLParser
+from itertools import islice
+from pathlib import Path
+
+# job_applications columns a posting can set; company_name and job_title are the business key
+job_posting_columns = ('company_name', 'job_title', 'link', 'job_description', 'company_mission', 'company_values',
+                       'recent_news')
+
+# Other field names used by job boards and exports, mapped to job_applications columns
+job_posting_aliases = {
+    'company': 'company_name',
+    'employer': 'company_name',
+    'organization': 'company_name',
+    'title': 'job_title',
+    'position': 'job_title',
+    'role': 'job_title',
+    'url': 'link',
+    'job_url': 'link',
+    'description': 'job_description',
+    'mission': 'company_mission',
+    'values': 'company_values',
+    'news': 'recent_news',
+}
+
+job_posting_file_types = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.html': 'html', '.htm': 'html'}
+
+_blank_lines = re.compile(r'\n{3,}')
+_block_tags = {'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article'}
+_key_columns = ('company_name', 'job_title')
+
+
+class ImportCounts:
+    """Counts the postings inserted, updated and skipped by import_job_postings."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.skipped
+
+    def __str__(self):
+        return f"{self.inserted} inserted, {self.updated} updated, {self.skipped} skipped"
+
+
+def normalize_text(text):
+    """
+    Normalizes posting text: Unicode compatibility forms, HTML entities, line endings and runs of whitespace.
+
+    Args:
+        text: The text to normalize, or None.
+
+    Returns:
+        str: The normalized text, or None when nothing but whitespace is left.
+    """
+    if text is None:
+        return None
+    text = html.unescape(str(text))
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    # str.split is several times faster than a regular expression for collapsing whitespace
+    text = '\n'.join(' '.join(line.split()) for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    if '\n\n\n' in text:
+        text = _blank_lines.sub('\n\n', text)
+    return text.strip() or None
+
+
+def normalize_job_posting(record):
+    """
+    Maps a raw posting to job_applications columns and normalizes every value.
+
+    Args:
+        record (dict): The posting fields, using column names or names from job_posting_aliases.
+
+    Returns:
+        dict: The normalized values keyed by column, or None when the company name or job title is missing.
+    """
+    posting = {}
+    for field, value in record.items():
+        if field is None:
+            continue
+        column = field.strip().lower().replace(' ', '_')
+        column = job_posting_aliases.get(column, column)
+        if column in job_posting_columns and posting.get(column) is None:
+            posting[column] = normalize_text(value)
+    # The business key is a single line
+    for column in _key_columns:
+        if posting.get(column):
+            posting[column] = ' '.join(posting[column].split())
+    if not posting.get('company_name') or not posting.get('job_title'):
+        return None
+    return posting
+
+
+def read_job_postings(file_name):
+    """
+    Streams the raw postings of a CSV, JSONL or saved HTML file, or of every such file in a directory.
+
+    Args:
+        file_name (str): The file or directory to read.
+
+    Yields:
+        dict: One raw posting at a time.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    path = Path(file_name)
+    if path.is_dir():
+        for child in sorted(path.iterdir()):
+            if child.suffix.lower() in job_posting_file_types:
+                yield from read_job_postings(child)
+        return
+
+    file_type = job_posting_file_types.get(path.suffix.lower())
+    if file_type == 'csv':
+        # Job descriptions easily exceed the csv module's default 128 KB field limit
+        csv.field_size_limit(2 ** 31 - 1)
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+    elif file_type == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif file_type == 'html':
+        with open(path, encoding='utf-8', errors='replace') as f:
+            posting = parse_job_posting_html(f.read())
+        if posting is not None:
+            posting['link'] = posting.get('link') or path.resolve().as_uri()
+            yield posting
+    else:
+        raise ValueError(f"Unsupported job posting file: {file_name}")
+
+
+def parse_job_posting_html(page):
+    """
+    Extracts a posting from a saved job posting page.
+
+    The schema.org JobPosting data most job boards embed is used when present; otherwise the page title, site name
+    and visible text.
+
+    Args:
+        page (str): The HTML of the page.
+
+    Returns:
+        dict: The raw posting, or None when the page has no title.
+    """
+    parser = _JobPostingHTMLParser()
+    parser.feed(page)
+    parser.close()
+
+    for data in parser.json_ld:
+        for item in _iter_json_ld_items(data):
+            if item.get('@type') == 'JobPosting' or 'JobPosting' in (item.get('@type') or ()):
+                organization = item.get('hiringOrganization') or {}
+                return {'company_name': organization.get('name') if isinstance(organization, dict) else organization,
+                        'job_title': item.get('title'),
+                        'link': item.get('url'),
+                        'job_description': html_to_text(item.get('description') or '')}
+
+    title = parser.meta.get('og:title') or parser.title
+    if not title:
+        return None
+    return {'company_name': parser.meta.get('og:site_name'), 'job_title': title,
+            'link': parser.meta.get('og:url'), 'job_description': '\n'.join(parser.text)}
+
+
+def html_to_text(fragment):
+    """
+    Converts an HTML fragment to plain text, starting a new line at every block element.
+
+    Args:
+        fragment (str): The HTML.
+
+    Returns:
+        str: The text.
+    """
+    parser = _JobPostingHTMLParser()
+    parser.feed(fragment)
+    parser.close()
+    return '\n'.join(parser.text)
+
+
+def import_job_postings(conn, postings, batch_size=10000, counts=None):
+    """
+    Upserts postings into job_applications on the (company_name, job_title) business key.
+
+    Postings are normalized and written with executemany, one transaction per batch, so memory stays flat however
+    many postings are read. New postings are inserted with the default status; for existing jobs only the columns
+    the posting provides and that differ are updated, leaving the status and generated columns alone.
+
+    Args:
+        conn: A connection to the SQLite database.
+        postings (iterable): Raw postings, for example from read_job_postings.
+        batch_size (int, optional): Postings written per transaction. Defaults to 10000.
+        counts (ImportCounts, optional): Counts to add to. Defaults to a new ImportCounts.
+
+    Returns:
+        ImportCounts: The postings inserted, updated and skipped.
+    """
+    counts = counts or ImportCounts()
+    value_columns = [column for column in job_posting_columns if column not in _key_columns]
+    assignments = ', '.join(f'{column} = coalesce(excluded.{column}, {column})' for column in value_columns)
+    changed = ' OR '.join(f'(excluded.{column} IS NOT NULL AND excluded.{column} IS NOT {column})'
+                          for column in value_columns)
+    upsert = (f"INSERT INTO job_applications ({', '.join(job_posting_columns)}) "
+              f"VALUES ({', '.join('?' for _ in job_posting_columns)}) "
+              f"ON CONFLICT (company_name, job_title) DO UPDATE SET {assignments} WHERE {changed}")
+
+    postings = iter(postings)
+    while True:
+        batch = list(islice(postings, batch_size))
+        if not batch:
+            return counts
+        rows = []
+        for record in batch:
+            posting = normalize_job_posting(record)
+            if posting is None:
+                counts.skipped += 1
+            else:
+                rows.append(tuple(posting.get(column) for column in job_posting_columns))
+
+        with conn:
+            # Inserted rows are the ones given an id above the current maximum; the rest of the changes are updates
+            last_id = conn.execute("SELECT coalesce(max(job_application_id), 0) FROM job_applications").fetchone()[0]
+            changes = conn.executemany(upsert, rows).rowcount
+            inserted = conn.execute("SELECT count(*) FROM job_applications WHERE job_application_id > ?",
+                                    (last_id,)).fetchone()[0]
+        counts.inserted += inserted
+        counts.updated += changes - inserted
+        counts.skipped += len(rows) - changes
+
+
+def _iter_json_ld_items(data):
+    # JSON-LD holds a single item, a list of items or a @graph of items
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _iter_json_ld_items(data.get('@graph'))
+
+
+class _JobPostingHTMLParser(HTMLParser):
+    # Collects the visible text by line, the page title, meta properties and JSON-LD blocks
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text = []
+        self.title = None
+        self.meta = {}
+        self.json_ld = []
+        self._line = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._json_ld_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and (attrs.get('type') or '').lower() == 'application/ld+json':
+            self._json_ld_parts = []
+        elif tag in ('script', 'style', 'noscript', 'template'):
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'meta' and attrs.get('content'):
+            name = attrs.get('property') or attrs.get('name')
+            if name:
+                self.meta.setdefault(name.lower(), attrs['content'])
+        if tag in _block_tags:
+            self._end_line()
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._json_ld_parts is not None:
+            try:
+                self.json_ld.append(json.loads(''.join(self._json_ld_parts)))
+            except ValueError:
+                pass
+            self._json_ld_parts = None
+        elif tag in ('script', 'style', 'noscript', 'template'):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'title':
+            self._in_title = False
+        if tag in _block_tags:
+            self._end_line()
+
+    def handle_data(self, data):
+        if self._json_ld_parts is not None:
+            self._json_ld_parts.append(data)
+        elif self._in_title:
+            self.title = ((self.title or '') + data).strip()
+        elif not self._skip_depth:
+            self._line.append(data)
+
+    def close(self):
+        super().close()
+        self._end_line()
+
+    def _end_line(self):
+        line = ' '.join(''.join(self._line).split())
+        if line:
+            self.text.append(line)
+        self._line = []
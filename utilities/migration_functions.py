@@ -0,0 +1,190 @@
+import sqlite3
+
+# Original job_applications definition from init.py
+_job_applications_columns = [
+    "job_application_id integer not null constraint job_applications_pk primary key autoincrement",
+    "company_name           TEXT                                 not null",
+    "job_title              TEXT                                 not null",
+    "link                   TEXT",
+    "job_description        BLOB",
+    "company_mission        BLOB",
+    "company_values         BLOB",
+    "recent_news            BLOB",
+    "date_applied           TEXT",
+    "status                 TEXT    default 'Step 1 - JD Review' not null",
+    "original_fit_score     integer",
+    "final_fit_score        integer",
+    "ai_requirements        BLOB",
+    "keywords               BLOB",
+    "guidance               BLOB",
+    "resume_summary         BLOB",
+    "resume_summary_bullets BLOB",
+    "resume                 BLOB",
+    "linkedin_post_url      TEXT",
+    "linkedin_comment       BLOB",
+    "email                  BLOB",
+    "followup               BLOB",
+    "date_resume_created    TEXT",
+    "date_jd_review         TEXT",
+    "date_created           INTEGER default current_date",
+    "date_emailed           TEXT",
+    "date_email_followup    TEXT",
+    "constraint job_applications_business_key unique(company_name, job_title)",
+]
+
+_config_columns = [
+    "key TEXT not null constraint config_pk unique",
+    "value TEXT not null"
+]
+
+
+def _create_tables(conn):
+    # Databases created by the original init.py already have both tables, so they start at this version
+    conn.execute(f"CREATE TABLE IF NOT EXISTS job_applications ({', '.join(_job_applications_columns)})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS config ({', '.join(_config_columns)})")
+
+
+def _add_resume_selection_columns(conn):
+    # Bullet selections and skills stored by step 2 so resumes can be rendered again
+    ensure_columns(conn, "job_applications", {"resume_bullets": "BLOB", "resume_skills": "BLOB"})
+
+
+def _add_status_and_date_indexes(conn):
+    # Every step selects its jobs by status; job_application_id keeps each status in insertion order for paging
+    conn.execute("CREATE INDEX IF NOT EXISTS job_applications_status "
+                 "ON job_applications (status, job_application_id)")
+    # Partial indexes for the steps that also filter on a date. They only hold the jobs waiting in that step, so
+    # they stay small as finished jobs pile up. SQLite only uses them for queries that repeat the same conditions,
+    # which no step does, so _drop_partial_date_indexes drops them again.
+    conn.execute("CREATE INDEX IF NOT EXISTS job_applications_applied "
+                 "ON job_applications (date_applied) WHERE status = 'Step 3 - Apply' AND date_applied IS NOT NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS job_applications_followup "
+                 "ON job_applications (date_email_followup) WHERE status = 'Step 6 - Follow-Up'")
+    conn.execute("ANALYZE job_applications")
+
+
+def _add_job_description_minhash(conn):
+    # MinHash signatures and LSH buckets of job descriptions, used by utilities/duplicate_functions.py
+    conn.execute("CREATE TABLE IF NOT EXISTS job_description_minhash ("
+                 "job_application_id integer not null constraint job_description_minhash_pk primary key, "
+                 "signature BLOB not null)")
+    conn.execute("CREATE TABLE IF NOT EXISTS job_description_lsh ("
+                 "band integer not null, "
+                 "bucket integer not null, "
+                 "job_application_id integer not null, "
+                 "constraint job_description_lsh_pk primary key (band, bucket, job_application_id)) WITHOUT ROWID")
+    conn.execute("CREATE INDEX IF NOT EXISTS job_description_lsh_job ON job_description_lsh (job_application_id)")
+    # Drop a job from the index when its description changes or it is deleted, so it is indexed again
+    for trigger, event in (("job_description_minhash_update",
+                            "AFTER UPDATE OF job_description ON job_applications "
+                            "WHEN old.job_description IS NOT new.job_description"),
+                           ("job_description_minhash_delete", "AFTER DELETE ON job_applications")):
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} {event} BEGIN "
+                     f"DELETE FROM job_description_minhash WHERE job_application_id = old.job_application_id; "
+                     f"DELETE FROM job_description_lsh WHERE job_application_id = old.job_application_id; "
+                     f"END")
+    # The reviewed job a near-duplicate reused its Step 1 output from
+    ensure_columns(conn, "job_applications", {"duplicate_of": "INTEGER"})
+
+
+def _create_bullet_variants(conn):
+    # Enhanced bullet versions and the user's selections kept across jobs, used by utilities/bullet_variant_functions.py
+    conn.execute("CREATE TABLE IF NOT EXISTS bullet_variants ("
+                 "bullet_hash TEXT not null, "
+                 "keyword_signature TEXT not null, "
+                 "original_bullet TEXT not null, "
+                 "variants BLOB not null, "
+                 "selected_bullet TEXT, "
+                 "date_updated TEXT, "
+                 "constraint bullet_variants_pk primary key (bullet_hash, keyword_signature)) WITHOUT ROWID")
+
+
+def _create_llm_calls(conn):
+    # Telemetry of every model call, written by utilities/telemetry_functions.py
+    conn.execute("CREATE TABLE IF NOT EXISTS llm_calls ("
+                 "llm_call_id integer not null constraint llm_calls_pk primary key autoincrement, "
+                 "created_at REAL not null, "
+                 "step TEXT, "
+                 "prompt_type TEXT, "
+                 "job_application_id integer, "
+                 "model_name TEXT, "
+                 "input_tokens integer, "
+                 "output_tokens integer, "
+                 "latency_seconds REAL not null, "
+                 "retries integer not null default 0, "
+                 "cache_hit integer not null default 0, "
+                 "error_class TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_created_at ON llm_calls (created_at)")
+
+
+def _drop_partial_date_indexes(conn):
+    # iter_jobs binds the status as a parameter, so SQLite never matches the partial indexes' literal conditions, and
+    # nothing selects by date_email_followup; job_applications_status serves every step's selection
+    conn.execute("DROP INDEX IF EXISTS job_applications_applied")
+    conn.execute("DROP INDEX IF EXISTS job_applications_followup")
+    conn.execute("ANALYZE job_applications")
+
+
+# Schema migrations in order; the database's user_version is the number of migrations applied.
+# Never edit or reorder a released migration, append a new one instead.
+migrations = (
+    _create_tables,
+    _add_resume_selection_columns,
+    _add_status_and_date_indexes,
+    _add_job_description_minhash,
+    _create_bullet_variants,
+    _create_llm_calls,
+    _drop_partial_date_indexes,
+)
+
+
+def migrate(conn, target_version=None):
+    """
+    Brings the database schema up to date by applying the migrations it has not run yet.
+
+    Each migration runs in its own transaction together with the user_version update, so a failed migration
+    leaves the database at the previous version.
+
+    Args:
+        conn: A connection to the SQLite database.
+        target_version (int, optional): Stop after this version. Defaults to the latest version.
+
+    Returns:
+        int: The schema version of the database.
+    """
+    target_version = len(migrations) if target_version is None else target_version
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    while version < target_version:
+        migration = migrations[version]
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two scripts starting together migrate one at a time
+            conn.execute("BEGIN IMMEDIATE")
+            # Another connection may have migrated while this one waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] == version:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    return version
+
+
+def ensure_columns(conn, table_name, columns):
+    """
+    Adds any missing columns to an existing table.
+
+    Args:
+        conn: A connection to the SQLite database.
+        table_name (str): The table to check.
+        columns (dict): Column definitions keyed by column name.
+
+    Returns:
+        list: The names of the columns that were added.
+    """
+    existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+    added_columns = [name for name in columns if name not in existing_columns]
+    for name in added_columns:
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {name} {columns[name]}")
+    return added_columns
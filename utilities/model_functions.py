@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+
+
+class ModelBackend(ABC):
+    """Creates the model clients of a ModelPool.
+
+    A backend turns a model name, generation config and safety settings into an object with the
+    genai.GenerativeModel methods the call functions use: generate_content(prompt_parts, stream=False) and,
+    optionally, generate_content_async(prompt_parts). Register new backends in model_backends.
+    """
+
+    @abstractmethod
+    def create_model(self, model_name, generation_config, safety_settings):
+        """
+        Creates one model client.
+
+        Args:
+            model_name (str): Name of the model, such as "gemini-pro".
+            generation_config (dict): Generation configuration settings.
+            safety_settings (list): Safety settings for the model.
+
+        Returns:
+            The model client.
+        """
+
+
+class GeminiBackend(ModelBackend):
+    """Creates google.generativeai GenerativeModel clients.
+
+    Args:
+        google_ai_key (str): The Google AI key.
+    """
+
+    def __init__(self, google_ai_key):
+        # Imported here so the stub backend runs without the Google client library
+        import google.generativeai as genai
+        genai.configure(api_key=google_ai_key)
+        self._genai = genai
+
+    def create_model(self, model_name, generation_config, safety_settings):
+        return self._genai.GenerativeModel(model_name=model_name, generation_config=generation_config,
+                                           safety_settings=safety_settings)
+
+
+class StubResponse:
+    """Response of a StubModel with the text of a GenerateContentResponse."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Local stand-in for a GenerativeModel that answers every prompt without calling an API.
+
+    Args:
+        model_name (str): Name of the model it stands in for.
+        generation_config (dict): The generation config it was created with.
+        respond (callable, optional): Returns the response text for the prompt parts. Defaults to echoing the
+            model name.
+        latency (float, optional): Seconds each call takes. Defaults to 0.
+    """
+
+    def __init__(self, model_name, generation_config, respond=None, latency=0.0):
+        self.model_name = f"models/{model_name}"
+        self._generation_config = generation_config
+        self.respond = respond or (lambda prompt_parts: f"Stub response from {model_name}")
+        self.latency = latency
+
+    def generate_content(self, prompt_parts, stream=False):
+        time.sleep(self.latency)
+        response = StubResponse(self.respond(prompt_parts))
+        return iter([response]) if stream else response
+
+    async def generate_content_async(self, prompt_parts):
+        await asyncio.sleep(self.latency)
+        return StubResponse(self.respond(prompt_parts))
+
+
+class StubBackend(ModelBackend):
+    """Creates StubModel clients, or the clients of a factory, for runs without an API key.
+
+    Args:
+        google_ai_key (str, optional): Ignored; accepted so the backend is created like GeminiBackend.
+        respond (callable, optional): Returns the response text for the prompt parts. Defaults to None.
+        latency_by_model (dict, optional): Seconds per call for each model name. Defaults to no latency.
+        model_factory (callable, optional): Creates the client from (model_name, generation_config,
+            safety_settings) instead of a StubModel. Defaults to None.
+    """
+
+    def __init__(self, google_ai_key=None, respond=None, latency_by_model=None, model_factory=None):
+        self.respond = respond
+        self.latency_by_model = latency_by_model or {}
+        self.model_factory = model_factory
+
+    def create_model(self, model_name, generation_config, safety_settings):
+        if self.model_factory is not None:
+            return self.model_factory(model_name, generation_config, safety_settings)
+        return StubModel(model_name, generation_config, self.respond, self.latency_by_model.get(model_name, 0.0))
+
+
+# Backends selectable with gemini_cfg.model_backend, created from the Google AI key
+model_backends = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+
+class ModelPool:
+    """Creates each model client once and reuses it for every call with the same model, generation config
+    and safety settings.
+
+    Args:
+        backend (ModelBackend): Creates the clients.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name, generation_config, safety_settings):
+        """
+        Returns the client for a model, generation config and safety settings, creating it on first use.
+
+        Args:
+            model_name (str): Name of the model.
+            generation_config (dict): Generation configuration settings.
+            safety_settings (list): Safety settings for the model.
+
+        Returns:
+            The model client.
+        """
+        key = (model_name, repr(sorted(generation_config.items())), repr(safety_settings))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = self.backend.create_model(model_name, generation_config,
+                                                                      safety_settings)
+        return model
+
+
+class ModelRouter:
+    """The model returned by setup_model: routes each prompt type to the model and generation config in the
+    routing table, and behaves as the default model everywhere else.
+
+    A route may set "model_name", and "generation_config" values that override the default generation config.
+    Prompt types without a route use the default model.
+
+    Args:
+        pool (ModelPool): Provides the clients.
+        model_name (str): Name of the default model.
+        generation_config (dict): The default generation config.
+        safety_settings (list): Safety settings for every model.
+        routes (dict): Route per prompt type.
+    """
+
+    def __init__(self, pool, model_name, generation_config, safety_settings, routes):
+        self.pool = pool
+        self.generation_config = dict(generation_config)
+        self.safety_settings = safety_settings
+        self.routes = routes
+        self.default_model = pool.get(model_name, self.generation_config, safety_settings)
+        self.default_model_name = model_name
+        self.model_name = getattr(self.default_model, "model_name", model_name)
+
+    def model_for(self, prompt_type):
+        """
+        Returns the client the prompt type is routed to.
+
+        Args:
+            prompt_type (str): What the prompt is for, such as 'keywords'.
+
+        Returns:
+            The model client.
+        """
+        route = self.routes.get(prompt_type)
+        if route is None:
+            return self.default_model
+        return self.pool.get(route.get("model_name", self.default_model_name),
+                             {**self.generation_config, **route.get("generation_config", {})}, self.safety_settings)
+
+    def generate_content(self, prompt_parts, **kwargs):
+        return self.default_model.generate_content(prompt_parts, **kwargs)
+
+    async def generate_content_async(self, prompt_parts):
+        generate_content_async = getattr(self.default_model, "generate_content_async", None)
+        if generate_content_async is not None:
+            return await generate_content_async(prompt_parts)
+        return await asyncio.to_thread(self.default_model.generate_content, prompt_parts)
+
+
+def route_model(model, prompt_type):
+    """
+    Returns the client a ModelRouter routes the prompt type to, or the model itself when it is not a ModelRouter.
+
+    Args:
+        model: The model returned by setup_model, or any GenerativeModel-like object.
+        prompt_type (str): What the prompt is for.
+
+    Returns:
+        The model client to call.
+    """
+    if isinstance(model, ModelRouter):
+        return model.model_for(prompt_type)
+    return model
+
+
+def create_model_backend(google_ai_key, name=None):
+    """
+    Creates the backend named in gemini_cfg.model_backend.
+
+    Args:
+        google_ai_key (str): The Google AI key.
+        name (str, optional): The backend to create instead of gemini_cfg.model_backend. Defaults to None.
+
+    Returns:
+        ModelBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is not in model_backends.
+    """
+    name = name or gemini_cfg.model_backend
+    if name not in model_backends:
+        raise ValueError(f"Unknown model backend: {name}")
+    return model_backends[name](google_ai_key)
@@ -0,0 +1,849 @@
+import datetime
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+import variables.global_variables as global_vars
+from utilities.achievement_functions import achievement_index
+from utilities.bullet_functions import BulletPipeline, BulletPromptStats, generate_bullet_options
+from utilities.bullet_variant_functions import load_bullet_variant_store
+from utilities.db_functions import connect, iter_jobs, update_job
+from utilities.docx_functions import load_compiled_template
+from utilities.duplicate_functions import reuse_near_duplicate_reviews
+from utilities.fit_score_functions import load_local_fit_scorer
+from utilities.gemini_functions import call_generative_api_with_retries, generate_fit_score, \
+    stream_generative_api_with_retries, write_streamed_response
+from utilities.gobal_functions import create_list_from_lines, user_selects_option, user_selects_options
+from utilities.prefetch_functions import JobReviewPrefetcher, job_review_columns, job_review_is_prefetched
+from utilities.resume_functions import build_resume_substitutions, resume_docx_file_name
+from utilities.telemetry_functions import records_calls_for
+
+# Columns each stage reads from job_applications
+review_job_columns = ('company_name', 'job_title', 'job_description', 'duplicate_of') + job_review_columns
+resume_job_columns = ('company_name', 'job_title', 'job_description', 'guidance', 'keywords', 'company_mission',
+                      'company_values')
+applied_job_columns = ('company_name', 'job_title')
+dm_job_columns = ('company_name', 'job_title', 'company_mission', 'company_values', 'recent_news', 'resume_summary',
+                  'resume_summary_bullets')
+email_job_columns = ('company_name', 'job_title', 'company_mission', 'company_values', 'recent_news', 'resume')
+
+# Step 4's extra condition and its parameters, limiting it to global_vars.dm_company_name when that is set
+dm_job_condition = ("company_name = ?", (global_vars.dm_company_name,)) if global_vars.dm_company_name else (None, ())
+
+# The status column as a state machine: each status a job waits in, with the queue that moves it on and the
+# selection of jobs that are eligible. Human stages prompt the user, automatic stages run unattended.
+# status: (queue, columns, extra condition, condition parameters)
+pipeline_stages = {
+    'Step 1 - JD Review': ('human', review_job_columns, None, ()),
+    'Step 2 - Resume': ('human', resume_job_columns, None, ()),
+    'Step 3 - Apply': ('automatic', applied_job_columns, "date_applied IS NOT NULL", ()),
+    'Step 4 - DM': ('human', dm_job_columns) + dm_job_condition,
+    'Step 5 - Email': ('automatic', email_job_columns, None, ()),
+}
+
+# Order the human queue is worked through: quick decisions first, so jobs keep moving and the automatic queue has
+# work while the user spends longer on a resume
+_human_stage_order = ('Step 4 - DM', 'Step 1 - JD Review', 'Step 2 - Resume')
+
+
+def review_job(conn, row, job_review, local_fit_score=None):
+    """
+    Shows the generated requirements for a job and asks whether to continue with it.
+
+    Args:
+        conn: A connection to the SQLite database.
+        row: A job_applications record with the review_job_columns.
+        job_review (dict): The Step 1 values generated by the model, keyed by column name.
+        local_fit_score (float, optional): The local fit score printed next to the model's score when the fit score
+            engine is 'both'. Defaults to None.
+
+    Returns:
+        str: The job's new status.
+    """
+    # Update User with progress
+    print(f"------- {row['company_name']}-{row['job_title']} -------")
+
+    # Point out a repost of a job already reviewed, whose model output was reused
+    if row['duplicate_of'] is not None:
+        original = conn.execute("SELECT company_name, job_title, status FROM job_applications "
+                                "WHERE job_application_id = ?", (row['duplicate_of'],)).fetchone()
+        if original is not None:
+            print(f"Near-duplicate of {original['company_name']}-{original['job_title']} ({original['status']})")
+
+    # Prompt the user to  review the job requirements to ensure alignment with their skills and interests.
+    print(job_review['ai_requirements'])
+    user_input = input("Do you want to process this item? (Y/N): ")
+
+    # Handle the indication that they don't want to proceed with the job
+    if user_input.lower() == "n":  # Check for "N" or "n" (case-insensitive)
+        print("Skipping to next item...")
+
+        # Update the status in the database
+        update_job(conn, row['job_application_id'], status='Bad Fit', date_jd_review=datetime.date.today())
+        return 'Bad Fit'
+
+    # Any key other than N or n will proceed with processing the job.
+    if global_vars.fit_score_engine == 'both':
+        print(f"Fit Score: {job_review['original_fit_score']} (local: {local_fit_score})")
+    else:
+        print(f"Fit Score: {job_review['original_fit_score']}")  # Print the fit score
+
+    # Update Status in the Database
+    update_job(conn, row['job_application_id'], status='Step 2 - Resume', date_jd_review=datetime.date.today())
+    return 'Step 2 - Resume'
+
+
+@records_calls_for('Step 2 - Resume')
+def create_resume(conn, model, row, work_experience, num_bullets_per_role=global_vars.num_bullets_per_role,
+                  pipeline=False, batch_bullets=None, local_fit_scorer=None):
+    """
+    Builds a tailored resume for a job from the user's selections and renders it from the resume template.
+
+    Args:
+        conn: A connection to the SQLite database.
+        model: The Google generative AI model object.
+        row: A job_applications record with the resume_job_columns.
+        work_experience (sequence): The roles of the resume profile, supporting role['column'] access.
+        num_bullets_per_role (list, optional): The number of bullets to select for each role.
+            Defaults to global_vars.num_bullets_per_role.
+        pipeline (bool, optional): Generate every role's bullet options ahead of the selection prompts.
+            Defaults to False.
+        batch_bullets (str, optional): "role" or "resume" to enhance bullets in batched requests. Defaults to None.
+        local_fit_scorer (LocalFitScorer, optional): Scores the resume when the fit score engine is 'local' or
+            'both'. Defaults to None.
+
+    Returns:
+        bool: True when the resume was created, False when the user skipped the job.
+    """
+    # Get required data from the record
+    target_company = row['company_name']
+    target_job_title = row['job_title']
+    target_job_description = str(row['job_description'])
+    target_guidance = str(row['guidance'])
+    target_keywords = str(row['keywords'])
+    target_company_mission = str(row['company_mission'])
+    target_company_values = str(row['company_values'])
+
+    # Check for null target_company_mission and target_company_values
+    if not target_company_mission or not target_company_values:
+        no_mission_or_values_prompt = input(f"No company_mission or company_values for "
+                                            f"{target_company} - {target_job_title}. "
+                                            f"Do you want to continue (y/n)?")
+
+        if not no_mission_or_values_prompt.lower().startswith('y'):
+            print(f"Skipping: {target_company} - {target_job_title}")
+            return False
+
+    # The company specific resume is rendered from ResumeTemplate.docx once every section is selected
+    docx_resume_file_name = resume_docx_file_name(target_company, target_job_title)
+
+    # Update User with progress
+    print(f"Processing: {target_company} - {target_job_title}")
+
+    generated_resume = 'Summary \n\n summaryPlaceHolder \n\n summaryBullets'
+
+    full_resume_bullets_list = []
+    resume_bullets_by_role = [[] for _ in work_experience]
+
+    # Generate the filtered achievements and their enhanced versions for every role.
+    # The pipeline runs the model calls ahead of the user, the default mode calls the model per bullet.
+    # The local achievement index shortlists each role's achievements before the model selects from them, and
+    # bullets already enhanced for an earlier job with similar keywords are offered the stored versions.
+    bullet_prompt_stats = BulletPromptStats()
+    resume_achievement_index = achievement_index(work_experience)
+    bullet_variant_store = load_bullet_variant_store(conn)
+    if pipeline:
+        bullet_options_source = BulletPipeline(model, work_experience, num_bullets_per_role,
+                                               target_job_description, target_guidance, target_keywords,
+                                               batch=batch_bullets, stats=bullet_prompt_stats,
+                                               achievement_index=resume_achievement_index,
+                                               variant_store=bullet_variant_store)
+    else:
+        bullet_options_source = generate_bullet_options(model, work_experience, num_bullets_per_role,
+                                                        target_job_description, target_guidance, target_keywords,
+                                                        batch=batch_bullets, stats=bullet_prompt_stats,
+                                                        achievement_index=resume_achievement_index,
+                                                        variant_store=bullet_variant_store)
+
+    # Loop through each bullet of each job in the resume_template, timing how long the user waits for options
+    bullet_wait_times = []
+    bullet_options_iterator = iter(bullet_options_source)
+    while True:
+        print(global_vars.pacifier_message)
+        wait_start = time.perf_counter()
+        bullet_options = next(bullet_options_iterator, None)
+        if bullet_options is None:
+            break
+        bullet_wait_times.append(time.perf_counter() - wait_start)
+
+        resume_company = work_experience[bullet_options.role_index]['organization']
+        resume_job_title = work_experience[bullet_options.role_index]['job_title']
+        num_of_bullets = num_bullets_per_role[bullet_options.role_index]
+
+        print(f"-------{resume_company} - {resume_job_title} - "
+              f"Bullet {bullet_options.bullet_index + 1} of {num_of_bullets}------")
+        if bullet_options.reused:
+            print("Versions selected or generated for an earlier job with similar keywords:")
+        selected_bullet = user_selects_option(bullet_options.options)
+
+        # Keep the versions and the selection for later jobs
+        if bullet_variant_store is not None:
+            bullet_variant_store.record(bullet_options.original_bullet, target_keywords, bullet_options.options[1:],
+                                        selected_bullet)
+
+        # Update Resume Job
+        resume_bullets_by_role[bullet_options.role_index].append(selected_bullet)
+        full_resume_bullets_list.append(f"At {resume_company}, {selected_bullet}")
+
+    # Report the bullet prompts sent and the time spent waiting for the next set of bullet options
+    print(bullet_prompt_stats.summary())
+    for line in bullet_prompt_stats.filter_summary(work_experience):
+        print(line)
+    if bullet_wait_times:
+        print(f"Time to next bullet prompt: {sum(bullet_wait_times):.2f}s total, "
+              f"{max(bullet_wait_times):.2f}s max over {len(bullet_wait_times)} prompts")
+
+    # Loop through each job in the resume_template
+    for resume_job_index, resume_job_bullets_list in enumerate(resume_bullets_by_role):
+        resume_company = work_experience[resume_job_index]['organization']
+        resume_job_title = work_experience[resume_job_index]['job_title']
+
+        # Exiting the Job Achievement Loop Going to Next Job
+        resume_job_bullets_string = "- " + "\n- ".join(resume_job_bullets_list)
+
+        # Display to the User the full list of bullets for the resume_template job
+        print(f"{resume_company} - {resume_job_title}")
+        print(resume_job_bullets_string)
+
+    # Finished building the work_experience for the job in loop.
+
+    # Create a summary for the job description
+    full_resume_bullets_string = "\n".join(full_resume_bullets_list)
+    # Use the AI job description to generate a resume summary
+    resume_summary_prompt_parts = [
+        "Persona: Executive career coach that works with highly skilled job seekers. \n"
+        "Guidance: " + target_guidance + "\n\n"
+        "Company: " + target_company + "\n"
+        "Job Description: " + target_job_description + "\n\n"
+        "Resume Bullets: " + full_resume_bullets_string + "\n\n"
+        "Keywords: " + target_keywords + "\n\n"
+        "Company Values:" + target_company_values + "\n"
+        "Company Mission:" + target_company_mission + "\n\n"
+        "Task: Craft 3 captivating and ATS-friendly summaries, each no longer than 3-4 sentences. Ensure they:\n"
+        "1. ** Hook attention: ** Start with a strong first sentence that highlights a relevant achievement or skill.\n"
+        "2. ** Showcase expertise:** Briefly demonstrate your qualifications and value proposition using keywords "
+        "and a quantifiable accomplishment from your resume bullets.\n"
+        "3. **Align with guidance:** Address key points from the Resume Summary Guidance.\n"
+        "4. **Express passion:** Conclude with a genuine reference to a specific company value or mission statement, "
+        "demonstrating your alignment with their vision.\n"
+        "Format: Avoid generic statements, buzzwords, clichés, and personal pronouns. "
+        "Use active voice and strong verbs. \n\n"
+        "Output: 3 separate lines, each containing a complete resume summary."
+
+    ]
+    print(f"{global_vars.pacifier_message} Now working on Resume summary")
+    summaries_response = call_generative_api_with_retries(model, resume_summary_prompt_parts,
+                                                          prompt_type="resume_summary")
+    summaries = summaries_response.text.strip()
+
+    # Create a list of all summaries options returned from the AI
+    summaries_options_list = create_list_from_lines(summaries)
+
+    # Have the user choose an option
+    print(f"-----------{target_company} - {target_job_title}-----------------")
+    summary = user_selects_option(summaries_options_list)
+
+    # Update Generated Text Resume with SelectedSummary
+    generated_resume = generated_resume.replace("summaryPlaceHolder", summary)
+
+    # Summary Achievements
+    summary_achievements_prompt_parts = [
+        "Input: \n"
+        "Persona: Executive career coach that works with highly skilled job seekers. \n"
+        "Guidance: " + target_guidance + "\n"
+        "Job Description: " + target_job_description + "\n"
+        "Achievements: " + full_resume_bullets_string + "\n"
+        "Keywords: " + target_keywords + "\n"
+        "Summary Paragraph: " + summary + "\n\n"
+        "Company Values:" + target_company_values + "\n"
+        "Company Mission:" + target_company_mission + "\n\n"
+        "Task: "
+        "Identify 6 achievements that best showcase your skills and experiences relevant to the 3 Keys "
+        "and Resume Bullet Guidance. Rewrite each original achievement to be:\n"
+        "1. **Concise and engaging:** Aim for 2-3 lines, employing strong action verbs and vivid language.\n"
+        "2. **Keyword-rich:** Integrate hard and soft keywords naturally, but avoid keyword stuffing.\n"
+        "3. **Company-specific:** Mention the company where the achievement occurred, adding context and impact.\n"
+        "4. **Relevant:** Align each achievement with at least one Key and support the claims in your summary "
+        "paragraph.\n\n"
+        "Please prioritize achievements that are:\n"
+        "* **Quantifiable:** Include measurable results and data if possible.\n"
+        "* **Demonstrate initiative and leadership (where applicable).**\n"
+        "* **Unique and impactful:** Highlight achievements that stand out from others.\n\n"
+        "Avoid formatting or styling in the output. \n\n"
+        "Output: List 6 individual achievements, each on a separate line."
+    ]
+    # Use the AI to generate a list of achievements
+    print(global_vars.pacifier_message)
+    summary_achievements_response = call_generative_api_with_retries(model, summary_achievements_prompt_parts,
+                                                                     prompt_type="summary_achievements")
+    # Create a clean list of summary original_achievement options
+    summary_achievements_list = create_list_from_lines(summary_achievements_response.text)
+
+    # Process User Input
+    summary_achievements = user_selects_options(summary_achievements_list, number_of_choices=3)
+
+    # Convert the list to a string
+    resume_summary_bullets = '\n'.join(summary_achievements)
+
+    # Add the work experience to the generated resume_template
+    generated_resume = generated_resume.replace("summaryBullets", resume_summary_bullets)
+
+    # Update Generated Text Resume with SelectedSummary
+    generated_resume = (generated_resume + '\n' +
+                        'Education: \n' +
+                        'Bachelor of Science - Computer Information Systems \n'
+                        'Bentley University, Waltham, MA\n\n'
+                        'Certification: \n'
+                        'Machine Learning Foundations for Product Managers - December 2023\n'
+                        'Duke University\n'
+                        'AWS Cloud Quest: Cloud Practitioner - January 2024 \n'
+                        'Amazon Web Services Training and Certification\n\n'
+                        'Skills: \n'
+                        )
+
+    # After Summary Achievements is selected, create a list of skills
+    resume_skills_prompt_parts = [
+        "Input: \n"
+        "Persona: Executive career coach that works with highly skilled job seekers. \n"
+        "Job Description: " + target_job_description + "\n\n"
+        "Keywords: " + target_keywords + "\n\n"
+        "Resume: " + generated_resume + "\n"
+        "Guidance: " + target_guidance + "\n\n"
+        "Task: "
+        "Please analyze the resume and extract the following, presented as comma-separated lists within their "
+        "respective groups:\n"
+        "1. All hard keywords matching those found in the guidance. \n"
+        "2. Specific technologies mentioned in the resume (e.g., NiFi, AWS). \n"
+        "Categorize these skills into 3 logical groups based on the concise versions of the Guidance 3 Keys.\n"
+        "Output: A structured list of skills, categorized into 3 comma-separated groups. "
+        "Each category should be labeled based on teh guidance in a 2-3 word heading. \n\n"
+        "Avoid: Including soft skills in the output. \n\n "
+        "Output Format: \n"
+        "Heading 1: Skill 1, Skill 2, Skill 3, etc. \n"
+        "Heading 2: Skill 1, Skill 2, Skill 3, etc. \n"
+        "Heading 3: Skill 1, Skill 2, Skill 3, etc. \n"
+
+    ]
+    print(global_vars.pacifier_message)
+    skills_response = call_generative_api_with_retries(model, resume_skills_prompt_parts, prompt_type="resume_skills")
+    skills_string = skills_response.text.strip()
+
+    print("Skills: " + skills_string)
+
+    # add the skills to the txt file
+    generated_resume = generated_resume + skills_response.text.strip()
+
+    # Render the selected sections into the compiled resume template and save the docx once
+    resume_substitutions = build_resume_substitutions(target_job_title, resume_bullets_by_role, summary,
+                                                      summary_achievements, skills_string)
+    load_compiled_template(global_vars.resume_template_file).render(resume_substitutions, docx_resume_file_name)
+
+    # Use the AI job skills to generate a Fit Score
+    if global_vars.fit_score_engine == 'local':
+        fit_score = float(local_fit_scorer.score([target_job_description], generated_resume)[0])
+        print(f'Fit Score: {fit_score}')  # Print the fit score
+    elif global_vars.fit_score_engine == 'both':
+        fit_score = generate_fit_score(model, target_job_description, generated_resume)
+        local_fit_score = float(local_fit_scorer.score([target_job_description], generated_resume)[0])
+        print(f'Fit Score: {fit_score} (local: {local_fit_score})')  # Print both fit scores
+    else:
+        fit_score = generate_fit_score(model, target_job_description, generated_resume)
+        print(f'Fit Score: {fit_score}')  # Print the fit score
+
+    # Write the selections, the generated resume and the new status to the database in one transaction,
+    # storing the selections so the resume can be rendered again from the database
+    update_job(conn, row['job_application_id'], resume_summary=summary,
+               resume_summary_bullets=resume_summary_bullets, resume_bullets=json.dumps(resume_bullets_by_role),
+               resume_skills=skills_string, resume=generated_resume, final_fit_score=fit_score,
+               status='Step 3 - Apply', date_resume_created=datetime.date.today())
+    return True
+
+
+def move_applied_resume(conn, row):
+    """
+    Moves the resume files of a job that has been applied to into data/applied/<today>.
+
+    Args:
+        conn: A connection to the SQLite database.
+        row: A job_applications record with the applied_job_columns.
+    """
+    # Get required data from the record
+    job_company = row['company_name']
+    job_title = row['job_title']
+
+    # Remove temp files
+    file_name = f'{job_company}-{job_title}'
+
+    # Define the files to be modified
+    docx_resume_file = f"temp/resumes/docx/{file_name}-Resume.docx"
+    pdf_resume_file = f"temp/resumes/pdf/{file_name}-Resume.pdf"
+
+    # Create subdirectories for the current date for data/applied
+    current_date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    dst_dir = os.path.join('data/applied', current_date_str)
+    os.makedirs(dst_dir, exist_ok=True)  # Create dir if it doesn't exist
+
+    # Move DOCX and PDF files with error handling
+    for src_file in (docx_resume_file, pdf_resume_file):
+        try:
+            shutil.move(src_file, os.path.join(dst_dir, f'{file_name}{os.path.splitext(src_file)[1]}'))
+            print(f"{src_file} moved to {dst_dir} successfully.")
+        except OSError as error:
+            print(f"ERROR moving {src_file} to {dst_dir}: {error}")
+
+    # Update Database
+    update_job(conn, row['job_application_id'], status='Step 4 - DM')
+
+
+@records_calls_for('Step 4 - DM')
+def generate_dm(conn, model, row, stream=False):
+    """
+    Generates LinkedIn comments for a job and stores the one the user selects.
+
+    Args:
+        conn: A connection to the SQLite database.
+        model: The Google generative AI model object.
+        row: A job_applications record with the dm_job_columns.
+        stream (bool, optional): Print the comments as they are generated. Defaults to False.
+
+    Returns:
+        bool: True when a comment was stored, False when the user skipped the job.
+    """
+    # Get required data from the record
+    job_company = row['company_name']
+    job_title = row['job_title']
+    job_company_mission = str(row['company_mission'])
+    job_company_values = str(row['company_values'])
+    job_company_recent_news = str(row['recent_news'])
+    resume_summary = str(row['resume_summary'])
+    resume_summary_bullets = str(row['resume_summary_bullets'])
+
+    if not job_company_recent_news:
+        no_news_prompt = input(
+            f"No Recent Company News for {job_company} - {job_title}. Do you want to continue (y/n)?")
+
+        if not no_news_prompt.lower().startswith('y'):
+            print(f"Skipping: {job_company} - {job_title}")
+            return False
+
+    post_link = input(f'Enter LinkedIn post url for {job_company} - {job_title}: ')
+
+    dm_prompt_parts = [
+        "Input: \n"
+        "Company: " + job_company + "\n"
+        "Job Title: " + job_title + "\n"
+        "Company Mission: " + job_company_mission + "\n"
+        "Company Values: " + job_company_values + "\n"
+        "Company Recent News: " + job_company_recent_news + "\n\n"
+        "Resume Summary: " + resume_summary + "\n"
+        "Resume Summary Bullets: " + resume_summary_bullets + "\n\n"
+        "Task: \n"
+        "Craft a personalized LinkedIn comment (under 300 characters) expressing my enthusiasm for "
+        "the @job_title role at @company.\n"
+        "It should: \n"
+        "* Highlight my passion for company's mission and my skills relevant to the job "
+        "(e.g., 'protecting data integrity' for @company_mission) "
+        "* Align my values with company values "
+        "* Optionally, incorporate recent news from @company_recent_news in the fashion of someone following them "
+        "* Be concise, professional, and conclude with a call to action for anyone at @company "
+        "to reach out via LinkedIn.\n\n"
+        "Output: \n"
+        "3 Potential LinkedIn comments"
+    ]
+
+    # Call the DM model, printing the comments as they arrive when streaming
+    print(global_vars.pacifier_message)
+    if stream:
+        dm = write_streamed_response(stream_generative_api_with_retries(model, dm_prompt_parts,
+                                                                        prompt_type="linkedin_comment"))
+        print(dm.summary())
+    else:
+        dm = call_generative_api_with_retries(model, dm_prompt_parts, prompt_type="linkedin_comment")
+
+    # Have the user select the DM option
+    dm_options_list = create_list_from_lines(dm.text)
+
+    # Call user_selects_option to Check if the user entered a number or string
+    print(f"--------{job_company} - {job_title} --------")
+    chosen_dm = user_selects_option(dm_options_list)
+
+    # Update the database
+    update_job(conn, row['job_application_id'], linkedin_post_url=post_link, linkedin_comment=chosen_dm,
+               status='Step 5 - Email')
+    return True
+
+
+@records_calls_for('Step 5 - Email')
+def generate_email(conn, model, row, stream=False):
+    """
+    Writes a cover letter email for a job to temp/email and stores it with a follow-up date a week from today.
+
+    Args:
+        conn: A connection to the SQLite database.
+        model: The Google generative AI model object.
+        row: A job_applications record with the email_job_columns.
+        stream (bool, optional): Print the email and write its file as it is generated. Defaults to False.
+
+    Returns:
+        str: The email text.
+    """
+    # Get required data from the record
+    job_company = row['company_name']
+    job_title = row['job_title']
+    job_company_mission = str(row['company_mission'])
+    job_company_values = str(row['company_values'])
+    job_company_recent_news = str(row['recent_news'])
+    resume = str(row['resume'])
+
+    email_prompt_parts = [
+        "Input: \n"
+        "Resume: " + resume + "\n"
+        "Company: " + job_company + "\n"
+        "Job Title: " + job_title + "\n"
+        "Company Mission: " + job_company_mission + "\n"
+        "Company Values: " + job_company_values + "\n"
+        "Company Recent News: " + job_company_recent_news + "\n\n"
+        "Task: \n"
+        "Craft a personalized Cover Letter expressing my enthusiasm for "
+        "the @job_title role at @company in under 350 words.\n"
+        "It should: \n"
+        "* Highlight my passion for company's mission and my skills relevant to the job "
+        "(e.g., 'protecting data integrity' for @company_mission) "
+        "Include the top 3 most important achievements from my work experience included in the resume_template"
+        "* Align my values with company values "
+        "* Optionally, incorporate recent news from @company_recent_news in the fashion of someone following them "
+        "* Be concise, professional, and conclude with a call to action them to reach out directly or "
+        "forward my resume_template to the proper channels.\n\n"
+        "Output: \n"
+        "Output: The email"
+    ]
+
+    email_file_name = "temp/email/" + job_company + "-" + job_title + ".txt"
+
+    # Call the email model, printing it and writing the file as it arrives when streaming
+    if stream:
+        email = write_streamed_response(stream_generative_api_with_retries(model, email_prompt_parts,
+                                                                           prompt_type="cover_letter"),
+                                        file_name=email_file_name)
+        print(email.summary())
+    else:
+        email = call_generative_api_with_retries(model, email_prompt_parts, prompt_type="cover_letter")
+
+    # Get today's date
+    today = datetime.date.today()
+
+    # Add 7 days to today's date
+    date_in_7_days = today + datetime.timedelta(days=7)
+
+    # The streamed email is already in its file
+    if not stream:
+        with open(email_file_name, "w") as file:
+            file.write(email.text)
+
+    # Update the database
+    update_job(conn, row['job_application_id'], email=email.text, status='Step 6 - Follow-Up', date_emailed=today,
+               date_email_followup=date_in_7_days)
+    return email.text
+
+
+class _HeldOutput:
+    """Stands in for sys.stdout while the pipeline runs, holding back what other threads print.
+
+    Background workers report progress and retries while the main thread may be waiting in input(), which garbles
+    the prompt. Their output is queued a line at a time instead and written by the main thread between tasks.
+
+    Args:
+        stdout: The stream written to.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self._owner = threading.current_thread()
+        self._lines = queue.Queue()
+        # Text each thread has printed since its last newline
+        self._partial = threading.local()
+
+    def write(self, text):
+        if threading.current_thread() is self._owner:
+            return self.stdout.write(text)
+        lines, newline, self._partial.text = (getattr(self._partial, 'text', '') + text).rpartition('\n')
+        if newline:
+            self._lines.put(lines + newline)
+        return len(text)
+
+    def flush(self):
+        if threading.current_thread() is self._owner:
+            self.stdout.flush()
+
+    def write_held(self):
+        """Writes the lines other threads have printed so far. Only called from the thread that created it."""
+        while True:
+            try:
+                self.stdout.write(self._lines.get_nowait())
+            except queue.Empty:
+                break
+        self.stdout.flush()
+
+    def __getattr__(self, name):
+        # fileno, isatty and the rest come from the real stream, so input() still uses the terminal
+        return getattr(self.stdout, name)
+
+
+class Pipeline:
+    """Resident orchestrator that drives jobs through every status with one warm model and database connection.
+
+    Automatic stages run on background workers: Step 1 model output through a JobReviewPrefetcher, and moving
+    applied resumes and writing cover letters in a thread pool. Meanwhile the main thread works through the human
+    queue, Step 1 decisions, Step 2 resumes and Step 4 messages, so a job moves to its next stage as soon as the
+    previous one finishes. Step 1 decisions are only offered once their model output is ready, so the user is never
+    kept waiting while other work is queued.
+
+    The queues are kept in memory. Each pass only reads the Step 1 jobs added since the last one, and a job that
+    finishes a stage is queued for its next one. The other stages are scanned, by id, on start and whenever the user
+    has nothing left to do, which picks up jobs changed outside the pipeline, such as a date_applied entered by hand.
+
+    Args:
+        conn: A connection to the SQLite database, used from the calling thread.
+        model: The Google generative AI model object shared by every stage.
+        resume_profile (ResumeProfile): The compiled full resume.
+        db_file (str, optional): The SQLite database file for the background workers.
+            Defaults to global_vars.sqlite_db_file.
+        max_workers (int, optional): Number of automatic jobs run at once.
+        bullet_pipeline (bool, optional): Generate every role's bullet options ahead of the Step 2 selection
+            prompts. Defaults to False.
+        batch_bullets (str, optional): "role" or "resume" to enhance Step 2 bullets in batched requests.
+            Defaults to None.
+    """
+
+    def __init__(self, conn, model, resume_profile, db_file=global_vars.sqlite_db_file,
+                 max_workers=gemini_cfg.max_concurrent_requests, bullet_pipeline=False, batch_bullets=None):
+        self.conn = conn
+        self.model = model
+        self.resume_text = resume_profile.raw_text
+        self.work_experience = resume_profile.work_experience
+        self.db_file = db_file
+        self.bullet_pipeline = bullet_pipeline
+        self.batch_bullets = batch_bullets
+        # Number of jobs moved out of each status
+        self.completed = Counter()
+        self.local_fit_scorer = None
+        if global_vars.fit_score_engine in ('local', 'both'):
+            self.local_fit_scorer = load_local_fit_scorer(conn)
+        self._prefetcher = JobReviewPrefetcher(model, self.resume_text, db_file=db_file)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="pipeline")
+        self._worker_local = threading.local()
+        self._worker_conns = []
+        self._worker_conns_lock = threading.Lock()
+        # Futures of the automatic work in flight, keyed by job_application_id
+        self._prefetching = {}
+        self._running = {}
+        # Jobs the user skipped or whose automatic stage failed, left alone until the next run
+        self._skipped = set()
+        # Jobs waiting for the user in each human stage, in the order they were queued
+        self._waiting = {status: {} for status in _human_stage_order}
+        # New jobs are added at Step 1 with a higher job_application_id than every job already read
+        self._last_new_job_id = -1
+        # Holds back what the workers print while run() is in progress
+        self._output = None
+
+    def run(self, watch=False, poll_interval=30):
+        """
+        Processes jobs until no stage has work left, or until interrupted in watch mode.
+
+        Args:
+            watch (bool, optional): Keep waiting for new jobs instead of returning once every queue is empty.
+                Defaults to False.
+            poll_interval (float, optional): Seconds between database checks while waiting. Defaults to 30.
+
+        Returns:
+            Counter: The number of jobs moved out of each status.
+        """
+        # Workers print between the user's tasks instead of over their prompts
+        self._output = sys.stdout = _HeldOutput(sys.stdout)
+        try:
+            self._poll_stages()
+            while True:
+                self._collect_automatic()
+                self._dispatch_new_jobs()
+                task = self._next_human_task()
+                if task is None:
+                    # Only look for jobs moved on outside the pipeline once the user has nothing left to do
+                    self._poll_stages()
+                    task = self._next_human_task()
+                if task is not None:
+                    self._run_human_task(*task)
+                    self._follow(task[1]['job_application_id'])
+                    continue
+                in_flight = list(self._prefetching.values()) + list(self._running.values())
+                if in_flight:
+                    wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                elif watch:
+                    time.sleep(poll_interval)
+                else:
+                    return self.completed
+        finally:
+            sys.stdout = self._output.stdout
+            self._output.write_held()
+
+    def close(self):
+        """Waits for the automatic jobs already running, stops the workers and closes their connections."""
+        self._prefetcher.stop()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._worker_conns_lock:
+            for conn in self._worker_conns:
+                conn.close()
+            self._worker_conns.clear()
+
+    def _dispatch_new_jobs(self):
+        # Queues the Step 1 jobs added since the last pass, starting their model output and scoring them locally
+        # first when the model's score is not used
+        new_jobs = list(iter_jobs(self.conn, ('job_description',) + job_review_columns, status='Step 1 - JD Review',
+                                  where="job_application_id > ?", parameters=(self._last_new_job_id,)))
+        if not new_jobs:
+            return
+        self._last_new_job_id = new_jobs[-1]['job_application_id']
+        self._waiting['Step 1 - JD Review'].update(dict.fromkeys(row['job_application_id'] for row in new_jobs))
+        new_jobs = [row for row in new_jobs if not job_review_is_prefetched(row)]
+
+        # Reuse the model output of already reviewed jobs for reposts instead of generating it again
+        if new_jobs:
+            near_duplicates = reuse_near_duplicate_reviews(self.conn, job_application_ids=[
+                row['job_application_id'] for row in new_jobs])
+            if near_duplicates:
+                print(f"Reused the review of a near-duplicate job for {len(near_duplicates)} job(s).")
+                reused = {job_application_id for job_application_id, _, _ in near_duplicates}
+                new_jobs = [row for row in new_jobs if row['job_application_id'] not in reused]
+        if new_jobs and global_vars.fit_score_engine == 'local':
+            scores = self.local_fit_scorer.score([str(row['job_description']) for row in new_jobs], self.resume_text)
+            self._prefetcher.fit_scores.update((row['job_application_id'], float(score))
+                                               for row, score in zip(new_jobs, scores))
+        for row in new_jobs:
+            self._prefetching[row['job_application_id']] = self._prefetcher.submit(row['job_application_id'],
+                                                                                  str(row['job_description']))
+
+    def _poll_stages(self):
+        # Queues the jobs eligible for a later stage that are not queued yet, such as a resume whose date_applied
+        # was just entered. Only ids are read; each job is read in full when its stage runs.
+        for status, (_, _, where, parameters) in pipeline_stages.items():
+            if status == 'Step 1 - JD Review':
+                continue
+            for row in iter_jobs(self.conn, (), status=status, where=where, parameters=parameters):
+                self._enqueue(status, row['job_application_id'])
+
+    def _follow(self, job_application_id):
+        # Queues a job for the stage it moved to after finishing its previous one
+        row = self.conn.execute("SELECT status FROM job_applications WHERE job_application_id = ?",
+                                (job_application_id,)).fetchone()
+        if row is not None and row[0] in pipeline_stages:
+            self._enqueue(row[0], job_application_id)
+
+    def _enqueue(self, status, job_application_id):
+        # Adds a job to its human queue, or starts its automatic stage, unless it is already running or set aside
+        if job_application_id in self._skipped or job_application_id in self._running:
+            return
+        if pipeline_stages[status][0] == 'human':
+            self._waiting[status].setdefault(job_application_id)
+            return
+        row = self._load_job(status, job_application_id)
+        if row is not None:
+            self._running[job_application_id] = self._executor.submit(self._run_automatic_task, status, row)
+
+    def _load_job(self, status, job_application_id):
+        # Reads a queued job with its stage's columns, or returns None once it has left the stage or is not eligible
+        _, columns, where, parameters = pipeline_stages[status]
+        where = f"job_application_id = ? AND ({where})" if where else "job_application_id = ?"
+        return next(iter_jobs(self.conn, columns, status=status, where=where,
+                              parameters=(job_application_id,) + tuple(parameters)), None)
+
+    def _collect_automatic(self):
+        # Clears finished automatic work, setting aside the jobs that failed so they are not retried in a loop, and
+        # queues the jobs that finished a stage for their next one
+        self._output.write_held()
+        for futures, stage in ((self._prefetching, 'Step 1 model output'), (self._running, 'Automatic stage')):
+            for job_application_id, future in list(futures.items()):
+                if not future.done():
+                    continue
+                del futures[job_application_id]
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is not None:
+                    print(f"{stage} failed for job_application_id {job_application_id}: {error}")
+                    self._skipped.add(job_application_id)
+                elif futures is self._running:
+                    self.completed[future.result()] += 1
+                    self._follow(job_application_id)
+
+    def _next_human_task(self):
+        # Returns the (status, row) of the next job waiting for the user, or None
+        for status in _human_stage_order:
+            waiting = self._waiting[status]
+            for job_application_id in list(waiting):
+                # Step 1 output still being generated; other work is offered first
+                if job_application_id in self._prefetching:
+                    continue
+                del waiting[job_application_id]
+                if job_application_id in self._skipped:
+                    continue
+                row = self._load_job(status, job_application_id)
+                if row is None or (status == 'Step 1 - JD Review' and not job_review_is_prefetched(row)):
+                    continue
+                return status, row
+        return None
+
+    def _run_human_task(self, status, row):
+        if status == 'Step 1 - JD Review':
+            local_fit_score = None
+            if global_vars.fit_score_engine == 'both':
+                local_fit_score = float(self.local_fit_scorer.score([str(row['job_description'])],
+                                                                    self.resume_text)[0])
+            review_job(self.conn, row, {column: row[column] for column in job_review_columns}, local_fit_score)
+            processed = True
+        elif status == 'Step 2 - Resume':
+            processed = create_resume(self.conn, self.model, row, self.work_experience,
+                                      pipeline=self.bullet_pipeline, batch_bullets=self.batch_bullets,
+                                      local_fit_scorer=self.local_fit_scorer)
+        else:
+            processed = generate_dm(self.conn, self.model, row, stream=True)
+
+        if processed:
+            self.completed[status] += 1
+        else:
+            self._skipped.add(row['job_application_id'])
+
+    def _run_automatic_task(self, status, row):
+        # Runs in a worker thread with that thread's own connection
+        conn = self._worker_connection()
+        if status == 'Step 3 - Apply':
+            move_applied_resume(conn, row)
+        else:
+            generate_email(conn, self.model, row)
+            print(f"Cover letter written for {row['company_name']} - {row['job_title']}")
+        return status
+
+    def _worker_connection(self):
+        conn = getattr(self._worker_local, "conn", None)
+        if conn is None:
+            # Closed from the main thread in close()
+            conn = self._worker_local.conn = connect(self.db_file, check_same_thread=False)
+            with self._worker_conns_lock:
+                self._worker_conns.append(conn)
+        return conn
@@ -0,0 +1,225 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+import variables.global_variables as global_vars
+from utilities.db_functions import connect, update_job
+from utilities.gemini_functions import call_generative_api_async, generate_fit_score_async, get_background_loop, \
+    run_on_background_loop
+from utilities.prompt_functions import build_job_requirements_prompt, build_keywords_prompt, build_guidance_prompt
+from utilities.telemetry_functions import call_context
+
+# Step 1 columns generated by the model ahead of the reviewer
+job_review_columns = ("ai_requirements", "original_fit_score", "keywords", "guidance")
+
+
+def job_review_is_prefetched(row):
+    """
+    Checks whether every Step 1 column has already been generated for a job.
+
+    Args:
+        row: A job_applications record supporting row['column'] access.
+
+    Returns:
+        bool: True when the record can be reviewed without calling the model.
+    """
+    return all(row[column] is not None for column in job_review_columns)
+
+
+async def generate_job_review(model, job_description, resume_text, semaphore=None, fit_score=None):
+    """
+    Generates the requirements, fit score, keywords and guidance for a job description.
+
+    Requirements, keywords and guidance run concurrently; the fit score follows the requirements.
+
+    Args:
+        model: The Google generative AI model object.
+        job_description (str): The job description text.
+        resume_text (str): The full resume text.
+        semaphore (asyncio.Semaphore, optional): Caps the number of requests in flight. Defaults to None.
+        fit_score (float, optional): A precomputed fit score, which skips the model's fit score. Defaults to None.
+
+    Returns:
+        dict: The generated values keyed by job_applications column name.
+    """
+
+    async def requirements_and_fit_score():
+        requirements_response = await call_generative_api_async(
+            model, build_job_requirements_prompt(job_description), semaphore, prompt_type="job_requirements")
+        job_requirements = requirements_response.text.strip()
+        if fit_score is not None:
+            return job_requirements, fit_score
+        return job_requirements, await generate_fit_score_async(model, job_requirements, resume_text, semaphore)
+
+    (job_requirements, fit_score), keywords_response, guidance_response = await asyncio.gather(
+        requirements_and_fit_score(),
+        call_generative_api_async(model, build_keywords_prompt(job_description), semaphore, prompt_type="keywords"),
+        call_generative_api_async(model, build_guidance_prompt(job_description), semaphore, prompt_type="guidance"),
+    )
+    return {
+        "ai_requirements": job_requirements,
+        "original_fit_score": fit_score,
+        "keywords": keywords_response.text.strip(),
+        "guidance": guidance_response.text.strip(),
+    }
+
+
+class JobReviewPrefetcher:
+    """Background worker that generates and persists Step 1 results ahead of the reviewer.
+
+    Jobs run on a background event loop in submission order, lookahead jobs at a time and capped at max_concurrency
+    requests in flight, so the fit score that follows a job's requirements is never queued behind the calls of the
+    whole backlog. A job the reviewer is waiting for starts straight away. Results are written to job_applications as
+    soon as they are ready; the status is left unchanged so the reviewer's Y/N decision stays the only thing that
+    moves a job forward.
+
+    Args:
+        model: The Google generative AI model object.
+        resume_text (str): The full resume text used for the fit score.
+        fit_scores (dict, optional): Precomputed fit scores keyed by job_application_id, which replace the model's
+            fit score. Defaults to None.
+        db_file (str, optional): The SQLite database file. Defaults to global_vars.sqlite_db_file.
+        max_concurrency (int, optional): Maximum number of requests in flight.
+        lookahead (int, optional): Maximum number of jobs generated at once.
+    """
+
+    def __init__(self, model, resume_text, fit_scores=None, db_file=global_vars.sqlite_db_file,
+                 max_concurrency=gemini_cfg.max_concurrent_requests, lookahead=gemini_cfg.prefetch_lookahead):
+        self.model = model
+        self.resume_text = resume_text
+        self.fit_scores = fit_scores or {}
+        self.lookahead = lookahead
+        self._loop = get_background_loop()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Only used from the event loop thread
+        self._conn = connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._futures = {}
+        # Job descriptions of the submitted jobs that have not started, in submission order
+        self._pending = {}
+        # Background loop futures of the started jobs that have not finished
+        self._started = {}
+
+    def submit(self, job_application_id, job_description):
+        """
+        Queues a job for prefetching.
+
+        Args:
+            job_application_id (int): The job_applications primary key.
+            job_description (str): The job description text.
+
+        Returns:
+            concurrent.futures.Future: A future resolving once the job has been generated and persisted.
+        """
+        future = concurrent.futures.Future()
+        future.add_done_callback(functools.partial(self._cancelled, job_application_id))
+        with self._lock:
+            self._futures[job_application_id] = future
+            self._pending[job_application_id] = job_description
+        self._start_next()
+        return future
+
+    def wait_for(self, job_application_id):
+        """
+        Blocks until a submitted job has been generated and persisted, starting it first if it is still queued.
+
+        Args:
+            job_application_id (int): The job_applications primary key.
+
+        Returns:
+            dict: The generated values keyed by job_applications column name.
+
+        Raises:
+            GoogleAPIError: If the model request failed after maximum retries.
+        """
+        self._start(job_application_id)
+        return self._futures[job_application_id].result()
+
+    def wait_all(self):
+        """
+        Blocks until every submitted job has finished, reporting failures instead of raising them.
+
+        A failed job, whether from the model, a blocked response or the database write, never stops the remaining
+        jobs from being waited for.
+
+        Returns:
+            int: The number of jobs that were prefetched successfully.
+        """
+        completed = 0
+        for job_application_id, future in list(self._futures.items()):
+            concurrent.futures.wait([future])
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"Prefetch failed for job_application_id {job_application_id}: {error}")
+            else:
+                completed += 1
+        return completed
+
+    def stop(self):
+        """Cancels any outstanding jobs and closes the worker's database connection."""
+        for future in list(self._futures.values()):
+            future.cancel()
+        self._loop.call_soon_threadsafe(self._conn.close)
+
+    def _start_next(self):
+        # Starts queued jobs in submission order until lookahead jobs are running
+        while True:
+            with self._lock:
+                if len(self._started) >= self.lookahead or not self._pending:
+                    return
+                job_application_id = next(iter(self._pending))
+            self._start(job_application_id)
+
+    def _start(self, job_application_id):
+        with self._lock:
+            if job_application_id not in self._pending:
+                return
+            job_description = self._pending.pop(job_application_id)
+            self._started[job_application_id] = run_on_background_loop(self._prefetch(job_application_id,
+                                                                                      job_description))
+            started = self._started[job_application_id]
+        started.add_done_callback(functools.partial(self._finished, job_application_id))
+
+    def _finished(self, job_application_id, started):
+        # Passes the outcome of a started job to its future and starts the next queued job
+        with self._lock:
+            self._started.pop(job_application_id, None)
+        future = self._futures[job_application_id]
+        try:
+            if started.cancelled():
+                future.cancel()
+            elif started.exception() is not None:
+                future.set_exception(started.exception())
+            else:
+                future.set_result(started.result())
+        except concurrent.futures.InvalidStateError:
+            # The future was cancelled while the job was finishing
+            pass
+        self._start_next()
+
+    def _cancelled(self, job_application_id, future):
+        # Drops a cancelled job from the queue, or cancels it on the background loop when it has started
+        if not future.cancelled():
+            return
+        with self._lock:
+            self._pending.pop(job_application_id, None)
+            started = self._started.get(job_application_id)
+        if started is not None:
+            started.cancel()
+
+    async def _prefetch(self, job_application_id, job_description):
+        # A job whose review was filled in after it was queued, e.g. copied from a near-duplicate, is left as it is
+        row = self._conn.execute(f"SELECT {', '.join(job_review_columns)} FROM job_applications "
+                                 f"WHERE job_application_id = ?", (job_application_id,)).fetchone()
+        if row is not None and job_review_is_prefetched(row):
+            return dict(row)
+        with call_context('Step 1 - JD Review', job_application_id):
+            job_review = await generate_job_review(self.model, job_description, self.resume_text, self._semaphore,
+                                                   self.fit_scores.get(job_application_id))
+        update_job(self._conn, job_application_id, **job_review)
+        return job_review
@@ -0,0 +1,284 @@
+import contextlib
+import contextvars
+import datetime
+import functools
+import inspect
+import os
+import re
+import threading
+import time
+
+# Import Global Variables
+import variables.global_variables as global_vars
+
+# The stages the spans of the current thread or task are nested in, each a [name, seconds spent in child spans] list
+_span_stack = contextvars.ContextVar("profile_span_stack", default=())
+
+# None unless profiling was enabled, so every span costs one global lookup when it is off
+_profiler = None
+_null_span = contextlib.nullcontext()
+
+
+def profiled(stage):
+    """
+    Decorates a function, coroutine function or generator function so each call is timed as a span of the stage
+    while profiling is enabled.
+
+    Args:
+        stage (str): The pipeline stage, such as 'model_call' or 'docx_edit'.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if _profiler is None:
+                    return await function(*args, **kwargs)
+                with _profiler.span(stage):
+                    return await function(*args, **kwargs)
+        elif inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if _profiler is None:
+                    return (yield from function(*args, **kwargs))
+                with _profiler.span(stage):
+                    return (yield from function(*args, **kwargs))
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if _profiler is None:
+                    return function(*args, **kwargs)
+                with _profiler.span(stage):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def span(stage):
+    """
+    Returns a context manager timing the block as a span of the stage while profiling is enabled.
+
+    Args:
+        stage (str): The pipeline stage, such as 'db_read'.
+
+    Returns:
+        A context manager.
+    """
+    if _profiler is None:
+        return _null_span
+    return _profiler.span(stage)
+
+
+def profile_job(step, job_application_id):
+    """
+    Returns a context manager timing one job of a step, and running cProfile and tracemalloc over it when they were
+    enabled with the profiler.
+
+    Args:
+        step (str): The job status the work belongs to, such as 'Step 2 - Resume'.
+        job_application_id (int): The job_applications primary key.
+
+    Returns:
+        A context manager.
+    """
+    if _profiler is None:
+        return _null_span
+    return _profiler.job(step, job_application_id)
+
+
+def enable_profiling(cprofile=False, trace_memory=False, output_dir=global_vars.profile_dir):
+    """
+    Starts recording spans for the rest of the process.
+
+    Args:
+        cprofile (bool, optional): Run cProfile over each job and save its statistics. Defaults to False.
+        trace_memory (bool, optional): Trace allocations with tracemalloc and report each job's peak memory and
+            largest allocation sites. Defaults to False.
+        output_dir (str, optional): The directory the profile of this run is written to, in a subdirectory named
+            after the start time. Defaults to global_vars.profile_dir.
+
+    Returns:
+        StageProfiler: The profiler.
+    """
+    global _profiler
+    _profiler = StageProfiler(cprofile, trace_memory, output_dir)
+    return _profiler
+
+
+def finish_profiling():
+    """
+    Stops recording, writes the collapsed stacks and prints the stage and job summaries.
+
+    Returns:
+        str: The directory the profile was written to, or None when profiling was not enabled.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    return profiler.finish()
+
+
+class StageProfiler:
+    """Records the time of every span per stage, and per stack of nested stages for flame graphs.
+
+    A span's stack starts with the step and job its model calls are attributed to (see
+    telemetry_functions.call_context), so work done for a job on the background event loop or a worker thread is
+    filed under that job. Self time, the time not spent in a nested span, is what the collapsed stacks report.
+
+    Args:
+        cprofile (bool): Run cProfile over each job.
+        trace_memory (bool): Trace allocations with tracemalloc over each job.
+        output_dir (str): The parent directory of this run's profile directory.
+    """
+
+    def __init__(self, cprofile, trace_memory, output_dir):
+        # Imported here because the telemetry module loads numpy, which the entry point avoids until a step runs
+        from utilities.telemetry_functions import current_call_context
+
+        self._current_call_context = current_call_context
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.output_dir = os.path.join(output_dir, datetime.datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        # stage: [spans, total seconds, max seconds]
+        self._stages = {}
+        # collapsed stack: self seconds
+        self._stacks = {}
+        # (step, job_application_id, seconds, peak bytes, top allocation sites, cProfile file)
+        self._jobs = []
+        self._cprofile_running = False
+        if trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """
+        Times the block as a span of the stage.
+
+        Args:
+            stage (str): The pipeline stage.
+        """
+        parents = _span_stack.get()
+        frame = [stage, 0.0]
+        token = _span_stack.set(parents + (frame,))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            _span_stack.reset(token)
+            step, job_application_id = self._current_call_context()
+            stack = ";".join(([step] if step else []) +
+                             ([f"job {job_application_id}"] if job_application_id is not None else []) +
+                             [parent[0] for parent in parents] + [stage])
+            with self._lock:
+                if parents:
+                    parents[-1][1] += seconds
+                stage_times = self._stages.setdefault(stage, [0, 0.0, 0.0])
+                stage_times[0] += 1
+                stage_times[1] += seconds
+                stage_times[2] = max(stage_times[2], seconds)
+                # Concurrent child spans can add up to more than their parent's wall time
+                self._stacks[stack] = self._stacks.get(stack, 0.0) + max(seconds - frame[1], 0.0)
+
+    @contextlib.contextmanager
+    def job(self, step, job_application_id):
+        """
+        Times one job, running cProfile and tracemalloc over it when enabled.
+
+        Only one job is run under cProfile at a time; a job that overlaps it in another thread is timed only.
+        tracemalloc peaks cover the whole process, so overlapping jobs share them.
+
+        Args:
+            step (str): The job status the work belongs to.
+            job_application_id (int): The job_applications primary key.
+        """
+        profile = None
+        if self.cprofile:
+            with self._lock:
+                if not self._cprofile_running:
+                    import cProfile
+                    self._cprofile_running = True
+                    profile = cProfile.Profile()
+        snapshot = None
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            snapshot = self._snapshot()
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            profile_file = None
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.output_dir, exist_ok=True)
+                profile_file = os.path.join(self.output_dir,
+                                            f"{re.sub(r'[^A-Za-z0-9]+', '_', step)}-job{job_application_id}.prof")
+                profile.dump_stats(profile_file)
+                with self._lock:
+                    self._cprofile_running = False
+            peak_bytes, allocation_sites = None, []
+            if snapshot is not None:
+                import tracemalloc
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                allocation_sites = [f"{difference.traceback[0].filename}:{difference.traceback[0].lineno} "
+                                    f"{difference.size_diff / 1024:+.0f} KiB"
+                                    for difference in self._snapshot().compare_to(snapshot, "lineno")[:3]]
+            with self._lock:
+                self._jobs.append((step, job_application_id, seconds, peak_bytes, allocation_sites, profile_file))
+
+    @staticmethod
+    def _snapshot():
+        # Leaves out the allocations of the profilers themselves
+        import cProfile
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                          tracemalloc.Filter(False, cProfile.__file__),
+                                                          tracemalloc.Filter(False, __file__)))
+
+    def finish(self):
+        """
+        Writes stages.folded, the collapsed stacks in microseconds of self time, and prints the stage and job
+        summaries.
+
+        Returns:
+            str: The directory the profile was written to.
+        """
+        wall_seconds = time.perf_counter() - self.start
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        folded_file = os.path.join(self.output_dir, "stages.folded")
+        with self._lock, open(folded_file, "w") as file:
+            for stack, seconds in sorted(self._stacks.items()):
+                file.write(f"{stack} {round(seconds * 1e6)}\n")
+            stages = sorted(self._stages.items(), key=lambda item: item[1][1], reverse=True)
+            jobs = list(self._jobs)
+
+        # Spans of the same stage can overlap, so the share of wall time can add up to more than 100%
+        print(f"\nProfile over {wall_seconds:.2f}s of wall time")
+        print(f"{'Stage':<15} {'Spans':>7} {'Total s':>9} {'Mean ms':>9} {'Max ms':>9} {'Wall %':>7}")
+        for stage, (count, total_seconds, max_seconds) in stages:
+            print(f"{stage:<15} {count:>7} {total_seconds:>9.3f} {total_seconds / count * 1e3:>9.2f} "
+                  f"{max_seconds * 1e3:>9.2f} {total_seconds / wall_seconds * 100:>6.1f}%")
+        if jobs:
+            print(f"\n{'Step':<20} {'Job':>6} {'Seconds':>8} {'Peak MiB':>9}")
+            for step, job_application_id, seconds, peak_bytes, allocation_sites, profile_file in jobs:
+                peak = f"{peak_bytes / 2 ** 20:9.1f}" if peak_bytes is not None else f"{'-':>9}"
+                print(f"{step:<20} {job_application_id:>6} {seconds:>8.2f} {peak}"
+                      f"{'  ' + os.path.basename(profile_file) if profile_file else ''}")
+                for allocation_site in allocation_sites:
+                    print(f"{'':<27}{allocation_site}")
+        print(f"\nCollapsed stacks for flame graphs: {folded_file}")
+        return self.output_dir
@@ -0,0 +1,277 @@
+from utilities.profile_functions import profiled
+
+
+@profiled("prompt_build")
+def build_job_requirements_prompt(job_description):
+    """
+    Builds the prompt parts used to extract the special and must-have requirements from a job description.
+
+    Args:
+        job_description (str): The job description text.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Input: " + job_description + "\n\n"
+        "Output:" + "\n"
+        "Special Requirements (Explicitly Mentioned): "
+        "List any specific certifications, licenses, security clearances, travel expectations, "
+        "or other unusual requirements explicitly stated in the job description. "
+        "Quote any instructions or guidelines provided for applying, including deadlines, application methods, "
+        "or specific formatting requirements. \n"
+        "Must-Have Skills (Explicitly Mentioned): "
+        "List only the skills or qualifications explicitly identified as 'must-have', 'required', "
+        "or 'essential' in the job description. "
+        "Avoid assumptions or inferences; stick to the exact language used in the document. \n\n"
+        "Omit: \n"
+        "Inferences about company culture or work environment. "
+        "Hints of tools, technologies, or methodologies not explicitly stated. "
+        "Analysis of implied skills or qualifications. "
+        "Suggestions for additional skills or experiences. "
+        "Summaries of company tone or culture. "
+        "Qualifications that don't explicitly indicate that they are required. \n\n"
+        "Additional Tips: \n"
+        "If a requirement is unclear, include it as a potential need for clarification during the "
+        "application process. "
+        "Pay close attention to formatting, capitalization, or special emphasis used in the "
+        "job description to highlight key requirements. "
+        "Consider using a text-analysis tool or software to help identify patterns and keywords "
+        "if dealing with large volumes of job descriptions. "
+    ]
+
+
+@profiled("prompt_build")
+def build_keywords_prompt(job_description):
+    """
+    Builds the prompt parts used to extract hard and soft keywords from a job description.
+
+    Args:
+        job_description (str): The job description text.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Persona: Executive career coach that works with highly skilled job seekers. "
+        "Job Description: " + job_description + "\n\n"
+        "Output: " + "\n"
+        "Hard keywords: A list of specific skills, tools, technologies, and qualifications explicitly"
+        " mentioned in the job description. "
+        "Soft keywords: A list of personality traits, work styles, cultural values, and desired behaviors "
+        "implied in the job description's tone, language, and context."
+        "Instructions: " + "\n"
+        "Do not analyze text from the legal, compensation, or pay sections of the job description. "
+        "Prioritize action verbs (e.g., manage, analyze, lead) and direct mentions of required skills "
+        "and qualifications for the 'hard keywords' list. "
+        "Identify descriptive adjectives and phrases conveying desired soft skills, company culture, "
+        "and work environment for the 'soft keywords' list. "
+        "Consider keywords mentioned multiple times or emphasized through formatting/bolding as more significant. "
+        "Avoid repetition and redundancy in both lists."
+        "Output: Hard keywords, soft keywords that will be included in a future prompt to improve a resume_template. "
+    ]
+
+
+@profiled("prompt_build")
+def build_guidance_prompt(job_description):
+    """
+    Builds the prompt parts used to generate resume guidance for a job description.
+
+    Args:
+        job_description (str): The job description text.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Persona: Review the Job Description below as a Career Coach that is working with a senior level candidate. "
+        "Job Description: " + job_description + "\n\n"
+        "Task; Read through the Job Description as the Persona and provide guidance on what the candidate should "
+        "include in their resume_template summary to impress the recruiter and hiring manager. "
+        "Output: \n"
+        "Resume Summary: Guidance instructions to be included in future prompts to create a resume summary."
+        "Resume Bullets: Guidance instructions to be included in future prompts to improve each resume bullets to be "
+        "specific to the job."
+        "Resume 3 Keys: Instruction on the 3 key items the resume should communicate."
+        "Output Example: \n"
+        "Resume Summary Guidance: "
+        "- Emphasize your 10+ years of progressive product management experience in an agile environment, "
+        "highlighting your technical understanding and knowledge of data storage management software, "
+        "machine learning, and artificial intelligence.\n "
+        "- Showcase your demonstrated experience in driving and leading complex, "
+        "multifaceted, early market stage products.\n"
+        "Resume Bullets Guidance: \n"
+        "- Include specific examples of how you have successfully shaped product vision, defined and "
+        "iterated product roadmaps, and gathered and synthesized internal and external feedback to improve "
+        "products.\n"
+        "- Provide quantifiable results and achievements, such as increased customer satisfaction, "
+        "improved product adoption, or enhanced revenue generation.\n"
+        "- Demonstrate your ability to work effectively in a cross-functional and collaborative role, "
+        "spanning engineering, marketing, sales, and customer support teams.\n"
+        "3 Keys: \n"
+        "- Experience building data solutions in the cloud. \n"
+        "- Have built an AI-powered sales forecasting model using linear regression in R and Python. \n"
+        "- Lead a project from 0 to 1."
+    ]
+
+
+@profiled("prompt_build")
+def build_fit_score_prompt(job_requirements, resume_text):
+    """
+    Builds the prompt parts used to score how well a resume fits a set of job requirements.
+
+    Args:
+        job_requirements (str): A string containing the job requirements.
+        resume_text (str): A string containing the resume_template text.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Requirement: " + job_requirements + "\n\n"
+        "Resume: " + resume_text + "\n\n"
+        "Persona: Experienced recruiter or hiring manager, adept at identifying strong candidates using both "
+        "ATS and manual review. \n"
+        "Task: \n"
+        "1. **Keyword Matching:**\n"
+        "   - Extract keywords and phrases from the job requirements.\n"
+        "   - Calculate a percentage match based on the frequency of these keywords appearing in the resume.\n"
+        "   - Weight keywords based on their importance in the job description (e.g., using bold formatting or "
+        "(repetition).\n"
+        "2. **Skill Alignment:**\n"
+        "   - Identify specific skills mentioned in the job requirements.\n"
+        "   - Assess the degree to which the resume demonstrates those skills through experiences, achievements, "
+        "or certifications.\n"
+        "   - Assign a percentage score for each skill, considering factors like relevance, depth of experience, "
+        "and quantifiable results.\n"
+        "3. **Experience and Education:**\n"
+        "   - Evaluate the alignment of the candidate's professional experience "
+        "(e.g., job titles, companies, industries) with the job requirements.\n"
+        "   - Assess the relevance of their educational background to the role.\n"
+        "   - Assign a percentage score for each category, considering factors like duration of experience, "
+        "industry reputation, and educational credentials.\n"
+        "4. **Additional Factors (Optional):**\n"
+        "   - Consider incorporating other relevant aspects based on the job description, such as:\n"
+        "     - Alignment with company culture or values\n"
+        "     - Specific certifications or licenses\n"
+        "     - Geographic proximity to the job location\n"
+        "     - Industry awards or recognition\n\n"
+        "Output: A single job fit score between 0 and 100 (XX.XX), calculated as an average of "
+        "the 4 scores above. Refer to the Output Example there is only 1 number.\n"
+        "Output Example: 93.50"
+    ]
+
+
+@profiled("prompt_build")
+def build_bullets_filter_prompt(achievements, job_description, guidance, num_of_bullets):
+    """
+    Builds the prompt parts used to select the achievements of a role that best match a job.
+
+    Args:
+        achievements (str): The role's achievements, one per line.
+        job_description (str): The target job description.
+        guidance (str): The resume guidance generated in Step 1.
+        num_of_bullets (int): The number of achievements to select.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Input: "
+        "Achievements: " + achievements + "\n"
+        "Job Description: " + job_description + "\n"
+        "Job Guidance: " + guidance + "\n"
+        "Task: "
+        "Analyze the achievements and select the top " + str(num_of_bullets) +
+        " that most closely align with the job description and guidance. "
+        "Prioritize achievements that:\n"
+        "- Demonstrate skills, experience, and accomplishments directly matching those "
+        "specified in the job description and guidance.\n"
+        "- Highlight measurable results and quantifiable impacts.\n"
+        "- Align with the company's values or mission (if mentioned in the guidance).\n"
+        "- Demonstrate leadership or initiative (if relevant to the role).\n"
+        "Output: The top " + str(num_of_bullets) + " most relevant achievements, presented "
+        "verbatim as they appear in the input list. \n"
+        "Example Output:\n"
+        "- Achievement Sentence 1\n"
+        "- Achievement Sentence 2\n"
+    ]
+
+
+@profiled("prompt_build")
+def build_bullet_enhancement_prompt(original_bullet, guidance, keywords):
+    """
+    Builds the prompt parts used to craft enhanced versions of a resume bullet.
+
+    Args:
+        original_bullet (str): The original achievement bullet.
+        guidance (str): The resume guidance generated in Step 1.
+        keywords (str): The keywords generated in Step 1.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    return [
+        "Input:\n"
+        "Original Achievement: " + original_bullet + "\n"
+        "Target Guidance Item: " + guidance + "\n"
+        "Job Guidance: " + guidance + "\n"
+        "Keywords: " + keywords + "\n"
+        "Task: \n"
+        "Craft 5 enhanced versions of the original achievement bullet, keeping it under 250 characters each. "
+        "Focus on:\n"
+        "- Integrating relevant keywords naturally, avoiding keyword stuffing.\n"
+        "- Clarifying details by mentioning tools, technologies, or processes used.\n"
+        "- Quantifying impact with data or metrics whenever possible, or offering alternative ways to "
+        "demonstrate results.\n"
+        "- Aligning the revised bullet with the most relevant Resume Bullets Guidance items. \n"
+        "- Do not change the meaning of the original bullet for all suggestions.\n"
+        "- Using professional language, avoiding buzzwords, clichés, and personal pronouns.\n"
+        "- Keep the action verb the same as the original achievement or use a verb with the same meaning.\n"
+        "Output: \n"
+        "Just the enhanced bullet text with no formatting and each bullet on a separate line.\n"
+    ]
+
+
+@profiled("prompt_build")
+def build_batched_bullet_enhancement_prompt(original_bullets, guidance, keywords):
+    """
+    Builds the prompt parts used to craft enhanced versions of several resume bullets in one request.
+
+    The guidance and keywords are sent once for the whole batch and the model is asked for a JSON object that
+    maps each bullet's number to its enhanced versions.
+
+    Args:
+        original_bullets (list): The original achievement bullets.
+        guidance (str): The resume guidance generated in Step 1.
+        keywords (str): The keywords generated in Step 1.
+
+    Returns:
+        list: The prompt parts for the generative model.
+    """
+    numbered_bullets = "\n".join(f"{index}: {bullet}" for index, bullet in enumerate(original_bullets))
+    return [
+        "Input:\n"
+        "Job Guidance: " + guidance + "\n"
+        "Keywords: " + keywords + "\n"
+        "Original Achievements:\n" + numbered_bullets + "\n"
+        "Task: \n"
+        "For each numbered original achievement, craft 5 enhanced versions of the bullet, keeping it under "
+        "250 characters each. "
+        "Focus on:\n"
+        "- Integrating relevant keywords naturally, avoiding keyword stuffing.\n"
+        "- Clarifying details by mentioning tools, technologies, or processes used.\n"
+        "- Quantifying impact with data or metrics whenever possible, or offering alternative ways to "
+        "demonstrate results.\n"
+        "- Aligning the revised bullet with the most relevant Resume Bullets Guidance items. \n"
+        "- Do not change the meaning of the original bullet for all suggestions.\n"
+        "- Using professional language, avoiding buzzwords, clichés, and personal pronouns.\n"
+        "- Keep the action verb the same as the original achievement or use a verb with the same meaning.\n"
+        "Output: \n"
+        "Only a JSON object with no other text or formatting. Use each achievement's number as the key and a list "
+        "of its 5 enhanced bullet texts as the value.\n"
+        "Example Output:\n"
+        '{"0": ["Enhanced bullet 1", "Enhanced bullet 2", "Enhanced bullet 3", "Enhanced bullet 4", '
+        '"Enhanced bullet 5"], "1": ["Enhanced bullet 1", "Enhanced bullet 2", "Enhanced bullet 3", '
+        '"Enhanced bullet 4", "Enhanced bullet 5"]}\n'
+    ]
@@ -0,0 +1,252 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from google.api_core import exceptions as api_exceptions
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+
+# Errors worth retrying: quota, overload, timeouts and server-side failures
+_retryable_errors = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.GatewayTimeout,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.Aborted,
+    api_exceptions.BadGateway,
+)
+
+_retry_in_pattern = re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+_shared_limiter = None
+_shared_circuit_breaker = None
+_shared_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking.
+
+    A caller reserves an amount and receives the number of seconds to wait before using it. The balance may go
+    negative, so concurrent callers queue up behind each other in the order they reserved.
+
+    Args:
+        rate_per_minute (float): Tokens added per minute.
+        capacity (float, optional): Maximum burst size. Defaults to one second of the rate, which spreads requests
+            evenly instead of spending a whole minute of quota at once.
+        clock (callable, optional): Monotonic clock in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else self.rate_per_second
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """
+        Reserves tokens from the bucket.
+
+        Args:
+            amount (float, optional): The number of tokens to take. Defaults to 1.
+
+        Returns:
+            float: Seconds to wait before the reserved tokens may be used.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate_per_second)
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter for every model call in the process.
+
+    Args:
+        requests_per_minute (float, optional): Request quota. None disables the request limit.
+        tokens_per_minute (float, optional): Input token quota. None disables the token limit.
+        clock (callable, optional): Monotonic clock in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, clock=time.monotonic):
+        self.clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=0):
+        """
+        Reserves one request and an estimated number of input tokens.
+
+        Args:
+            tokens (int, optional): The estimated input tokens of the request. Defaults to 0.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None and tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        with self._lock:
+            return max(delay, self._paused_until - self.clock())
+
+    def pause(self, seconds):
+        """
+        Holds back every caller for a number of seconds, for example when the API returns a retry-after hint.
+
+        Args:
+            seconds (float): How long to pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+
+class CircuitBreaker:
+    """Pauses all callers when the share of failed calls in a sliding window spikes.
+
+    Once min_calls outcomes are recorded and the error rate in the last window calls reaches error_rate_threshold,
+    the breaker opens for cooldown_seconds. While it is open every caller waits for it to close instead of adding
+    load. After the cooldown the window is cleared and calls resume.
+
+    Args:
+        window (int, optional): Number of recent calls considered.
+        error_rate_threshold (float, optional): Error rate between 0 and 1 that opens the breaker.
+        min_calls (int, optional): Calls required in the window before the breaker can open.
+        cooldown_seconds (float, optional): How long the breaker stays open.
+        clock (callable, optional): Monotonic clock in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, window=gemini_cfg.circuit_breaker_window,
+                 error_rate_threshold=gemini_cfg.circuit_breaker_error_rate,
+                 min_calls=gemini_cfg.circuit_breaker_min_calls,
+                 cooldown_seconds=gemini_cfg.circuit_breaker_cooldown_seconds, clock=time.monotonic):
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, success):
+        """
+        Records the outcome of a call and opens the breaker when the error rate spikes.
+
+        Args:
+            success (bool): False for a retryable failure, True for a successful call.
+        """
+        with self._lock:
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate_threshold:
+                self._open_until = self.clock() + self.cooldown_seconds
+                self._outcomes.clear()
+                print(f"Error rate spiked to {failures} failures, pausing model calls for "
+                      f"{self.cooldown_seconds} seconds.")
+
+    def delay(self):
+        """Returns the seconds until the breaker closes, or 0 when it is closed."""
+        with self._lock:
+            return max(0.0, self._open_until - self.clock())
+
+
+def get_rate_limiter():
+    """Returns the process-wide RateLimiter configured from variables/gemini_variables.py."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(gemini_cfg.requests_per_minute, gemini_cfg.tokens_per_minute)
+    return _shared_limiter
+
+
+def get_circuit_breaker():
+    """Returns the process-wide CircuitBreaker configured from variables/gemini_variables.py."""
+    global _shared_circuit_breaker
+    with _shared_lock:
+        if _shared_circuit_breaker is None:
+            _shared_circuit_breaker = CircuitBreaker()
+    return _shared_circuit_breaker
+
+
+def is_retryable_error(error):
+    """
+    Classifies an API error as retryable (quota, overload, timeouts, server errors) or fatal.
+
+    Args:
+        error (Exception): The error raised by the API call.
+
+    Returns:
+        bool: True when retrying the request may succeed.
+    """
+    return isinstance(error, _retryable_errors + (ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error):
+    """
+    Extracts a retry-after hint from an API error.
+
+    Looks at RetryInfo details, a Retry-After response header and "retry in Ns" in the message, in that order.
+
+    Args:
+        error (Exception): The error raised by the API call.
+
+    Returns:
+        float: The suggested wait in seconds, or None when the error carries no hint.
+    """
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After") or headers.get("retry-after"))
+    except (TypeError, ValueError):
+        pass
+
+    match = _retry_in_pattern.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt, base_delay=gemini_cfg.retry_base_delay, max_delay=gemini_cfg.retry_max_delay,
+                  retry_after=None):
+    """
+    Computes an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): The zero-based number of the failed attempt.
+        base_delay (float, optional): Delay ceiling for the first retry in seconds.
+        max_delay (float, optional): Upper bound for the delay ceiling in seconds.
+        retry_after (float, optional): A server hint the delay never undercuts. Defaults to None.
+
+    Returns:
+        float: Seconds to wait before the next attempt.
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+def estimate_prompt_tokens(prompt_parts):
+    """
+    Estimates the input tokens of a prompt at four characters per token.
+
+    Args:
+        prompt_parts: The prompt parts for the API call.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if isinstance(prompt_parts, str):
+        prompt_parts = [prompt_parts]
+    return sum(len(part) for part in prompt_parts if isinstance(part, str)) // 4
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+# Bump when the ResumeProfile format changes so stale sidecar files are compiled again
+_resume_profile_version = 1
+
+# Characters stripped from the start of each achievement line
+_bullet_characters = "-•●▪◦*·– \t"
+
+_resume_profiles = {}
+
+
+def resume_docx_file_name(company_name, job_title, output_dir='temp/resumes/docx'):
+    """
+    Returns the path of the tailored resume docx for a job.
+
+    Args:
+        company_name (str): The company name.
+        job_title (str): The job title.
+        output_dir (str, optional): The directory holding the resumes. Defaults to 'temp/resumes/docx'.
+
+    Returns:
+        str: The docx file path.
+    """
+    return f'{output_dir}/{company_name}-{job_title}-Resume.docx'
+
+
+def build_resume_substitutions(job_title, bullets_by_role, summary, summary_bullets, skills):
+    """
+    Maps the resume template placeholders to the selected resume content.
+
+    Args:
+        job_title (str): The target job title.
+        bullets_by_role (list): The selected achievement bullets for each role, in resume order.
+        summary (str): The selected summary paragraph.
+        summary_bullets (list): The selected summary achievements.
+        skills (str): The skills section text.
+
+    Returns:
+        dict: The replacement text keyed by placeholder.
+    """
+    substitutions = {'jobTitle': job_title, 'summaryParagraph': summary, 'skillsPlaceHolder': skills}
+    for role_index, role_bullets in enumerate(bullets_by_role):
+        for bullet_index, bullet in enumerate(role_bullets):
+            substitutions[f'job{role_index + 1}Achievement{bullet_index + 1}'] = bullet
+    for bullet_index, bullet in enumerate(summary_bullets):
+        substitutions[f'summaryBullet{bullet_index + 1}'] = bullet
+    return substitutions
+
+
+def resume_substitutions_from_row(row):
+    """
+    Rebuilds the template substitutions from the resume content stored for a job.
+
+    Args:
+        row: A job_applications record supporting row['column'] access.
+
+    Returns:
+        dict: The replacement text keyed by placeholder, or None when the bullet selections were not stored.
+    """
+    if not row['resume_bullets']:
+        return None
+    return build_resume_substitutions(row['job_title'], json.loads(row['resume_bullets']), row['resume_summary'] or '',
+                                      (row['resume_summary_bullets'] or '').splitlines(), row['resume_skills'] or '')
+
+
+class ResumeRole:
+    """One role of the full resume with its achievements already split into bullets.
+
+    Supports both role.column and role['column'], so it can stand in for an Affinda work_experience entry.
+
+    Args:
+        organization (str): The company name.
+        job_title (str): The job title.
+        start_date (str): The start date, or None.
+        end_date (str): The end date, or None.
+        months_in_position (int): The number of months in the role, or None.
+        job_description (str): The achievements text as parsed from the resume.
+        achievements (tuple): The individual achievements, one per non-blank line of job_description.
+    """
+
+    __slots__ = ("organization", "job_title", "start_date", "end_date", "months_in_position", "job_description",
+                 "achievements")
+
+    def __init__(self, organization, job_title, start_date, end_date, months_in_position, job_description,
+                 achievements):
+        self.organization = organization
+        self.job_title = job_title
+        self.start_date = start_date
+        self.end_date = end_date
+        self.months_in_position = months_in_position
+        self.job_description = job_description
+        self.achievements = achievements
+
+    def __getitem__(self, column):
+        return getattr(self, column)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class ResumeProfile:
+    """The parts of the parsed full resume the steps use, compiled from the parser's JSON output.
+
+    Args:
+        source_hash (str): The SHA-256 hash of the JSON file the profile was compiled from.
+        raw_text (str): The full resume text.
+        work_experience (tuple): The ResumeRole entries in resume order.
+    """
+
+    def __init__(self, source_hash, raw_text, work_experience):
+        self.source_hash = source_hash
+        self.raw_text = raw_text
+        self.work_experience = work_experience
+
+
+def resume_json_file(resume_name, data_dir='data/target'):
+    """
+    Returns the path of the parsed full resume JSON.
+
+    Args:
+        resume_name (str): The full resume file name without extension.
+        data_dir (str, optional): The directory holding the parsed resume. Defaults to 'data/target'.
+
+    Returns:
+        str: The JSON file path.
+    """
+    return f'{data_dir}/{resume_name}.json'
+
+
+def compile_resume_profile(resume_data, source_hash=None):
+    """
+    Extracts the raw text and the work experience from the parsed resume, dropping the parser's metadata.
+
+    Args:
+        resume_data (dict): The parsed resume, with the raw_text and work_experience under 'data'.
+        source_hash (str, optional): The hash of the JSON file. Defaults to None.
+
+    Returns:
+        ResumeProfile: The compiled profile.
+    """
+    data = resume_data['data']
+    work_experience = []
+    for role in data.get('work_experience') or ():
+        dates = role.get('dates') or {}
+        job_description = role.get('job_description') or ''
+        achievements = tuple(line.strip().lstrip(_bullet_characters) for line in job_description.splitlines()
+                             if line.strip().lstrip(_bullet_characters))
+        work_experience.append(ResumeRole(role.get('organization'), role.get('job_title'), dates.get('start_date'),
+                                          dates.get('end_date'), dates.get('months_in_position'), job_description,
+                                          achievements))
+    return ResumeProfile(source_hash, str(data['raw_text']), tuple(work_experience))
+
+
+def load_resume_profile(resume_name, data_dir='data/target'):
+    """
+    Returns the compiled profile of the parsed full resume, compiling it only when the JSON file has changed.
+
+    Profiles are kept in memory and pickled next to the JSON file as <resume_name>.profile.pickle, together with
+    the hash, size and modification time of the JSON file. An unchanged size and modification time skip hashing;
+    otherwise the profile is compiled again when the hash differs.
+
+    Args:
+        resume_name (str): The full resume file name without extension.
+        data_dir (str, optional): The directory holding the parsed resume. Defaults to 'data/target'.
+
+    Returns:
+        ResumeProfile: The compiled profile.
+
+    Raises:
+        FileNotFoundError: If the resume has not been parsed yet.
+    """
+    source_file = Path(resume_json_file(resume_name, data_dir))
+    source_stat = os.stat(source_file)
+    source_signature = (source_stat.st_size, source_stat.st_mtime_ns)
+    profile_file = source_file.with_suffix('.profile.pickle')
+
+    cached = _resume_profiles.get(str(source_file))
+    if cached is None:
+        try:
+            with open(profile_file, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            cached = None
+    if cached is not None and cached[0] == _resume_profile_version:
+        version, signature, profile = cached
+        if signature == source_signature:
+            _resume_profiles[str(source_file)] = cached
+            return profile
+        source_bytes = source_file.read_bytes()
+        if hashlib.sha256(source_bytes).hexdigest() == profile.source_hash:
+            # Touched but unchanged, so only the stored signature needs refreshing
+            return _store_resume_profile(source_file, profile_file, source_signature, profile)
+    else:
+        source_bytes = source_file.read_bytes()
+
+    profile = compile_resume_profile(json.loads(source_bytes), hashlib.sha256(source_bytes).hexdigest())
+    return _store_resume_profile(source_file, profile_file, source_signature, profile)
+
+
+def _store_resume_profile(source_file, profile_file, source_signature, profile):
+    cached = (_resume_profile_version, source_signature, profile)
+    # Write to a temporary file first so a concurrent reader never sees a partial pickle
+    temp_file = profile_file.with_suffix(f'.{os.getpid()}.tmp')
+    with open(temp_file, 'wb') as f:
+        pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, profile_file)
+    _resume_profiles[str(source_file)] = cached
+    return profile
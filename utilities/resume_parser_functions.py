@@ -0,0 +1,184 @@
+import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from dateutil import parser as date_parser
+from docx import Document
+
+# Paragraph styles marking the structure of the full resume: the template's own styles first, then Word's built-in
+# headings for resumes written without the template
+section_styles = ('Section', 'Heading 1')
+role_heading_styles = ('job Heading 1', 'Heading 2')
+role_title_styles = ('job Heading 2', 'Heading 3')
+work_experience_section = 'work experience'
+
+# Parsers that can produce the parsed resume JSON
+resume_parsers = ('local', 'affinda')
+
+# End dates meaning the role is still held
+_current_date_words = ('present', 'current', 'now', 'today')
+_date_separators = (' – ', ' — ', ' - ', '–', '—', ' to ')
+
+
+def full_resume_docx_file(resume_name, source_dir='data/src/resume_full'):
+    """
+    Returns the path of the full resume docx.
+
+    Args:
+        resume_name (str): The full resume file name without extension.
+        source_dir (str, optional): The directory holding the full resume. Defaults to 'data/src/resume_full'.
+
+    Returns:
+        str: The docx file path.
+    """
+    return f'{source_dir}/{resume_name}.docx'
+
+
+def file_sha256(file_name):
+    """
+    Hashes the content of a file.
+
+    Args:
+        file_name (str): The file to hash.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    with open(file_name, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_resume_docx(docx_file):
+    """
+    Parses the full resume docx locally into the raw text and work experience the steps read.
+
+    Sections start at a paragraph in one of section_styles. In the work experience section a paragraph in one of
+    role_heading_styles starts a role, "Organization, Location<tab>Start – End", the next paragraph in one of
+    role_title_styles is its job title and every other paragraph is an achievement.
+
+    Args:
+        docx_file (str): The full resume docx.
+
+    Returns:
+        dict: The parsed resume in the shape of the Affinda output, with raw_text and work_experience under 'data'.
+    """
+    doc = Document(docx_file)
+    lines = []
+    work_experience = []
+    in_work_experience = False
+    role = None
+    for paragraph in doc.paragraphs:
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        lines.append(text)
+        style_name = paragraph.style.name if paragraph.style is not None else ''
+
+        if style_name in section_styles:
+            in_work_experience = text.lower() == work_experience_section
+            role = None
+        elif not in_work_experience:
+            continue
+        elif style_name in role_heading_styles:
+            role = _parse_role_heading(text)
+            work_experience.append(role)
+        elif role is None:
+            continue
+        elif style_name in role_title_styles and role['job_title'] is None:
+            role['job_title'] = text
+        else:
+            role['job_description'] = f"{role['job_description']}\n{text}" if role['job_description'] else text
+
+    return {'meta': {'file_name': Path(docx_file).name, 'parser': 'local'},
+            'data': {'raw_text': '\n'.join(lines), 'work_experience': work_experience}}
+
+
+def parse_resume_with_affinda(token, collection_id, docx_file):
+    """
+    Uploads the full resume to Affinda and waits for the parsed result.
+
+    Args:
+        token (str): The Affinda API token.
+        collection_id (str): The Affinda collection to upload the resume to.
+        docx_file (str): The full resume docx.
+
+    Returns:
+        dict: The Affinda document.
+    """
+    # Only needed when Affinda is chosen, so the local parser works without it
+    from affinda import AffindaAPI, TokenCredential
+
+    client = AffindaAPI(credential=TokenCredential(token=token))
+    with open(docx_file, 'rb') as f:
+        resume = client.create_document(file=f, file_name=Path(docx_file).name, collection=collection_id)
+    return resume.as_dict()
+
+
+def parsed_resume_source(json_file):
+    """
+    Reads which file and parser produced a parsed resume JSON.
+
+    Args:
+        json_file (str): The parsed resume JSON.
+
+    Returns:
+        dict: The 'sha256' of the docx and the 'parser' used, or None when the file is missing or predates the check.
+    """
+    try:
+        with open(json_file) as f:
+            return json.load(f).get('source')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_parsed_resume(json_file, resume_data, source_hash, parser):
+    """
+    Writes a parsed resume JSON, recording the hash of the docx and the parser that produced it.
+
+    Args:
+        json_file (str): The parsed resume JSON to write.
+        resume_data (dict): The parsed resume.
+        source_hash (str): The SHA-256 hash of the full resume docx.
+        parser (str): 'local' or 'affinda'.
+    """
+    resume_data = dict(resume_data, source={'sha256': source_hash, 'parser': parser})
+    # Write to a temporary file first so a step starting meanwhile never reads a partial file
+    temp_file = f'{json_file}.{os.getpid()}.tmp'
+    with open(temp_file, 'w') as f:
+        json.dump(resume_data, f, indent=4)  # Indent for readability
+    os.replace(temp_file, json_file)
+
+
+def _parse_role_heading(text):
+    # "Organization, City, State<tab>Start – End" into an Affinda style work_experience entry
+    organization_text, _, dates_text = text.rpartition('\t') if '\t' in text else (text, '', '')
+    organization, _, location = organization_text.partition(',')
+    start_text, end_text = dates_text, ''
+    for separator in _date_separators:
+        if separator in dates_text:
+            start_text, _, end_text = dates_text.partition(separator)
+            break
+
+    start_date, _ = _parse_date(start_text)
+    end_date, is_current = _parse_date(end_text)
+    months_in_position = None
+    if start_date is not None and end_date is not None:
+        months_in_position = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month
+    return {'organization': organization.strip(), 'location': location.strip() or None, 'job_title': None,
+            'dates': {'start_date': start_date.isoformat() if start_date else None,
+                      'end_date': end_date.isoformat() if end_date else None,
+                      'months_in_position': months_in_position, 'is_current': is_current},
+            'job_description': ''}
+
+
+def _parse_date(text):
+    # Returns the date and whether it means the role is current; unparseable dates are None
+    text = text.strip()
+    if text.lower() in _current_date_words:
+        return datetime.date.today(), True
+    try:
+        return date_parser.parse(text, default=datetime.datetime(datetime.date.today().year, 1, 1)).date(), False
+    except (ValueError, OverflowError):
+        return None, False
@@ -0,0 +1,247 @@
+import atexit
+import contextlib
+import contextvars
+import functools
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Import Global Variables
+import variables.gemini_variables as gemini_cfg
+import variables.global_variables as global_vars
+from utilities.profile_functions import profile_job
+from utilities.rate_limit_functions import estimate_prompt_tokens
+
+# The step and job the model calls made in the current thread or task belong to
+_call_context = contextvars.ContextVar("llm_call_context", default=(None, None))
+
+_llm_call_columns = ("created_at", "step", "prompt_type", "job_application_id", "model_name", "input_tokens",
+                     "output_tokens", "latency_seconds", "retries", "cache_hit", "error_class")
+
+_default_recorder = None
+_default_recorder_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def call_context(step, job_application_id=None):
+    """
+    Attributes the model calls made inside the block to a step and a job.
+
+    The context follows the calls into asyncio tasks and asyncio.to_thread workers created inside the block, and
+    into coroutines scheduled with run_on_background_loop.
+
+    Args:
+        step (str): The job status the calls belong to, such as 'Step 2 - Resume'.
+        job_application_id (int, optional): The job_applications primary key. Defaults to None.
+    """
+    token = _call_context.set((step, job_application_id))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def records_calls_for(step):
+    """
+    Decorates a stage function taking (conn, model, row, ...) so its model calls are attributed to the step and the
+    row's job, and so each call is profiled as one job while profiling is enabled.
+
+    Args:
+        step (str): The job status the calls belong to.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(conn, model, row, *args, **kwargs):
+            with call_context(step, row['job_application_id']), profile_job(step, row['job_application_id']):
+                return function(conn, model, row, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_call_context():
+    """Returns the (step, job_application_id) the current model calls are attributed to."""
+    return _call_context.get()
+
+
+async def in_call_context(coroutine, context):
+    """
+    Awaits a coroutine with the given call context, for coroutines handed to another thread's event loop.
+
+    Args:
+        coroutine: The coroutine to run.
+        context (tuple): The (step, job_application_id) returned by current_call_context.
+
+    Returns:
+        The coroutine's result.
+    """
+    # Each task runs in its own copy of the context, so this does not leak into other tasks on the loop
+    _call_context.set(context)
+    return await coroutine
+
+
+class LlmCall:
+    """Times one model call and hands its telemetry to the shared CallRecorder when it finishes.
+
+    Args:
+        model: The Google generative AI model object.
+        prompt_parts: The prompt parts for the API call.
+        prompt_type (str): What the prompt is for, such as 'cover_letter'.
+    """
+
+    __slots__ = ("model_name", "prompt_parts", "prompt_type", "step", "job_application_id", "created_at", "start")
+
+    def __init__(self, model, prompt_parts, prompt_type):
+        self.model_name = getattr(model, "model_name", type(model).__name__)
+        self.prompt_parts = prompt_parts
+        self.prompt_type = prompt_type
+        self.step, self.job_application_id = _call_context.get()
+        self.created_at = time.time()
+        self.start = time.perf_counter()
+
+    def finish(self, response_text, usage_metadata=None, retries=0, cache_hit=False):
+        """
+        Records a successful call.
+
+        Args:
+            response_text (str): The response text, used to estimate the output tokens without usage metadata.
+            usage_metadata (optional): The response's usage_metadata with the actual token counts. Defaults to None.
+            retries (int, optional): The number of failed attempts before the response. Defaults to 0.
+            cache_hit (bool, optional): Whether the response came from the response cache. Defaults to False.
+        """
+        input_tokens = getattr(usage_metadata, "prompt_token_count", None) or estimate_prompt_tokens(
+            self.prompt_parts)
+        output_tokens = getattr(usage_metadata, "candidates_token_count", None) or len(response_text or "") // 4
+        self._record(input_tokens, output_tokens, retries, cache_hit, None)
+
+    def fail(self, error, retries):
+        """
+        Records a call that raised an error.
+
+        Args:
+            error (Exception): The error raised to the caller.
+            retries (int): The number of failed attempts before the last one.
+        """
+        self._record(estimate_prompt_tokens(self.prompt_parts), 0, retries, False, type(error).__name__)
+
+    def _record(self, input_tokens, output_tokens, retries, cache_hit, error_class):
+        recorder = get_call_recorder()
+        if recorder is not None:
+            recorder.add((self.created_at, self.step, self.prompt_type, self.job_application_id, self.model_name,
+                          input_tokens, output_tokens, time.perf_counter() - self.start, retries, int(cache_hit),
+                          error_class))
+
+
+class CallRecorder:
+    """Buffers model call telemetry in memory and writes it to the llm_calls table in batches.
+
+    A batch is written once batch_size calls are buffered, and whatever is left when the process exits. Writing
+    uses its own connection, so calls can be recorded from any thread without touching the caller's transaction.
+
+    Args:
+        db_file (str, optional): The SQLite database file. Defaults to global_vars.sqlite_db_file.
+        batch_size (int, optional): Number of calls buffered before they are written.
+            Defaults to gemini_cfg.telemetry_batch_size.
+    """
+
+    def __init__(self, db_file=global_vars.sqlite_db_file, batch_size=gemini_cfg.telemetry_batch_size):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._conn = None
+        self._failed = False
+
+    def add(self, values):
+        """
+        Buffers one call, writing the buffer once it is full.
+
+        Args:
+            values (tuple): The llm_calls column values in _llm_call_columns order.
+        """
+        with self._lock:
+            self._buffer.append(values)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes every buffered call."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        rows, self._buffer = self._buffer, []
+        if not rows or self._failed:
+            return
+        try:
+            if self._conn is None:
+                # Imported here because db_functions is not needed until the first batch is written
+                from utilities.db_functions import connect
+                self._conn = connect(self.db_file, check_same_thread=False)
+            with self._conn:
+                self._conn.executemany(f"INSERT INTO llm_calls ({', '.join(_llm_call_columns)}) "
+                                       f"VALUES ({', '.join('?' for _ in _llm_call_columns)})", rows)
+        except sqlite3.Error as e:
+            # Telemetry must never break a step, so stop recording after the first failure
+            self._failed = True
+            print(f"Model call telemetry is not recorded: {e}")
+
+
+def get_call_recorder():
+    """Returns the shared call recorder, creating it on first use.
+
+    Returns:
+        CallRecorder: The shared recorder, or None when gemini_cfg.telemetry_enabled is False.
+    """
+    global _default_recorder
+    if not gemini_cfg.telemetry_enabled:
+        return None
+    with _default_recorder_lock:
+        if _default_recorder is None:
+            _default_recorder = CallRecorder()
+            atexit.register(_default_recorder.flush)
+    return _default_recorder
+
+
+def llm_call_report(conn, group_by=("step", "prompt_type"), since=None):
+    """
+    Summarises the recorded model calls per group with latency percentiles and token totals.
+
+    Args:
+        conn: A connection to the SQLite database.
+        group_by (tuple, optional): The llm_calls columns to group by. Defaults to ("step", "prompt_type").
+        since (float, optional): Only include calls made after this Unix time. Defaults to None.
+
+    Returns:
+        list: One dict per group, slowest p95 first, with the group values, calls, p50, p95 and p99 latency in
+        seconds, input and output token totals, cache hits, retries and errors.
+    """
+    unknown_columns = set(group_by) - set(_llm_call_columns)
+    if unknown_columns:
+        raise ValueError(f"Unknown llm_calls column(s): {', '.join(sorted(unknown_columns))}")
+    query = (f"SELECT {', '.join(group_by)}, latency_seconds, input_tokens, output_tokens, cache_hit, retries, "
+             f"error_class FROM llm_calls")
+    parameters = ()
+    if since is not None:
+        query += " WHERE created_at >= ?"
+        parameters = (since,)
+
+    groups = {}
+    for row in conn.execute(query, parameters):
+        groups.setdefault(tuple(row[:len(group_by)]), []).append(tuple(row[len(group_by):]))
+
+    report = []
+    for key, calls in groups.items():
+        latencies = np.array([call[0] for call in calls])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        entry = dict(zip(group_by, key))
+        entry.update(calls=len(calls), p50=float(p50), p95=float(p95), p99=float(p99),
+                     input_tokens=sum(call[1] for call in calls), output_tokens=sum(call[2] for call in calls),
+                     cache_hits=sum(call[3] for call in calls), retries=sum(call[4] for call in calls),
+                     errors=sum(1 for call in calls if call[5] is not None))
+        report.append(entry)
+    return sorted(report, key=lambda entry: entry["p95"], reverse=True)
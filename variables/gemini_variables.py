@@ -1,5 +1,10 @@
 
 
+# Model used for every prompt type without a route, and the backend that creates the model clients: 'gemini', or
+# 'stub' for runs without an API key (see utilities/model_functions.py)
+default_model_name = "gemini-pro"
+model_backend = "gemini"
+
 generation_config = {
     "temperature": 0.1,
     "top_p": 1,
@@ -25,3 +30,47 @@ safety_settings = [
         "threshold": "BLOCK_MEDIUM_AND_ABOVE"
     },
 ]
+
+# Model and generation config per prompt type, overriding default_model_name and generation_config. Short
+# extraction prompts go to a faster model with a small output budget; writing prompts stay on the default model.
+model_routes = {
+    "job_requirements": {"model_name": "gemini-1.5-flash", "generation_config": {"max_output_tokens": 512}},
+    "keywords": {"model_name": "gemini-1.5-flash", "generation_config": {"max_output_tokens": 512}},
+    "fit_score": {"model_name": "gemini-1.5-flash", "generation_config": {"max_output_tokens": 32}},
+    "achievement_filter": {"model_name": "gemini-1.5-flash", "generation_config": {"max_output_tokens": 1024}},
+}
+
+# Maximum number of generate_content requests in flight when prompts run concurrently
+max_concurrent_requests = 4
+
+# Number of jobs whose Step 1 output is generated at once ahead of the reviewer. Kept small so the fit score that
+# follows a job's requirements is not queued behind the calls of every other pending job.
+prefetch_lookahead = 2
+
+# Persistent response cache for generate_content calls
+response_cache_enabled = True
+response_cache_max_entries = 5000
+response_cache_ttl_seconds = 30 * 24 * 60 * 60  # 30 days
+
+# Maximum number of finished bullets the step 2 pipeline holds while waiting for the user
+bullet_pipeline_max_ready = 4
+
+# Shared quota for every model call in the process; set these to your API key's limits (None disables a limit)
+requests_per_minute = 60
+tokens_per_minute = 1000000
+
+# Exponential backoff with jitter for retryable errors (quota, overload, timeouts, server errors)
+max_retries = 5
+retry_base_delay = 2
+retry_max_delay = 60
+
+# Pause every caller when at least half of the recent calls failed with retryable errors
+circuit_breaker_window = 20
+circuit_breaker_error_rate = 0.5
+circuit_breaker_min_calls = 5
+circuit_breaker_cooldown_seconds = 30
+
+# Record every model call (step, prompt type, job, tokens, latency, retries, cache hit, error) in the llm_calls table,
+# buffering this many calls per insert; report them with `python reportLlmCalls.py`
+telemetry_enabled = True
+telemetry_batch_size = 50
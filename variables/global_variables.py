@@ -1,3 +1,50 @@
 sqlite_db_file = 'data/target/Apply4Job.db'
+llm_cache_db_file = 'data/target/llm_cache.db'
+template_cache_dir = 'data/target/template_cache'
+resume_template_file = 'data/src/resume_template/ResumeTemplate.docx'
+profile_dir = 'data/target/profiles'
+
+# Pragmas applied to every database connection; WAL and the busy timeout (milliseconds) let steps run side by side
+sqlite_pragmas = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,
+    'cache_size': -32000,  # 32 MB
+    'mmap_size': 268435456,  # 256 MB
+    'temp_store': 'MEMORY',
+}
+
+# Number of achievement bullets selected for each role of the full resume, in resume order
+num_bullets_per_role: list = [
+    5,  # 1 Firstup
+    2,  # 2 Nike
+    4,  # 3 WC PM
+    4,  # 4 WC Dev
+    2,  # 5 PCC
+    2,  # 6 Verisae
+]
 
 pacifier_message: str = 'AI is working. Please wait...'
+
+# Step 4 only writes direct messages for jobs at this company, to try the step out on one company's jobs; None writes
+# them for every job
+dm_company_name = None
+
+# Fit score engine: 'llm' asks the model, 'local' uses the offline BM25 keyword scorer and
+# 'both' stores the model's score and prints the local score next to it for comparison
+fit_score_engine: str = 'llm'
+
+# Step 1 jobs whose job description is at least this similar (estimated Jaccard similarity of word shingles) to an
+# already reviewed job reuse its requirements, fit score, keywords and guidance; None turns the check off
+near_duplicate_threshold: float = 0.7
+
+# Step 2 ranks each role's achievements against the job with a local TF-IDF index and sends the model only the best
+# achievement_shortlist_factor x bullets of them; None sends every achievement
+achievement_shortlist_factor: float = 2.0
+# The top achievements are used without the model when the last one selected outscores the next best by this share
+# of its score; None always asks the model
+achievement_confidence_margin: float = 0.3
+
+# Step 2 offers the versions generated and chosen for the same original bullet on an earlier job instead of calling
+# the model, when the two jobs' keywords have at least this Jaccard similarity; None always calls the model
+bullet_variant_reuse_threshold: float = 0.6